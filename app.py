@@ -4,7 +4,13 @@ from moviepy.editor import *
 import subprocess
 import os
 import django
-from shared.constants import HOSTED_BACKGROUND_RUNNER_MODE, OFFLINE_MODE, SERVER, ServerType
+from shared.constants import (
+    GPU_INFERENCE_ENABLED,
+    HOSTED_BACKGROUND_RUNNER_MODE,
+    OFFLINE_MODE,
+    SERVER,
+    ServerType,
+)
 import sentry_sdk
 from shared.logging.logging import AppLogger
 from utils.app_update_utils import check_for_updates
@@ -20,8 +26,10 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_settings")
 django.setup()
 st.session_state["django_init"] = True
 
+from backend.uuid_resolver import uuid_resolver
 from banodoco_settings import project_init
 from utils.data_repo.data_repo import DataRepo
+from utils.data_repo.request_coalescer import reset_request_batch
 
 
 if OFFLINE_MODE:
@@ -60,6 +68,7 @@ def start_runner():
 
 def main():
     st.set_page_config(page_title="Dough", layout="wide", page_icon="🎨")
+    reset_request_batch()
 
     auth_details = get_url_param(AUTH_TOKEN)
     if (not auth_details or auth_details == "None") and SERVER != ServerType.DEVELOPMENT.value:
@@ -92,6 +101,10 @@ def main():
         if "first_load" not in st.session_state:
             if not is_process_active(RUNNER_PROCESS_NAME, RUNNER_PROCESS_PORT):
                 check_for_updates()  # enabling auto updates only for local version
+            if GPU_INFERENCE_ENABLED:
+                from utils.ml_processor.comfy_data_transform import load_workflow_templates
+
+                load_workflow_templates()
             st.session_state["first_load"] = True
         start_runner()
         project_init()
@@ -111,7 +124,8 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        with uuid_resolver.request_scope():
+            main()
     except Exception as e:
         sentry_sdk.capture_exception(e)
         raise e
@@ -5,7 +5,6 @@ import os
 
 import sys
 from shared.logging.constants import LoggingType
-from django.core.paginator import Paginator
 
 from shared.logging.logging import AppLogger
 from utils.common_decorators import measure_execution_time
@@ -16,7 +15,7 @@ import sqlite3
 import subprocess
 from typing import List
 import uuid
-from shared.constants import InferenceStatus, InternalFileTag, InternalFileType, SortOrder
+from shared.constants import BatchEntityType, InferenceStatus, InternalFileTag, InternalFileType, SortOrder
 from backend.serializers.dto import (
     AIModelDto,
     AppSettingDto,
@@ -29,11 +28,22 @@ from backend.serializers.dto import (
     ShotDto,
     TimingDto,
     UserDto,
+    SlimInternalFileDto,
+    SlimTimingDto,
+    FILE_DTO_RELATED_FIELDS,
+    SHOT_DTO_RELATED_FIELDS,
+    SLIM_FILE_DTO_DEFERRED_FIELDS,
+    SLIM_FILE_DTO_RELATED_FIELDS,
+    SLIM_TIMING_DTO_DEFERRED_FIELDS,
+    SLIM_TIMING_DTO_RELATED_FIELDS,
+    TIMING_DTO_RELATED_FIELDS,
 )
 
 from shared.constants import AUTOMATIC_FILE_HOSTING, LOCAL_DATABASE_NAME, SERVER, ServerType
 from shared.file_upload.s3 import upload_file, upload_file_from_obj
 
+from backend.pagination import get_total_pages, paginate_query, query_count_cache
+from backend.uuid_resolver import uuid_resolver
 from backend.models import (
     AIModel,
     AIModelParamMap,
@@ -42,11 +52,13 @@ from backend.models import (
     InferenceLog,
     InternalFileObject,
     Lock,
+    ORDER_KEY_GAP,
     Project,
     Setting,
     Shot,
     Timing,
     User,
+    with_frame_index,
 )
 
 from backend.serializers.dao import (
@@ -64,12 +76,34 @@ from backend.serializers.dao import (
     UpdateSettingDao,
 )
 from shared.constants import InternalResponse
-from django.db.models import F
+from django.db.models import F, Q
 from django.db import transaction
 
 
 logger = AppLogger()
 
+# foreign keys of the writes which are passed as uuids, {field: (model, error msg)}
+FILE_FK_DICT = {
+    "project_id": (Project, "invalid project"),
+    "inference_log_id": (InferenceLog, "invalid log id"),
+}
+INFERENCE_LOG_FK_DICT = {
+    "project_id": (Project, "invalid project"),
+    "model_id": (AIModel, "invalid model"),
+}
+TIMING_FK_DICT = {
+    "shot_id": (Shot, "invalid shot uuid"),
+    "model_id": (AIModel, "invalid model uuid"),
+    "primary_image_id": (InternalFileObject, "invalid primary image uuid"),
+    "source_image_id": (InternalFileObject, "invalid source image uuid"),
+    "mask_id": (InternalFileObject, "invalid mask uuid"),
+    "canny_image_id": (InternalFileObject, "invalid canny image uuid"),
+}
+
+
+def get_fk_model_dict(fk_dict):
+    return {field: model for field, (model, _) in fk_dict.items()}
+
 
 # @measure_execution_time
 class DBRepo:
@@ -211,8 +245,17 @@ class DBRepo:
 
     # TODO: right now if page is passed then paginated result will be provided
     # or else entire list will be fetched. will standardise this later
-    def get_all_file_list(self, **kwargs):
+    # slim=True returns SlimInternalFileDto projections (check dto.py)
+    def get_all_file_list(self, slim=False, **kwargs):
         kwargs["is_disabled"] = False
+        if slim:
+            file_dto = SlimInternalFileDto
+            file_query = InternalFileObject.objects.select_related(*SLIM_FILE_DTO_RELATED_FIELDS).defer(
+                *SLIM_FILE_DTO_DEFERRED_FIELDS
+            )
+        else:
+            file_dto = InternalFileDto
+            file_query = InternalFileObject.objects.select_related(*FILE_DTO_RELATED_FIELDS)
 
         if "project_id" in kwargs and kwargs["project_id"]:
             project = Project.objects.filter(uuid=kwargs["project_id"], is_disabled=False).first()
@@ -227,42 +270,48 @@ class DBRepo:
             del kwargs["page"]
             data_per_page = kwargs["data_per_page"]
             del kwargs["data_per_page"]
-            sort_order = kwargs["sort_order"] if "sort_order" in kwargs else None
-            del kwargs["sort_order"]
+            sort_order = kwargs.pop("sort_order", None)
+            # cursor of the previous page (next_cursor of its response)
+            cursor = kwargs.pop("cursor", None)
 
             shot_uuid_list = []
             if "shot_uuid_list" in kwargs:
                 shot_uuid_list = kwargs["shot_uuid_list"]
                 del kwargs["shot_uuid_list"]
 
-            file_list = InternalFileObject.objects.filter(**kwargs).all()
+            file_list = file_query.filter(**kwargs).all()
 
             if shot_uuid_list and len(shot_uuid_list):
                 file_list = file_list.filter(shot_uuid__in=shot_uuid_list)
 
-            if sort_order:
-                if sort_order == SortOrder.DESCENDING.value:
-                    file_list = file_list.order_by("-created_on")
+            count = query_count_cache.get_count(
+                ("file", str(sorted(kwargs.items())), str(shot_uuid_list)), file_list
+            )
+            total_pages = get_total_pages(count, data_per_page)
+            if page > total_pages or page < 1:
+                # the total is still returned so that the page selector can be corrected
+                return InternalResponse({"total_pages": total_pages}, "invalid page number", False)
 
-            paginator = Paginator(file_list, data_per_page)
-            if page > paginator.num_pages or page < 1:
-                return InternalResponse({}, "invalid page number", False)
+            file_list, next_cursor = paginate_query(
+                file_list, page, data_per_page, sort_order == SortOrder.DESCENDING.value, cursor
+            )
 
             payload = {
                 "data_per_page": data_per_page,
                 "page": page,
-                "total_pages": paginator.num_pages,
-                "count": paginator.count,
-                "data": InternalFileDto(paginator.page(page), many=True).data,
+                "total_pages": total_pages,
+                "count": count,
+                "next_cursor": next_cursor,
+                "data": file_dto(file_list, many=True).data,
             }
         else:
-            file_list = InternalFileObject.objects.filter(**kwargs).all()
+            file_list = file_query.filter(**kwargs).all()
 
             if "sort_order" in kwargs:
                 if kwargs["sort_order"] == SortOrder.DESCENDING.value:
                     file_list = file_list.order_by("-created_on")
 
-            payload = {"data": InternalFileDto(file_list, many=True).data}
+            payload = {"data": file_dto(file_list, many=True).data}
 
         return InternalResponse(payload, "file found", True)
 
@@ -322,21 +371,14 @@ class DBRepo:
 
             data._data["hosted_url"] = hosted_url
 
-        if "project_id" in kwargs and kwargs["project_id"]:
-            project = Project.objects.filter(uuid=kwargs["project_id"], is_disabled=False).first()
-            if not project:
-                return InternalResponse({}, "invalid project", False)
-
-            data._data["project_id"] = project.id
-
-        if "inference_log_id" in kwargs and kwargs["inference_log_id"]:
-            inference_log = InferenceLog.objects.filter(
-                uuid=kwargs["inference_log_id"], is_disabled=False
-            ).first()
-            if not inference_log:
-                return InternalResponse({}, "invalid log id", False)
+        fk_id_dict, invalid_field = uuid_resolver.resolve_fields(
+            {k: v for k, v in kwargs.items() if v},
+            get_fk_model_dict(FILE_FK_DICT),
+        )
+        if invalid_field:
+            return InternalResponse({}, FILE_FK_DICT[invalid_field][1], False)
 
-            data._data["inference_log_id"] = inference_log.id
+        data._data.update(fk_id_dict)
 
         if not data.is_valid():
             return InternalResponse({}, data.errors, False)
@@ -377,21 +419,17 @@ class DBRepo:
         if not file:
             return InternalResponse({}, "invalid file uuid", False)
 
-        if "project_id" in kwargs:
-            project = Project.objects.filter(uuid=kwargs["project_id"], is_disabled=False).first()
-            if not project:
-                return InternalResponse({}, "invalid project", False)
-
-            kwargs["project_id"] = project.id
+        if "project_id" in kwargs and not kwargs["project_id"]:
+            return InternalResponse({}, "invalid project", False)
 
-        if "inference_log_id" in kwargs and kwargs["inference_log_id"]:
-            inference_log = InferenceLog.objects.filter(
-                uuid=kwargs["inference_log_id"], is_disabled=False
-            ).first()
-            if not inference_log:
-                return InternalResponse({}, "invalid log id", False)
+        fk_id_dict, invalid_field = uuid_resolver.resolve_fields(
+            {k: v for k, v in kwargs.items() if v},
+            get_fk_model_dict(FILE_FK_DICT),
+        )
+        if invalid_field:
+            return InternalResponse({}, FILE_FK_DICT[invalid_field][1], False)
 
-            kwargs["inference_log_id"] = inference_log.id
+        kwargs.update(fk_id_dict)
 
         for k, v in kwargs.items():
             setattr(file, k, v)
@@ -637,6 +675,7 @@ class DBRepo:
         status_list=None,
         exclude_model_list=None,
         model_name_list="",
+        cursor=None,
     ):
         if project_id:
             project = Project.objects.filter(uuid=project_id, is_disabled=False).first()
@@ -658,16 +697,29 @@ class DBRepo:
 
         log_list = log_list.exclude(model_id=None)  # hackish sol to exclude non-image/video logs
 
-        paginator = Paginator(log_list, data_per_page)
-        if page > paginator.num_pages or page < 1:
-            return InternalResponse({}, "invalid page number", False)
+        count = query_count_cache.get_count(
+            (
+                "inference_log",
+                str(project_id),
+                str(status_list),
+                str(exclude_model_list),
+                str(model_name_list),
+            ),
+            log_list,
+        )
+        total_pages = get_total_pages(count, data_per_page)
+        if page > total_pages or page < 1:
+            return InternalResponse({"total_pages": total_pages}, "invalid page number", False)
+
+        log_list, next_cursor = paginate_query(log_list, page, data_per_page, cursor=cursor)
 
         payload = {
             "data_per_page": data_per_page,
             "page": page,
-            "total_pages": paginator.num_pages,
-            "count": paginator.count,
-            "data": InferenceLogDto(paginator.page(page), many=True).data,
+            "total_pages": total_pages,
+            "count": count,
+            "next_cursor": next_cursor,
+            "data": InferenceLogDto(log_list, many=True).data,
         }
 
         return InternalResponse(payload, "inference log list fetched", True)
@@ -677,19 +729,14 @@ class DBRepo:
         if not attributes.is_valid():
             return InternalResponse({}, attributes.errors, False)
 
-        if "project_id" in attributes.data and attributes.data["project_id"]:
-            project = Project.objects.filter(uuid=attributes.data["project_id"], is_disabled=False).first()
-            if not project:
-                return InternalResponse({}, "invalid project", False)
-
-            attributes._data["project_id"] = project.id
-
-        if "model_id" in attributes.data and attributes.data["model_id"]:
-            model = AIModel.objects.filter(uuid=attributes.data["model_id"], is_disabled=False).first()
-            if not model:
-                return InternalResponse({}, "invalid model", False)
+        fk_id_dict, invalid_field = uuid_resolver.resolve_fields(
+            {k: v for k, v in attributes.data.items() if v},
+            get_fk_model_dict(INFERENCE_LOG_FK_DICT),
+        )
+        if invalid_field:
+            return InternalResponse({}, INFERENCE_LOG_FK_DICT[invalid_field][1], False)
 
-            attributes._data["model_id"] = model.id
+        attributes._data.update(fk_id_dict)
 
         log = InferenceLog.objects.create(**attributes.data)
 
@@ -697,6 +744,47 @@ class DBRepo:
 
         return InternalResponse(payload, "inference log created successfully", True)
 
+    # creates all the logs with a single insert, the project/model lookups are shared
+    def create_inference_log_list(self, log_data_list):
+        attribute_list = []
+        for log_data in log_data_list:
+            attributes = CreateInferenceLogDao(data=log_data)
+            if not attributes.is_valid():
+                return InternalResponse({}, attributes.errors, False)
+            attribute_list.append(attributes.data)
+
+        fk_id_dict_list, invalid_field = uuid_resolver.resolve_fields_list(
+            [{k: v for k, v in data.items() if v} for data in attribute_list],
+            get_fk_model_dict(INFERENCE_LOG_FK_DICT),
+        )
+        if invalid_field:
+            return InternalResponse({}, INFERENCE_LOG_FK_DICT[invalid_field][1], False)
+
+        # the related objects are set on the logs, so that the dto doesn't query them again for every log
+        project_map = Project.objects.select_related("user").in_bulk(
+            set(d["project_id"] for d in fk_id_dict_list if "project_id" in d)
+        )
+        model_map = AIModel.objects.select_related("user").in_bulk(
+            set(d["model_id"] for d in fk_id_dict_list if "model_id" in d)
+        )
+
+        log_list = []
+        for data, fk_id_dict in zip(attribute_list, fk_id_dict_list):
+            data.pop("project_id", None)
+            data.pop("model_id", None)
+            if "project_id" in fk_id_dict:
+                data["project"] = project_map[fk_id_dict["project_id"]]
+            if "model_id" in fk_id_dict:
+                data["model"] = model_map[fk_id_dict["model_id"]]
+
+            log_list.append(InferenceLog(**data))
+
+        log_list = InferenceLog.objects.bulk_create(log_list)
+
+        payload = {"data": InferenceLogDto(log_list, many=True).data}
+
+        return InternalResponse(payload, "inference logs created successfully", True)
+
     def delete_inference_log_from_uuid(self, uuid):
         log = InferenceLog.objects.filter(uuid=uuid, is_disabled=False).first()
         if not log:
@@ -787,9 +875,11 @@ class DBRepo:
     def get_timing_from_frame_number(self, shot_uuid, frame_number):
         shot: Shot = Shot.objects.filter(uuid=shot_uuid, is_disabled=False).first()
         if shot:
-            timing = Timing.objects.filter(
-                aux_frame_index=frame_number, shot_id=shot.id, is_disabled=False
-            ).first()
+            timing = (
+                Timing.objects.filter(shot_id=shot.id, is_disabled=False)
+                .order_by("order_key", "id")[frame_number : frame_number + 1]
+                .first()
+            )
             if timing:
                 payload = {"data": TimingDto(timing).data}
 
@@ -806,17 +896,16 @@ class DBRepo:
 
         return InternalResponse(payload, "timing fetched", True)
 
-    # this is based on the aux_frame_index and not the order in the db
+    # this is based on the order_key (frame order in the shot) and not the order in the db
     def get_next_timing(self, uuid):
         timing = Timing.objects.filter(uuid=uuid, is_disabled=False).first()
         if not timing:
             return InternalResponse({}, "invalid timing uuid", False)
 
         next_timing = (
-            Timing.objects.filter(
-                aux_frame_index=timing.aux_frame_index + 1, shot_id=timing.shot_id, is_disabled=False
-            )
-            .order_by("aux_frame_index")
+            Timing.objects.filter(shot_id=timing.shot_id, is_disabled=False)
+            .filter(Q(order_key__gt=timing.order_key) | Q(order_key=timing.order_key, id__gt=timing.id))
+            .order_by("order_key", "id")
             .first()
         )
 
@@ -830,10 +919,9 @@ class DBRepo:
             return InternalResponse({}, "invalid timing uuid", False)
 
         prev_timing = (
-            Timing.objects.filter(
-                aux_frame_index=timing.aux_frame_index - 1, shot_id=timing.shot_id, is_disabled=False
-            )
-            .order_by("aux_frame_index")
+            Timing.objects.filter(shot_id=timing.shot_id, is_disabled=False)
+            .filter(Q(order_key__lt=timing.order_key) | Q(order_key=timing.order_key, id__lt=timing.id))
+            .order_by("-order_key", "-id")
             .first()
         )
 
@@ -855,29 +943,36 @@ class DBRepo:
                 return InternalResponse({}, "invalid project", False)
 
             shot_list = Shot.objects.filter(project_id=project.id, is_disabled=False).all()
-            timing_list = (
+            timing_list = with_frame_index(
                 Timing.objects.filter(shot_id__in=[s.id for s in shot_list], is_disabled=False)
-                .order_by("aux_frame_index")
-                .all()
-            )
+            ).order_by("order_key", "id")
         else:
-            timing_list = Timing.objects.filter(is_disabled=False).order_by("aux_frame_index").all()
+            timing_list = with_frame_index(Timing.objects.filter(is_disabled=False)).order_by(
+                "order_key", "id"
+            )
 
         payload = {"data": TimingDto(timing_list, many=True).data}
 
         return InternalResponse(payload, "timing list fetched", True)
 
-    def get_timing_list_from_shot(self, shot_uuid):
+    # slim=True returns SlimTimingDto projections (check dto.py)
+    def get_timing_list_from_shot(self, shot_uuid, slim=False):
 
         shot: Shot = Shot.objects.filter(uuid=shot_uuid, is_disabled=False).first()
         if not shot:
             return InternalResponse({}, "invalid shot", False)
 
-        timing_list = (
-            Timing.objects.filter(shot_id=shot.id, is_disabled=False).order_by("aux_frame_index").all()
+        timing_list = with_frame_index(Timing.objects.filter(shot_id=shot.id, is_disabled=False)).order_by(
+            "order_key", "id"
         )
-
-        payload = {"data": TimingDto(timing_list, many=True).data}
+        if slim:
+            timing_list = timing_list.select_related(*SLIM_TIMING_DTO_RELATED_FIELDS).defer(
+                *SLIM_TIMING_DTO_DEFERRED_FIELDS
+            )
+            payload = {"data": SlimTimingDto(timing_list.all(), many=True).data}
+        else:
+            timing_list = timing_list.select_related(*TIMING_DTO_RELATED_FIELDS, "shot__project__user")
+            payload = {"data": TimingDto(timing_list.all(), many=True).data}
 
         return InternalResponse(payload, "timing list fetched", True)
 
@@ -888,68 +983,19 @@ class DBRepo:
 
         print(attributes.data)
 
-        if "shot_id" in attributes.data and attributes.data["shot_id"]:
-            shot = Shot.objects.filter(uuid=attributes.data["shot_id"], is_disabled=False).first()
-            if not shot:
-                return InternalResponse({}, "invalid shot", False)
+        fk_id_dict, invalid_field = uuid_resolver.resolve_fields(
+            attributes.data, get_fk_model_dict(TIMING_FK_DICT)
+        )
+        if invalid_field:
+            return InternalResponse({}, TIMING_FK_DICT[invalid_field][1], False)
 
-            attributes._data["shot_id"] = shot.id
+        attributes._data.update(fk_id_dict)
 
         if "aux_frame_index" not in attributes.data or attributes.data["aux_frame_index"] == None:
             attributes._data["aux_frame_index"] = Timing.objects.filter(
                 shot_id=attributes.data["shot_id"], is_disabled=False
             ).count()
 
-        if "model_id" in attributes.data:
-            if attributes.data["model_id"] != None:
-                model: AIModel = AIModel.objects.filter(
-                    uuid=attributes.data["model_id"], is_disabled=False
-                ).first()
-                if not model:
-                    return InternalResponse({}, "invalid model uuid", False)
-
-                attributes._data["model_id"] = model.id
-
-        if "source_image_id" in attributes.data:
-            if attributes.data["source_image_id"] != None:
-                source_image: InternalFileObject = InternalFileObject.objects.filter(
-                    uuid=attributes.data["source_image_id"], is_disabled=False
-                ).first()
-                if not source_image:
-                    return InternalResponse({}, "invalid source image uuid", False)
-
-                attributes._data["source_image_id"] = source_image.id
-
-        if "mask_id" in attributes.data:
-            if attributes.data["mask_id"] != None:
-                mask: InternalFileObject = InternalFileObject.objects.filter(
-                    uuid=attributes.data["mask_id"], is_disabled=False
-                ).first()
-                if not mask:
-                    return InternalResponse({}, "invalid mask uuid", False)
-
-                attributes._data["mask_id"] = mask.id
-
-        if "canny_image_id" in attributes.data:
-            if attributes.data["canny_image_id"] != None:
-                canny_image: InternalFileObject = InternalFileObject.objects.filter(
-                    uuid=attributes.data["canny_image_id"], is_disabled=False
-                ).first()
-                if not canny_image:
-                    return InternalResponse({}, "invalid canny image uuid", False)
-
-                attributes._data["canny_image_id"] = canny_image.id
-
-        if "primary_image_id" in attributes.data:
-            if attributes.data["primary_image_id"] != None:
-                primay_image: InternalFileObject = InternalFileObject.objects.filter(
-                    uuid=attributes.data["primary_image_id"], is_disabled=False
-                ).first()
-                if not primay_image:
-                    return InternalResponse({}, "invalid primary image uuid", False)
-
-                attributes._data["primary_image_id"] = primay_image.id
-
         timing = Timing.objects.create(**attributes.data)
         payload = {"data": TimingDto(timing).data}
 
@@ -1030,6 +1076,106 @@ class DBRepo:
         payload = {"data": [TimingDto(timing).data for timing in res_timing_list]}
         return InternalResponse(payload, "timing list created successfully", True)
 
+    def apply_shot_frame_layout(self, shot_uuid, frame_list):
+        """
+        replaces the frame layout of the shot in a single transaction. frame_list is the final ordered
+        list of frames, each entry being one of
+            {"uuid": timing_uuid} - existing frame of the shot
+            {"copy_of": timing_uuid} - new frame copied from an existing frame of the shot
+            {} - new frame
+        and optionally "primary_image_id" (file uuid) to replace the image of the frame.
+        frames of the shot which are not in the list are removed
+        """
+        shot: Shot = Shot.objects.filter(uuid=shot_uuid, is_disabled=False).first()
+        if not shot:
+            return InternalResponse({}, "invalid shot uuid", False)
+
+        timing_map = {
+            str(timing.uuid): timing for timing in Timing.objects.filter(shot_id=shot.id, is_disabled=False)
+        }
+        image_uuid_list = set(str(f["primary_image_id"]) for f in frame_list if f.get("primary_image_id"))
+        image_map = {
+            str(file.uuid): file
+            for file in InternalFileObject.objects.filter(uuid__in=image_uuid_list, is_disabled=False)
+        }
+        if len(image_map) != len(image_uuid_list):
+            return InternalResponse({}, "invalid image uuid", False)
+
+        updated_timing_list, new_timing_list = [], []
+        used_uuid_list = set()
+        for idx, frame in enumerate(frame_list):
+            timing_uuid = str(frame.get("uuid") or frame.get("copy_of") or "")
+            if timing_uuid and timing_uuid not in timing_map:
+                return InternalResponse({}, "invalid timing uuid", False)
+
+            # a frame which is present more than once is copied after its first occurence
+            if frame.get("uuid") and timing_uuid not in used_uuid_list:
+                timing = timing_map[timing_uuid]
+                used_uuid_list.add(timing_uuid)
+                updated_timing_list.append(timing)
+            else:
+                source = timing_map.get(timing_uuid, None)
+                timing = Timing(
+                    shot_id=shot.id,
+                    model_id=source.model_id if source else None,
+                    source_image_id=source.source_image_id if source else None,
+                    mask_id=source.mask_id if source else None,
+                    canny_image_id=source.canny_image_id if source else None,
+                    primary_image_id=source.primary_image_id if source else None,
+                    alternative_images=source.alternative_images if source else None,
+                    notes=source.notes if source else "",
+                    clip_duration=source.clip_duration if source else None,
+                )
+                new_timing_list.append(timing)
+
+            if frame.get("primary_image_id"):
+                image = image_map[str(frame["primary_image_id"])]
+                alternative_image_list = (
+                    json.loads(timing.alternative_images) if timing.alternative_images else []
+                )
+                if str(image.uuid) not in alternative_image_list:
+                    alternative_image_list.append(str(image.uuid))
+
+                timing.alternative_images = json.dumps(alternative_image_list)
+                timing.primary_image_id = image.id
+                timing.source_image_id = timing.source_image_id or image.id
+
+            # the layout is written with evenly spaced order keys (a single re-index for the shot)
+            timing.order_key = (idx + 1) * ORDER_KEY_GAP
+            timing.aux_frame_index = idx
+
+        removed_timing_list = [
+            timing for timing_uuid, timing in timing_map.items() if timing_uuid not in used_uuid_list
+        ]
+        for timing in removed_timing_list:
+            timing.is_disabled = True
+
+        with transaction.atomic():
+            Timing.objects.bulk_update(
+                updated_timing_list + removed_timing_list,
+                [
+                    "primary_image_id",
+                    "source_image_id",
+                    "alternative_images",
+                    "order_key",
+                    "aux_frame_index",
+                    "is_disabled",
+                ],
+                batch_size=500,
+            )
+            Timing.objects.bulk_create(new_timing_list, batch_size=500)
+
+        # bulk_update doesn't go through save()
+        uuid_resolver.evict_list(Timing, [timing.uuid for timing in removed_timing_list])
+
+        timing_list = (
+            with_frame_index(Timing.objects.filter(shot_id=shot.id, is_disabled=False))
+            .select_related(*TIMING_DTO_RELATED_FIELDS)
+            .order_by("order_key", "id")
+        )
+        payload = {"data": [TimingDto(timing).data for timing in timing_list]}
+        return InternalResponse(payload, "frame layout applied successfully", True)
+
     def remove_existing_timing(self, project_uuid):
         if project_uuid:
             project: Project = Project.objects.filter(uuid=project_uuid, is_disabled=False).first()
@@ -1038,9 +1184,11 @@ class DBRepo:
 
         if project:
             shot_list = Shot.objects.filter(project_id=project.id, is_disabled=False).all()
-            Timing.objects.filter(shot_id__in=[s.id for s in shot_list], is_disabled=False).update(
-                is_disabled=True
-            )
+            timing_query = Timing.objects.filter(shot_id__in=[s.id for s in shot_list], is_disabled=False)
+            timing_uuid_list = list(timing_query.values_list("uuid", flat=True))
+            timing_query.update(is_disabled=True)
+            # update() doesn't go through save()
+            uuid_resolver.evict_list(Timing, timing_uuid_list)
 
         return InternalResponse({}, "timing removed successfully", True)
 
@@ -1066,67 +1214,19 @@ class DBRepo:
         if not (timing_list and len(timing_list)) and len(timing_uuid_list):
             return InternalResponse({}, "no timing objs found", False)
 
-        primary_image_id_list = []
-        shot_id_list = []
-        model_id_list = []
-        source_image_id_list = []
-        mask_id_list = []
-        canny_image_id_list = []
-
-        for d in data_list:
-            if "primary_image_id" in d:
-                primary_image_id_list.append(d["primary_image_id"])
-            if "shot_id" in d:
-                shot_id_list.append(d["shot_id"])
-            if "model_id" in d:
-                model_id_list.append(d["model_id"])
-            if "source_image_id" in d:
-                source_image_id_list.append(d["source_image_id"])
-            if "mask_id" in d:
-                mask_id_list.append(d["mask_id"])
-            if "canny_image_id" in d:
-                canny_image_id_list.append(d["canny_image_id"])
-            if "primary_image_id" in d:
-                primary_image_id_list.append(d["primary_image_id"])
-
-        primary_image_id_list = list(set(primary_image_id_list))
-        shot_id_list = list(set(shot_id_list))
-        model_id_list = list(set(model_id_list))
-        source_image_id_list = list(set(source_image_id_list))
-        mask_id_list = list(set(mask_id_list))
-        canny_image_id_list = list(set(canny_image_id_list))
-
-        file_list = InternalFileObject.objects.filter(
-            uuid__in=primary_image_id_list + source_image_id_list + mask_id_list + canny_image_id_list,
-            is_disabled=False,
-        ).all()
-        model_list = AIModel.objects.filter(uuid__in=model_id_list, is_disabled=False).all()
-        shot_list = Shot.objects.filter(uuid__in=shot_id_list, is_disabled=False).all()
-
-        file_uuid_id_map = {file.uuid: file.id for file in file_list}
-        model_uuid_id_map = {model.uuid: model.id for model in model_list}
-        shot_uuid_id_map = {shot.uuid: shot.id for shot in shot_list}
+        fk_id_dict_list, invalid_field = uuid_resolver.resolve_fields_list(
+            data_list, get_fk_model_dict(TIMING_FK_DICT)
+        )
+        if invalid_field:
+            return InternalResponse({}, TIMING_FK_DICT[invalid_field][1], False)
 
         res_timing_list = []
-        for timing, update_data in zip(timing_list, data_list):
+        for timing, update_data, fk_id_dict in zip(timing_list, data_list, fk_id_dict_list):
             kwargs = update_data
-            if "primary_image_id" in kwargs and kwargs["primary_image_id"] in file_uuid_id_map:
-                kwargs["primary_image_id"] = file_uuid_id_map[kwargs["primary_image_id"]]
-
-            if "source_image_id" in kwargs and kwargs["source_image_id"] in file_uuid_id_map:
-                kwargs["source_image_id"] = file_uuid_id_map[kwargs["source_image_id"]]
-
-            if "mask_id" in kwargs and kwargs["mask_id"] in file_uuid_id_map:
-                kwargs["mask_id"] = file_uuid_id_map[kwargs["mask_id"]]
-
-            if "canny_image_id" in kwargs and kwargs["canny_image_id"] in file_uuid_id_map:
-                kwargs["canny_image_id"] = file_uuid_id_map[kwargs["canny_image_id"]]
+            kwargs.update(fk_id_dict)
 
-            if "shot_id" in kwargs and kwargs["shot_id"] in shot_uuid_id_map:
-                kwargs["shot_id"] = shot_uuid_id_map[kwargs["shot_id"]]
-
-            if "model_id" in kwargs and kwargs["model_id"] in model_uuid_id_map:
-                kwargs["model_id"] = model_uuid_id_map[kwargs["model_id"]]
+            if "aux_frame_index" in kwargs:
+                timing.move_to_index(kwargs.pop("aux_frame_index"))
 
             for attr, value in kwargs.items():
                 setattr(timing, attr, value)
@@ -1145,61 +1245,14 @@ class DBRepo:
         if not timing:
             return InternalResponse({}, "invalid timing uuid", False)
 
-        if "primary_image_id" in kwargs:
-            if kwargs["primary_image_id"] != None:
-                primary_image: InternalFileObject = InternalFileObject.objects.filter(
-                    uuid=kwargs["primary_image_id"], is_disabled=False
-                ).first()
-                if not primary_image:
-                    return InternalResponse({}, "invalid primary image uuid", False)
-
-                kwargs["primary_image_id"] = primary_image.id
-
-        if "shot_id" in kwargs:
-            if kwargs["shot_id"] != None:
-                shot: Shot = Shot.objects.filter(uuid=kwargs["shot_id"], is_disabled=False).first()
-                if not shot:
-                    return InternalResponse({}, "invalid shot uuid", False)
-
-                kwargs["shot_id"] = shot.id
-
-        if "model_id" in kwargs:
-            if kwargs["model_id"] != None:
-                model: AIModel = AIModel.objects.filter(uuid=kwargs["model_id"], is_disabled=False).first()
-                if not model:
-                    return InternalResponse({}, "invalid model uuid", False)
-
-                kwargs["model_id"] = model.id
-
-        if "source_image_id" in kwargs:
-            if kwargs["source_image_id"] != None:
-                source_image: InternalFileObject = InternalFileObject.objects.filter(
-                    uuid=kwargs["source_image_id"], is_disabled=False
-                ).first()
-                if not source_image:
-                    return InternalResponse({}, "invalid source image uuid", False)
-
-                kwargs["source_image_id"] = source_image.id
-
-        if "mask_id" in kwargs:
-            if kwargs["mask_id"] != None:
-                mask: InternalFileObject = InternalFileObject.objects.filter(
-                    uuid=kwargs["mask_id"], is_disabled=False
-                ).first()
-                if not mask:
-                    return InternalResponse({}, "invalid mask uuid", False)
-
-                kwargs["mask_id"] = mask.id
-
-        if "canny_image_id" in kwargs:
-            if kwargs["canny_image_id"] != None:
-                canny_image: InternalFileObject = InternalFileObject.objects.filter(
-                    uuid=kwargs["canny_image_id"], is_disabled=False
-                ).first()
-                if not canny_image:
-                    return InternalResponse({}, "invalid canny image uuid", False)
-
-                kwargs["canny_image_id"] = canny_image.id
+        fk_id_dict, invalid_field = uuid_resolver.resolve_fields(kwargs, get_fk_model_dict(TIMING_FK_DICT))
+        if invalid_field:
+            return InternalResponse({}, TIMING_FK_DICT[invalid_field][1], False)
+
+        kwargs.update(fk_id_dict)
+
+        if "aux_frame_index" in kwargs:
+            timing.move_to_index(kwargs.pop("aux_frame_index"))
 
         for attr, value in kwargs.items():
             setattr(timing, attr, value)
@@ -1486,7 +1539,9 @@ class DBRepo:
             return InternalResponse({}, "invalid project", False)
 
         timing_list = (
-            Timing.objects.filter(project_id=project.id, is_disabled=False).order_by("aux_frame_index").all()
+            with_frame_index(Timing.objects.filter(project_id=project.id, is_disabled=False))
+            .order_by("shot_id", "order_key", "id")
+            .all()
         )
 
         # bulk fetching files and models from the database
@@ -1526,6 +1581,7 @@ class DBRepo:
         final_list = list(timing_list.values())
         for timing in final_list:
             timing["uuid"] = str(timing["uuid"])
+            timing["aux_frame_index"] = timing.pop("frame_index") - 1
             timing["model_uuid"] = str(id_model_dict[timing["model_id"]].uuid) if timing["model_id"] else None
             del timing["model_id"]
 
@@ -1653,30 +1709,70 @@ class DBRepo:
             return InternalResponse({"data": True}, "success", True)
 
     # shot
+    def _get_shot_dto_context(self, shot_list):
+        """
+        fetches the timings and the interpolated clips of all the shots in a fixed number of
+        queries, instead of ShotDto loading them (and their relations) shot by shot
+        """
+        shot_map = {shot.id: shot for shot in shot_list}
+        timing_list = (
+            with_frame_index(Timing.objects.filter(shot_id__in=list(shot_map.keys()), is_disabled=False))
+            .select_related(*TIMING_DTO_RELATED_FIELDS)
+            .all()
+        )
+        timing_map = {}
+        for timing in timing_list:
+            # reusing the shot objects which already have their project loaded
+            timing.shot = shot_map[timing.shot_id]
+            timing_map.setdefault(timing.shot_id, []).append(timing)
+
+        clip_uuid_list = []
+        for shot in shot_list:
+            clip_uuid_list.extend(
+                json.loads(shot.interpolated_clip_list) if shot.interpolated_clip_list else []
+            )
+
+        clip_list = []
+        if clip_uuid_list:
+            clip_list = (
+                InternalFileObject.objects.filter(uuid__in=clip_uuid_list, is_disabled=False)
+                .select_related(*FILE_DTO_RELATED_FIELDS)
+                .all()
+            )
+
+        return {
+            "timing_map": timing_map,
+            "interpolated_clip_map": {str(clip.uuid): clip for clip in clip_list},
+        }
+
     def get_shot_from_number(self, project_uuid, shot_number=0):
         project = Project.objects.filter(uuid=project_uuid, is_disabled=False).first()
         if not project:
             return InternalResponse({}, "invalid project uuid", False)
 
-        shot: Shot = Shot.objects.filter(
-            project_id=project.id, shot_idx=shot_number, is_disabled=False
-        ).first()
+        shot: Shot = (
+            Shot.objects.filter(project_id=project.id, shot_idx=shot_number, is_disabled=False)
+            .select_related(*SHOT_DTO_RELATED_FIELDS)
+            .first()
+        )
         if not shot:
             return InternalResponse({}, "invalid shot number", False)
 
-        timing_list = Timing.objects.filter(shot_id=shot.id, is_disabled=False).all()
-        context = {"timing_list": timing_list}
+        context = self._get_shot_dto_context([shot])
         payload = {"data": ShotDto(shot, context=context).data}
 
         return InternalResponse(payload, "shot fetched successfully", True)
 
     def get_shot_from_uuid(self, shot_uuid):
-        shot: Shot = Shot.objects.filter(uuid=shot_uuid, is_disabled=False).first()
+        shot: Shot = (
+            Shot.objects.filter(uuid=shot_uuid, is_disabled=False)
+            .select_related(*SHOT_DTO_RELATED_FIELDS)
+            .first()
+        )
         if not shot:
             return InternalResponse({}, "invalid shot uuid", False)
 
-        timing_list = Timing.objects.filter(shot_id=shot.id, is_disabled=False).all()
-        context = {"timing_list": timing_list}
+        context = self._get_shot_dto_context([shot])
 
         payload = {"data": ShotDto(shot, context=context).data}
 
@@ -1688,11 +1784,13 @@ class DBRepo:
         if not project:
             return InternalResponse({}, "invalid project uuid", False)
 
-        shot_list: List[Shot] = (
-            Shot.objects.filter(project_id=project.id, is_disabled=False).order_by("shot_idx").all()
+        shot_list: List[Shot] = list(
+            Shot.objects.filter(project_id=project.id, is_disabled=False)
+            .select_related(*SHOT_DTO_RELATED_FIELDS)
+            .order_by("shot_idx")
+            .all()
         )
-        timing_list = Timing.objects.filter(is_disabled=False).all()
-        context = {"timing_list": timing_list}
+        context = self._get_shot_dto_context(shot_list)
 
         payload = {"data": ShotDto(shot_list, context=context, many=True).data}
 
@@ -1722,8 +1820,7 @@ class DBRepo:
 
         shot = Shot.objects.create(**shot_data)
 
-        timing_list = Timing.objects.filter(is_disabled=False).all()
-        context = {"timing_list": timing_list}
+        context = self._get_shot_dto_context([shot])
 
         payload = {"data": ShotDto(shot, context=context).data}
 
@@ -1751,8 +1848,7 @@ class DBRepo:
             setattr(shot, k, v)
 
         shot.save()
-        timing_list = Timing.objects.filter(is_disabled=False).all()
-        context = {"timing_list": timing_list}
+        context = self._get_shot_dto_context([shot])
 
         payload = {"data": ShotDto(shot, context=context).data}
 
@@ -1775,9 +1871,8 @@ class DBRepo:
 
         new_shot = Shot.objects.create(**shot_data)
 
-        timing_list = Timing.objects.filter(shot_id=shot.id, is_disabled=False).all()
-        new_timing_list = []
-        for timing in timing_list:
+        timing_list = Timing.objects.filter(shot_id=shot.id, is_disabled=False).order_by("order_key", "id")
+        for idx, timing in enumerate(timing_list):
             data = {
                 "model_id": timing.model_id,
                 "source_image_id": timing.source_image_id,
@@ -1788,13 +1883,12 @@ class DBRepo:
                 "alternative_images": timing.alternative_images,
                 "notes": timing.notes,
                 "clip_duration": timing.clip_duration,
-                "aux_frame_index": timing.aux_frame_index,
+                "aux_frame_index": idx,
             }
 
-            new_timing = Timing.objects.create(**data)
-            new_timing_list.append(new_timing)
+            Timing.objects.create(**data)
 
-        context = {"timing_list": new_timing_list}
+        context = self._get_shot_dto_context([new_shot])
 
         payload = {"data": ShotDto(new_shot, context=context).data}
 
@@ -1809,3 +1903,44 @@ class DBRepo:
         shot.save()
 
         return InternalResponse({}, "shot deleted successfully", True)
+
+    # batch
+    def get_entity_list_from_uuid_list(self, entity_uuid_map):
+        """
+        fetches the files, timings and shots of entity_uuid_map ({entity_type: uuid_list}) in one go,
+        returns {entity_type: [entity_data]}. uuids which are not found are left out
+        """
+        res = {}
+        file_uuid_list = entity_uuid_map.get(BatchEntityType.FILE.value, [])
+        if file_uuid_list:
+            file_list = InternalFileObject.objects.filter(
+                uuid__in=file_uuid_list, is_disabled=False
+            ).select_related(*FILE_DTO_RELATED_FIELDS)
+            res[BatchEntityType.FILE.value] = InternalFileDto(file_list, many=True).data
+
+        timing_uuid_list = entity_uuid_map.get(BatchEntityType.TIMING.value, [])
+        if timing_uuid_list:
+            # frame indexes are computed over all the frames of the shots involved
+            shot_id_list = Timing.objects.filter(uuid__in=timing_uuid_list, is_disabled=False).values_list(
+                "shot_id", flat=True
+            )
+            timing_list = with_frame_index(
+                Timing.objects.filter(shot_id__in=list(set(shot_id_list)), is_disabled=False)
+            ).select_related(*TIMING_DTO_RELATED_FIELDS, "shot__project__user")
+            timing_uuid_set = set(str(timing_uuid) for timing_uuid in timing_uuid_list)
+            timing_list = [timing for timing in timing_list if str(timing.uuid) in timing_uuid_set]
+            res[BatchEntityType.TIMING.value] = TimingDto(timing_list, many=True).data
+
+        shot_uuid_list = entity_uuid_map.get(BatchEntityType.SHOT.value, [])
+        if shot_uuid_list:
+            shot_list = list(
+                Shot.objects.filter(uuid__in=shot_uuid_list, is_disabled=False).select_related(
+                    *SHOT_DTO_RELATED_FIELDS
+                )
+            )
+            context = self._get_shot_dto_context(shot_list)
+            res[BatchEntityType.SHOT.value] = ShotDto(shot_list, context=context, many=True).data
+
+        payload = {"data": res}
+
+        return InternalResponse(payload, "entity list fetched", True)
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+ORDER_KEY_GAP = 1024.0
+
+
+def populate_order_key(apps, schema_editor):
+    # frames keep their current order, order_key = (position in the shot + 1) * gap
+    Timing = apps.get_model("backend", "Timing")
+    timing_list = Timing.objects.filter(is_disabled=False).order_by("shot_id", "aux_frame_index", "id")
+
+    updated_timing_list = []
+    prev_shot_id, idx = None, 0
+    for timing in timing_list.iterator():
+        idx = idx + 1 if timing.shot_id == prev_shot_id else 0
+        prev_shot_id = timing.shot_id
+        timing.order_key = (idx + 1) * ORDER_KEY_GAP
+        timing.aux_frame_index = idx
+        updated_timing_list.append(timing)
+
+    Timing.objects.bulk_update(updated_timing_list, ["order_key", "aux_frame_index"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0013_filter_keys_added"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="timing",
+            name="order_key",
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(populate_order_key, migrations.RunPython.noop),
+    ]
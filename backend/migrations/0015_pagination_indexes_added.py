@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0014_timing_order_key_added"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inferencelog",
+            index=models.Index(fields=["project", "status", "created_on"], name="inference_log_project_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="internalfileobject",
+            index=models.Index(
+                fields=["project", "tag", "type", "is_disabled", "created_on"], name="file_project_tag_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.1 on 2026-10-17 08:16
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0015_pagination_indexes_added"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="aimodel",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="aimodelparammap",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="appsetting",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="backuptiming",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="inferencelog",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="internalfileobject",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="lock",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="project",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="setting",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="shot",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="timing",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="uuid",
+            field=models.UUIDField(db_index=True, default=uuid.uuid4),
+        ),
+        migrations.AddIndex(
+            model_name="inferencelog",
+            index=models.Index(
+                condition=models.Q(("is_disabled", False)), fields=["status"], name="inference_log_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="internalfileobject",
+            index=models.Index(fields=["shot_uuid", "tag"], name="file_shot_uuid_idx"),
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 4.2.1 on 2026-10-17 08:39
+
+from django.db import migrations, models
+from django.db.models import Count
+import uuid
+
+
+UUID_MODEL_LIST = [
+    "aimodel",
+    "aimodelparammap",
+    "appsetting",
+    "backuptiming",
+    "inferencelog",
+    "internalfileobject",
+    "lock",
+    "project",
+    "setting",
+    "shot",
+    "timing",
+    "user",
+]
+
+
+def resolve_duplicate_uuids(apps, schema_editor):
+    """
+    the uuids have to be unique before the constraint is added. the disabled copies of a duplicated uuid
+    get a new uuid (nothing refers to them anymore), the migration is stopped if more than one active
+    row shares a uuid, as the references to them can't be told apart
+    """
+    for model_name in UUID_MODEL_LIST:
+        model = apps.get_model("backend", model_name)
+        duplicate_uuid_list = (
+            model.objects.order_by()
+            .values("uuid")
+            .annotate(count=Count("id"))
+            .filter(count__gt=1)
+            .values_list("uuid", flat=True)
+        )
+        for obj_uuid in list(duplicate_uuid_list):
+            obj_list = list(model.objects.filter(uuid=obj_uuid).order_by("is_disabled", "id"))
+            active_id_list = [obj.id for obj in obj_list if not obj.is_disabled]
+            if len(active_id_list) > 1:
+                raise ValueError(
+                    f"{model_name} rows {active_id_list} share the uuid {obj_uuid}, "
+                    "only one of them can be kept active before the uuids are made unique"
+                )
+
+            for obj in obj_list[1:]:
+                obj.uuid = uuid.uuid4()
+                obj.save(update_fields=["uuid"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0016_uuid_status_indexes_added"),
+    ]
+
+    operations = [
+        migrations.RunPython(resolve_duplicate_uuids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="aimodel",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="aimodelparammap",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="appsetting",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="backuptiming",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="inferencelog",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="internalfileobject",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="lock",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="project",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="setting",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="shot",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="timing",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="uuid",
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-17 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0017_uuid_unique_constraint_added"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="timing",
+            index=models.Index(fields=["shot", "order_key"], name="timing_shot_order_key_idx"),
+        ),
+    ]
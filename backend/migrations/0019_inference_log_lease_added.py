@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-17 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0018_timing_order_key_index_added"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inferencelog",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="inferencelog",
+            name="claimed_by",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+    ]
@@ -2,7 +2,8 @@ from django.db import models
 import uuid
 import json
 import requests
-from django.db.models import F
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
@@ -10,10 +11,11 @@ import urllib
 
 from shared.constants import SERVER, InferenceStatus, ServerType
 from shared.file_upload.s3 import generate_s3_url, is_s3_image_url
+from backend.uuid_resolver import uuid_resolver
 
 
 class BaseModel(models.Model):
-    uuid = models.UUIDField(default=uuid.uuid4)
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True)
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     is_disabled = models.BooleanField(default=False)
@@ -22,6 +24,12 @@ class BaseModel(models.Model):
         app_label = "backend"
         abstract = True
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # disabled rows are no longer valid foreign key targets
+        if self.is_disabled:
+            uuid_resolver.evict(type(self), self.uuid)
+
 
 class Lock(BaseModel):
     row_key = models.CharField(max_length=255, unique=True)
@@ -104,10 +112,18 @@ class InferenceLog(BaseModel):
     output_details = models.TextField(default="", blank=True)
     total_inference_time = models.FloatField(default=0)
     status = models.CharField(max_length=255, default="")  # success, failed, in_progress, queued
+    # lease of the local (gpu/sai) logs, the runner which is running it and its last heartbeat
+    claimed_by = models.CharField(max_length=255, default="", blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         app_label = "backend"
         db_table = "inference_log"
+        indexes = [
+            models.Index(fields=["project", "status", "created_on"], name="inference_log_project_idx"),
+            # pending/queued logs polled by the runner
+            models.Index(fields=["status"], condition=Q(is_disabled=False), name="inference_log_status_idx"),
+        ]
 
     def __init__(self, *args, **kwargs):
         super(InferenceLog, self).__init__(*args, **kwargs)
@@ -136,6 +152,12 @@ class InternalFileObject(BaseModel):
     class Meta:
         app_label = "backend"
         db_table = "file"
+        indexes = [
+            models.Index(
+                fields=["project", "tag", "type", "is_disabled", "created_on"], name="file_project_tag_idx"
+            ),
+            models.Index(fields=["shot_uuid", "tag"], name="file_shot_uuid_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         # if the online url is not an s3 url and it's a production environment then we need to save the file in s3
@@ -273,6 +295,10 @@ class Shot(BaseModel):
         super(Shot, self).save(*args, **kwargs)
 
 
+ORDER_KEY_GAP = 1024.0  # gap between the order keys of consecutive frames after renormalization
+MIN_ORDER_KEY_GAP = 1e-6  # the shot is renormalized once two neighbouring keys get this close
+
+
 class Timing(BaseModel):
     model = models.ForeignKey(AIModel, on_delete=models.DO_NOTHING, null=True)
     source_image = models.ForeignKey(
@@ -289,76 +315,98 @@ class Timing(BaseModel):
     alternative_images = models.TextField(default=None, null=True)
     notes = models.TextField(default="", blank=True)
     clip_duration = models.FloatField(default=None, null=True)
+    # frames are ordered by order_key inside a shot. aux_frame_index is the requested position when
+    # saving and is derived from order_key on read (the stored value can be stale)
     aux_frame_index = models.IntegerField(default=0)
+    order_key = models.FloatField(default=0)
 
     class Meta:
         app_label = "backend"
         db_table = "frame_timing"
+        indexes = [
+            # frames of a shot in order, used to place a frame between its neighbours
+            models.Index(fields=["shot", "order_key"], name="timing_shot_order_key_idx"),
+        ]
 
     def __init__(self, *args, **kwargs):
         super(Timing, self).__init__(*args, **kwargs)
         self.old_is_disabled = self.is_disabled
         self.old_aux_frame_index = self.aux_frame_index
-        self.old_shot = self.shot
-
-    def save(self, *args, **kwargs):
-        # TODO: updating details of every frame this way can be slow - implement a better strategy
-
-        # ------ handling aux_frame_index ------
-        # if the frame is being deleted (disabled)
-        if self.old_is_disabled != self.is_disabled and self.is_disabled:
-            timing_list = Timing.objects.filter(
-                shot_id=self.shot_id, aux_frame_index__gte=self.aux_frame_index, is_disabled=False
-            ).order_by("aux_frame_index")
+        # only storing the id, accessing self.shot here would fetch the shot for every timing loaded
+        self.old_shot_id = self.shot_id
+
+    def move_to_index(self, aux_frame_index):
+        # the stored aux_frame_index can be stale, so an explicitly requested index is always treated as a move
+        self.aux_frame_index = aux_frame_index
+        self.old_aux_frame_index = None
+
+    def get_frame_index(self):
+        # position of this frame in the shot
+        return (
+            Timing.objects.filter(shot_id=self.shot_id, is_disabled=False)
+            .filter(Q(order_key__lt=self.order_key) | Q(order_key=self.order_key, id__lt=self.id))
+            .count()
+        )
 
-            # shifting aux_frame_index of all frames after this frame one backwards
-            if self.is_disabled:
-                timing_list.update(aux_frame_index=F("aux_frame_index") - 1)
-            else:
-                # shifting aux_frame_index of all frames after this frame one forward
-                timing_list.update(aux_frame_index=F("aux_frame_index") + 1)
+    @staticmethod
+    def renormalize_order_keys(shot_id):
+        timing_list = list(
+            Timing.objects.filter(shot_id=shot_id, is_disabled=False).order_by("order_key", "id")
+        )
+        for idx, timing in enumerate(timing_list):
+            timing.order_key = (idx + 1) * ORDER_KEY_GAP
+            timing.aux_frame_index = idx
+
+        Timing.objects.bulk_update(timing_list, ["order_key", "aux_frame_index"], batch_size=500)
+
+    def get_order_key_at_index(self, aux_frame_index):
+        """
+        order key which places this frame at aux_frame_index, i.e. between the frames which will be
+        before and after it (ignoring this frame itself)
+        """
+        timing_list = Timing.objects.filter(shot_id=self.shot_id, is_disabled=False).order_by(
+            "order_key", "id"
+        )
+        if self.id:
+            timing_list = timing_list.exclude(id=self.id)
 
-        # if this is a newly created frame or assigned a new aux_frame_index (and not disabled)
-        if (not self.id or self.old_aux_frame_index != self.aux_frame_index) and not self.is_disabled:
-            if not self.id:
-                # shifting aux_frame_index of all frames after this frame one forward
-                if Timing.objects.filter(
-                    shot_id=self.shot_id, aux_frame_index=self.aux_frame_index, is_disabled=False
-                ).exists():
-                    timing_list = Timing.objects.filter(
-                        shot_id=self.shot_id, aux_frame_index__gte=self.aux_frame_index, is_disabled=False
-                    )
-                    timing_list.update(aux_frame_index=F("aux_frame_index") + 1)
-            elif self.old_aux_frame_index != self.aux_frame_index:
-                if self.aux_frame_index >= self.old_aux_frame_index:
-                    timings_to_move = Timing.objects.filter(
-                        shot_id=self.shot_id,
-                        aux_frame_index__gt=self.old_aux_frame_index,
-                        aux_frame_index__lte=self.aux_frame_index,
-                        is_disabled=False,
-                    ).order_by("aux_frame_index")
+        aux_frame_index = max(aux_frame_index, 0)
+        key_list = list(
+            timing_list.values_list("order_key", flat=True)[max(aux_frame_index - 1, 0) : aux_frame_index + 1]
+        )
+        if aux_frame_index == 0:
+            prev_key, next_key = None, (key_list[0] if key_list else None)
+        elif key_list:
+            prev_key, next_key = key_list[0], (key_list[1] if len(key_list) > 1 else None)
+        else:
+            # index is beyond the last frame
+            prev_key, next_key = timing_list.values_list("order_key", flat=True).last(), None
+
+        if prev_key is None and next_key is None:
+            return ORDER_KEY_GAP
+        if prev_key is None:
+            return next_key - ORDER_KEY_GAP
+        if next_key is None:
+            return prev_key + ORDER_KEY_GAP
+
+        if next_key - prev_key < MIN_ORDER_KEY_GAP:
+            Timing.renormalize_order_keys(self.shot_id)
+            return self.get_order_key_at_index(aux_frame_index)
+
+        return (prev_key + next_key) / 2
 
-                    # moving the frames between old and new index one step backwards
-                    timings_to_move.update(aux_frame_index=F("aux_frame_index") - 1)
-                else:
-                    timings_to_move = Timing.objects.filter(
-                        shot_id=self.shot_id,
-                        aux_frame_index__gte=self.aux_frame_index,
-                        aux_frame_index__lt=self.old_aux_frame_index,
-                        is_disabled=False,
-                    ).order_by("aux_frame_index")
-                    timings_to_move.update(aux_frame_index=F("aux_frame_index") + 1)
-
-        # --------------- handling shot change -------------------
-        if not self.is_disabled and self.id and self.old_shot != self.shot:
-            # moving all frames ahead of this frame, one step backwards
-            timing_list = Timing.objects.filter(
-                shot_id=self.old_shot.id, aux_frame_index__gt=self.aux_frame_index, is_disabled=False
-            ).order_by("aux_frame_index")
-            # changing the aux_frame_index of this frame to be the last one in the new shot
-            new_index = Timing.objects.filter(shot_id=self.shot.id, is_disabled=False).count()
-            self.aux_frame_index = new_index
-            timing_list.update(aux_frame_index=F("aux_frame_index") - 1)
+    def save(self, *args, **kwargs):
+        # moving/inserting a frame only updates its own order_key (no need to shift the frames after it)
+        if not self.is_disabled:
+            # --------------- handling shot change -------------------
+            if self.id and self.old_shot_id != self.shot_id:
+                # changing the aux_frame_index of this frame to be the last one in the new shot
+                self.aux_frame_index = Timing.objects.filter(shot_id=self.shot_id, is_disabled=False).count()
+                self.order_key = self.get_order_key_at_index(self.aux_frame_index)
+
+            # if this is a newly created frame or assigned a new aux_frame_index
+            elif not self.id or self.old_aux_frame_index != self.aux_frame_index:
+                self.order_key = self.get_order_key_at_index(self.aux_frame_index)
 
         # --------------- adding alternative images ----------
         if not (self.alternative_images and len(self.alternative_images)) and self.primary_image:
@@ -382,18 +430,36 @@ class Timing(BaseModel):
     @property
     def next_timing(self):
         next_timing = (
-            Timing.objects.filter(shot=self.shot, id__gt=self.id, is_disabled=False).order_by("id").first()
+            Timing.objects.filter(shot_id=self.shot_id, is_disabled=False)
+            .filter(Q(order_key__gt=self.order_key) | Q(order_key=self.order_key, id__gt=self.id))
+            .order_by("order_key", "id")
+            .first()
         )
         return next_timing
 
     @property
     def prev_timing(self):
         prev_timing = (
-            Timing.objects.filter(shot=self.shot, id__lt=self.id, is_disabled=False).order_by("id").first()
+            Timing.objects.filter(shot_id=self.shot_id, is_disabled=False)
+            .filter(Q(order_key__lt=self.order_key) | Q(order_key=self.order_key, id__lt=self.id))
+            .order_by("-order_key", "-id")
+            .first()
         )
         return prev_timing
 
 
+def with_frame_index(timing_list):
+    # annotates the position of every frame in its shot (frame_index, starting from 1), the queryset
+    # should contain all the enabled frames of the shots involved
+    return timing_list.annotate(
+        frame_index=Window(
+            expression=RowNumber(),
+            partition_by=[F("shot_id")],
+            order_by=[F("order_key").asc(), F("id").asc()],
+        )
+    )
+
+
 class AppSetting(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
     replicate_key = models.CharField(max_length=255, default="", blank=True)
@@ -0,0 +1,91 @@
+import math
+import threading
+import time
+from datetime import datetime
+
+from django.db.models import Count, Max, Q
+
+
+# complete recount interval, the rows inserted in between are counted incrementally
+COUNT_CACHE_TTL = 60
+COUNT_CACHE_MAX_SIZE = 1000
+CURSOR_SEPARATOR = "|"
+
+
+def encode_cursor(obj):
+    return f"{obj.created_on.isoformat()}{CURSOR_SEPARATOR}{obj.id}"
+
+
+def decode_cursor(cursor):
+    created_on, id = cursor.rsplit(CURSOR_SEPARATOR, 1)
+    return datetime.fromisoformat(created_on), int(id)
+
+
+def get_total_pages(count, data_per_page):
+    # same as the django paginator, an empty list has a single (empty) page
+    return max(1, math.ceil(count / data_per_page))
+
+
+def paginate_query(query, page, data_per_page, descending=True, cursor=None):
+    """
+    returns (item_list, next_cursor) of the page, ordered by (created_on, id). with the cursor of the
+    previous page the rows are fetched from the index position directly instead of skipping (offset)
+    over all the previous pages. next_cursor is None on the last page
+    """
+    query = query.order_by("-created_on", "-id") if descending else query.order_by("created_on", "id")
+    if cursor:
+        created_on, id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(Q(created_on__lt=created_on) | Q(created_on=created_on, id__lt=id))
+        else:
+            query = query.filter(Q(created_on__gt=created_on) | Q(created_on=created_on, id__gt=id))
+        item_list = list(query[: data_per_page + 1])
+    else:
+        offset = (page - 1) * data_per_page
+        item_list = list(query[offset : offset + data_per_page + 1])
+
+    # the extra row tells if there is a next page
+    next_cursor = encode_cursor(item_list[data_per_page - 1]) if len(item_list) > data_per_page else None
+    return item_list[:data_per_page], next_cursor
+
+
+class QueryCountCache:
+    """
+    approximate row counts of the paginated queries, so that a page view doesn't run a COUNT(*) over
+    the complete result. the rows inserted since the last count are added incrementally (through
+    id > last max id), the complete count is refreshed after ttl seconds to account for the updated
+    and deleted rows
+    """
+
+    def __init__(self, ttl=COUNT_CACHE_TTL, max_size=COUNT_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._count_dict = {}  # {key: (count, max_id, counted_at)}
+
+    def get_count(self, key, query):
+        query = query.order_by()
+        with self._lock:
+            cached = self._count_dict.get(key, None)
+
+        if cached and time.time() - cached[2] < self.ttl:
+            count, max_id, counted_at = cached
+            res = query.filter(id__gt=max_id).aggregate(count=Count("id"), max_id=Max("id"))
+            count, max_id = count + res["count"], res["max_id"] or max_id
+        else:
+            res = query.aggregate(count=Count("id"), max_id=Max("id"))
+            count, max_id, counted_at = res["count"], res["max_id"] or 0, time.time()
+
+        with self._lock:
+            if len(self._count_dict) >= self.max_size:
+                self._count_dict = {}
+            self._count_dict[key] = (count, max_id, counted_at)
+
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._count_dict = {}
+
+
+query_count_cache = QueryCountCache()
@@ -15,6 +15,30 @@ from backend.models import (
 )
 
 
+# relations that are serialized by the nested dtos, these should be passed to select_related
+# when fetching the objects so that serializing them doesn't lazy load every relation one by one
+FILE_DTO_RELATED_FIELDS = ["project__user", "inference_log__project__user", "inference_log__model__user"]
+SHOT_DTO_RELATED_FIELDS = ["project__user"] + ["main_clip__" + f for f in FILE_DTO_RELATED_FIELDS]
+TIMING_DTO_RELATED_FIELDS = ["model__user", "shot__project__user"] + [
+    file_field + "__" + f
+    for file_field in ["source_image", "mask", "canny_image", "primary_image"]
+    for f in FILE_DTO_RELATED_FIELDS
+]
+# the slim dtos only reference the relations by their uuid, so the large text fields aren't loaded
+SLIM_FILE_DTO_RELATED_FIELDS = ["project", "inference_log"]
+SLIM_FILE_DTO_DEFERRED_FIELDS = ["inference_log__input_params", "inference_log__output_details"]
+SLIM_TIMING_DTO_RELATED_FIELDS = ["shot"] + [
+    file_field + "__" + f
+    for file_field in ["source_image", "mask", "canny_image", "primary_image"]
+    for f in SLIM_FILE_DTO_RELATED_FIELDS
+]
+SLIM_TIMING_DTO_DEFERRED_FIELDS = [
+    file_field + "__" + f
+    for file_field in ["source_image", "mask", "canny_image", "primary_image"]
+    for f in SLIM_FILE_DTO_DEFERRED_FIELDS
+]
+
+
 class UserDto(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -96,6 +120,28 @@ class InternalFileDto(serializers.ModelSerializer):
         )
 
 
+# projection of InternalFileDto for list views, the missing relations are fetched by the
+# InternalFileObject when they are accessed
+class SlimInternalFileDto(serializers.ModelSerializer):
+    project_uuid = serializers.CharField(source="project.uuid", default=None)
+    inference_log_uuid = serializers.CharField(source="inference_log.uuid", default=None)
+
+    class Meta:
+        model = InternalFileObject
+        fields = (
+            "uuid",
+            "name",
+            "local_path",
+            "type",
+            "hosted_url",
+            "created_on",
+            "tag",
+            "shot_uuid",
+            "project_uuid",
+            "inference_log_uuid",
+        )
+
+
 class BasicShotDto(serializers.ModelSerializer):
     project = ProjectDto()
 
@@ -113,6 +159,12 @@ class BasicShotDto(serializers.ModelSerializer):
         )
 
 
+# the stored aux_frame_index can be stale, the frame order is defined by order_key
+def get_timing_frame_index(timing):
+    frame_index = getattr(timing, "frame_index", None)  # annotated by with_frame_index
+    return frame_index - 1 if frame_index is not None else timing.get_frame_index()
+
+
 class TimingDto(serializers.ModelSerializer):
     model = AIModelDto()
     source_image = InternalFileDto()
@@ -120,6 +172,7 @@ class TimingDto(serializers.ModelSerializer):
     canny_image = InternalFileDto()
     primary_image = InternalFileDto()
     shot = BasicShotDto()
+    aux_frame_index = serializers.SerializerMethodField()
 
     class Meta:
         model = Timing
@@ -137,6 +190,37 @@ class TimingDto(serializers.ModelSerializer):
             "shot",
         )
 
+    def get_aux_frame_index(self, obj):
+        return get_timing_frame_index(obj)
+
+
+# projection of TimingDto for list views
+class SlimTimingDto(serializers.ModelSerializer):
+    source_image = SlimInternalFileDto()
+    mask = SlimInternalFileDto()
+    canny_image = SlimInternalFileDto()
+    primary_image = SlimInternalFileDto()
+    shot_uuid = serializers.CharField(source="shot.uuid", default=None)
+    aux_frame_index = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Timing
+        fields = (
+            "uuid",
+            "source_image",
+            "mask",
+            "canny_image",
+            "primary_image",
+            "alternative_images",
+            "notes",
+            "aux_frame_index",
+            "created_on",
+            "shot_uuid",
+        )
+
+    def get_aux_frame_index(self, obj):
+        return get_timing_frame_index(obj)
+
 
 class AppSettingDto(serializers.ModelSerializer):
     user = UserDto()
@@ -202,15 +286,15 @@ class ShotDto(serializers.ModelSerializer):
             "main_clip",
         )
 
+    # timing_map ({shot_id: [timings]}) and interpolated_clip_map ({file_uuid: file}) are
+    # passed in the context, check DBRepo._get_shot_dto_context
     def get_timing_list(self, obj):
-        timing_list = self.context.get("timing_list", [])
-        timing_list = [
-            TimingDto(timing).data for timing in timing_list if str(timing.shot.uuid) == str(obj.uuid)
-        ]
+        timing_list = self.context.get("timing_map", {}).get(obj.id, [])
+        timing_list = [TimingDto(timing).data for timing in timing_list]
         timing_list.sort(key=lambda x: x["aux_frame_index"])
         return timing_list
 
     def get_interpolated_clip_list(self, obj):
         id_list = json.loads(obj.interpolated_clip_list) if obj.interpolated_clip_list else []
-        file_list = InternalFileObject.objects.filter(uuid__in=id_list, is_disabled=False).all()
-        return [InternalFileDto(file).data for file in file_list]
+        clip_map = self.context.get("interpolated_clip_map", {})
+        return [InternalFileDto(clip_map[str(id)]).data for id in id_list if str(id) in clip_map]
@@ -0,0 +1,144 @@
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+UUID_RESOLVER_MAX_SIZE = 10000
+# secs for which a resolved id is reused across requests, rows disabled by other processes (or through
+# queryset updates) are only noticed once their entry expires
+UUID_RESOLVER_TTL = 30
+
+# {(db_table, uuid): id} resolved during the current request (check UUIDResolver.request_scope)
+_request_id_dict = contextvars.ContextVar("uuid_resolver_request_id_dict", default=None)
+
+
+def normalize_uuid(value):
+    # uuids are passed both as UUID objects and strings, None if the value is not a valid uuid
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+class UUIDResolver:
+    """
+    resolves the uuids of the foreign keys passed to the writes into their ids. all the uuids of a
+    write are resolved together, with a single query per table for the ones which aren't cached. the
+    resolved ids are cached at two levels, for the rest of the current request (request_scope) and in a
+    bounded lru cache shared by the process for ttl secs. entries are evicted when their row is disabled
+    through save(), the writes which disable rows in bulk have to evict them explicitly (evict_list)
+    """
+
+    def __init__(self, max_size=UUID_RESOLVER_MAX_SIZE, ttl=UUID_RESOLVER_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._id_dict = OrderedDict()  # {(db_table, uuid): (id, resolved_at)}
+
+    @contextmanager
+    def request_scope(self):
+        # the ids resolved inside this block are reused till it ends (a script run, a runner iteration..)
+        token = _request_id_dict.set({})
+        try:
+            yield
+        finally:
+            _request_id_dict.reset(token)
+
+    def resolve(self, model, uuid_list):
+        # returns {uuid: id} of the uuids which belong to an active row of the model
+        table = model._meta.db_table
+        request_id_dict = _request_id_dict.get()
+        res, missing_uuid_list = {}, []
+        current_time = time.time()
+        with self._lock:
+            for value in set(filter(None, map(normalize_uuid, uuid_list))):
+                key = (table, value)
+                if request_id_dict is not None and key in request_id_dict:
+                    res[value] = request_id_dict[key]
+                elif key in self._id_dict and current_time - self._id_dict[key][1] < self.ttl:
+                    self._id_dict.move_to_end(key)
+                    res[value] = self._id_dict[key][0]
+                else:
+                    missing_uuid_list.append(value)
+
+        if missing_uuid_list:
+            fetched_list = model.objects.filter(uuid__in=missing_uuid_list, is_disabled=False).values_list(
+                "uuid", "id"
+            )
+            fetched_dict = {str(obj_uuid): obj_id for obj_uuid, obj_id in fetched_list}
+            res.update(fetched_dict)
+
+            with self._lock:
+                for value, obj_id in fetched_dict.items():
+                    self._id_dict.pop((table, value), None)
+                    self._id_dict[(table, value)] = (obj_id, current_time)
+                while len(self._id_dict) > self.max_size:
+                    self._id_dict.popitem(last=False)
+
+        if request_id_dict is not None:
+            request_id_dict.update({(table, value): obj_id for value, obj_id in res.items()})
+
+        return res
+
+    def resolve_fields(self, data, field_dict):
+        """
+        field_dict: {field: model}, the fields of data which are present (and not None) are resolved
+        with a single lookup per model. returns ({field: id}, None) or (None, field) with the first
+        field whose uuid is invalid
+        """
+        res_list, invalid_field = self.resolve_fields_list([data], field_dict)
+        return (res_list[0], None) if res_list else (None, invalid_field)
+
+    def resolve_fields_list(self, data_list, field_dict):
+        # same as resolve_fields for many rows, the uuids of all the rows are resolved together
+        model_uuid_dict = {}
+        for field, model in field_dict.items():
+            for data in data_list:
+                if data.get(field, None) is not None:
+                    model_uuid_dict.setdefault(model, []).append(data[field])
+
+        # the lookups of this write, shared by the fields which point to the same table
+        resolved_dict = {
+            model: self.resolve(model, uuid_list) for model, uuid_list in model_uuid_dict.items()
+        }
+
+        res_list = []
+        for data in data_list:
+            res = {}
+            for field, model in field_dict.items():
+                if data.get(field, None) is None:
+                    continue
+
+                obj_id = resolved_dict[model].get(normalize_uuid(data[field]), None)
+                if obj_id is None:
+                    return None, field
+
+                res[field] = obj_id
+
+            res_list.append(res)
+
+        return res_list, None
+
+    def evict(self, model, obj_uuid):
+        self.evict_list(model, [obj_uuid])
+
+    def evict_list(self, model, uuid_list):
+        request_id_dict = _request_id_dict.get()
+        with self._lock:
+            for obj_uuid in uuid_list:
+                key = (model._meta.db_table, normalize_uuid(obj_uuid))
+                self._id_dict.pop(key, None)
+                if request_id_dict is not None:
+                    request_id_dict.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._id_dict = OrderedDict()
+        if _request_id_dict.get() is not None:
+            _request_id_dict.get().clear()
+
+
+uuid_resolver = UUIDResolver()
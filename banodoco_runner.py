@@ -5,6 +5,7 @@ import signal
 import sys
 import time
 import uuid
+from urllib.parse import urlparse
 import psutil
 import requests
 import socket
@@ -14,6 +15,7 @@ import sentry_sdk
 import setproctitle
 from dotenv import load_dotenv
 import django
+from backend.uuid_resolver import uuid_resolver
 from shared.constants import (
     COMFY_PORT,
     LOCAL_DATABASE_NAME,
@@ -28,9 +30,9 @@ from shared.logging.constants import LoggingType
 from shared.logging.logging import app_logger
 from shared.utils import get_file_type
 from ui_components.methods.file_methods import (
-    get_file_bytes_and_extension,
+    generate_temp_file,
     load_from_env,
-    save_or_host_file_bytes,
+    save_or_host_local_file,
     save_to_env,
 )
 from utils.common_utils import acquire_lock, release_lock
@@ -40,6 +42,10 @@ from utils.ml_processor.constants import ComfyWorkflow, replicate_status_map
 from utils.constants import RUNNER_PROCESS_NAME, RUNNER_PROCESS_PORT, AUTH_TOKEN, REFRESH_AUTH_TOKEN
 from utils.ml_processor.gpu.utils import is_comfy_runner_present, predict_gpu_output, setup_comfy_runner
 from utils.ml_processor.sai.utils import predict_sai_output
+from utils.runner.job_executor import InferenceJobExecutor, JobLaneType
+from utils.runner.job_lease import LOCAL_JOB_LEASE_TTL, LocalJobLease
+from utils.runner.replicate_poller import ReplicatePredictionPoller
+from utils.runner.wakeup import AdaptivePollInterval, start_wakeup_listener
 
 
 load_dotenv()
@@ -49,8 +55,15 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_settings")
 django.setup()
 SERVER = os.getenv("SERVER", "development")
 
-REFRESH_FREQUENCY = 2  # refresh every 2 seconds
+REFRESH_FREQUENCY = 2  # refresh every 2 seconds (while there are pending jobs)
+MAX_IDLE_REFRESH_FREQUENCY = 30  # refresh interval grows up to 30 seconds while idle
 MAX_APP_RETRY_CHECK = 3  # if the app is not running after 3 retries then the script will stop
+REMOTE_LANE_WORKERS = int(os.getenv("RUNNER_REMOTE_WORKERS", 8))  # concurrent replicate/sai jobs
+LOCAL_GPU_LANE_WORKERS = 1  # comfy jobs are run one at a time
+METRICS_LOG_FREQUENCY = 60  # logging lane metrics every 60 seconds
+LAST_METRICS_LOG_TIME = 0
+LEASE_CHECK_FREQUENCY = LOCAL_JOB_LEASE_TTL // 5  # checking for expired job leases every minute
+LAST_LEASE_CHECK_TIME = 0
 
 TERMINATE_SCRIPT = False
 
@@ -68,11 +81,24 @@ else:
 
 sentry_sdk.init(environment=SENTRY_ENV, dsn=SENTRY_DSN, traces_sample_rate=0)
 
+wakeup_listener = None
+job_executor = InferenceJobExecutor(
+    {
+        JobLaneType.REMOTE.value: REMOTE_LANE_WORKERS,
+        JobLaneType.LOCAL_GPU.value: LOCAL_GPU_LANE_WORKERS,
+    },
+    on_result=lambda: wake_main_loop(),
+)
+replicate_poller = ReplicatePredictionPoller(max_workers=REMOTE_LANE_WORKERS)
+job_lease = LocalJobLease()
+
 
 def handle_termination(signal, frame):
     print("Received termination signal. Cleaning up...")
     global TERMINATE_SCRIPT
     TERMINATE_SCRIPT = True
+    job_executor.shutdown(wait=False)
+    replicate_poller.shutdown()
     sys.exit(0)
 
 
@@ -83,24 +109,27 @@ def main():
     if SERVER != "development" and HOSTED_BACKGROUND_RUNNER_MODE in [False, "False"]:
         return
 
+    global wakeup_listener
     retries = MAX_APP_RETRY_CHECK
 
-    # in case of windows opening a dummy socket (to signal that the process has started)
-    if platform.system() == "Windows" and OFFLINE_MODE:
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_socket.bind(("localhost", RUNNER_PROCESS_PORT))
-        server_socket.listen(100)  # hacky fix
+    # the app pings this socket whenever a log is queued, on windows it also signals
+    # that the process has started
+    wakeup_listener = start_wakeup_listener(RUNNER_PROCESS_PORT)
+    poll_interval = AdaptivePollInterval(REFRESH_FREQUENCY, MAX_IDLE_REFRESH_FREQUENCY)
 
     print("runner running")
     while True:
         if TERMINATE_SCRIPT:
+            job_executor.shutdown(wait=False)
+            replicate_poller.shutdown()
             stop_server(COMFY_PORT)
             return
 
         if SERVER == "development":
             if not is_app_running():
                 if retries <= 0:
+                    job_executor.shutdown(wait=False)
+                    replicate_poller.shutdown()
                     stop_server(COMFY_PORT)
                     print("runner stopped")
                     return
@@ -108,10 +137,34 @@ def main():
             else:
                 retries = min(retries + 1, MAX_APP_RETRY_CHECK)
 
-        time.sleep(REFRESH_FREQUENCY)
+        if wakeup_listener:
+            wakeup_listener.wait(poll_interval.current)
+        else:
+            time.sleep(poll_interval.current)
+
         if HOSTED_BACKGROUND_RUNNER_MODE not in [False, "False"]:
             validate_admin_auth_token()
-        check_and_update_db()
+
+        # heartbeat of the local jobs running in this process, so that other runners don't requeue them
+        try:
+            job_lease.refresh()
+        except Exception as e:
+            app_logger.log(LoggingType.ERROR, f"unable to refresh the job leases: {str(e)}")
+
+        # polling frequently only while there is some work pending, the wakeup ping
+        # brings the runner back as soon as something new is queued
+        with uuid_resolver.request_scope():
+            has_pending_work = check_and_update_db()
+
+        if has_pending_work:
+            poll_interval.reset()
+        else:
+            poll_interval.backoff()
+
+
+def wake_main_loop():
+    if wakeup_listener:
+        wakeup_listener.wake()
 
 
 # creates a
@@ -166,23 +219,30 @@ def is_app_running():
 
 
 def update_cache_dict(
-    inference_type, log, timing_uuid, shot_uuid, timing_update_list, shot_update_list, gallery_update_list
+    inference_type,
+    project_uuid,
+    timing_uuid,
+    shot_uuid,
+    timing_update_list,
+    shot_update_list,
+    gallery_update_list,
 ):
+    project_uuid = str(project_uuid)
     if inference_type in [
         InferenceType.FRAME_TIMING_IMAGE_INFERENCE.value,
         InferenceType.FRAME_INPAINTING.value,
     ]:
-        if str(log.project.uuid) not in timing_update_list:
-            timing_update_list[str(log.project.uuid)] = []
-        timing_update_list[str(log.project.uuid)].append(timing_uuid)
+        if project_uuid not in timing_update_list:
+            timing_update_list[project_uuid] = []
+        timing_update_list[project_uuid].append(timing_uuid)
 
     elif inference_type == InferenceType.GALLERY_IMAGE_GENERATION.value:
-        gallery_update_list[str(log.project.uuid)] = True
+        gallery_update_list[project_uuid] = True
 
     elif inference_type == InferenceType.FRAME_INTERPOLATION.value:
-        if str(log.project.uuid) not in shot_update_list:
-            shot_update_list[str(log.project.uuid)] = []
-        shot_update_list[str(log.project.uuid)].append(shot_uuid)
+        if project_uuid not in shot_update_list:
+            shot_update_list[project_uuid] = []
+        shot_update_list[project_uuid].append(shot_uuid)
 
 
 def find_process_by_port(port):
@@ -217,6 +277,336 @@ def format_model_output(output, model_display_name):
         return [output[-1]]
 
 
+def close_db_connection(func):
+    # worker threads get their own db connection from django, closing it once the job is done
+    def wrapper(*args, **kwargs):
+        from django.db import connection
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connection.close()
+
+    return wrapper
+
+
+def is_local_log(log):
+    input_params = json.loads(log.input_params)
+    return bool(
+        input_params.get(InferenceParamType.GPU_INFERENCE.value, None)
+        or input_params.get(InferenceParamType.SAI_INFERENCE.value, None)
+    )
+
+
+def requeue_stale_local_jobs():
+    """
+    local (gpu/sai) logs are only run once claimed from the queued state, the ones left in_progress
+    by a runner that crashed or was restarted (and so stopped refreshing their lease) are moved back
+    to the queue so that they are run again
+    """
+    global LAST_LEASE_CHECK_TIME
+    if time.time() - LAST_LEASE_CHECK_TIME < LEASE_CHECK_FREQUENCY:
+        return
+
+    LAST_LEASE_CHECK_TIME = time.time()
+    requeued_count = job_lease.requeue_expired(is_local_log)
+    if requeued_count:
+        app_logger.log(LoggingType.DEBUG, f"requeued {requeued_count} interrupted jobs")
+
+
+def get_log_lock_key(log_uuid):
+    return "inference_log_" + str(log_uuid)
+
+
+def complete_inference_log(log, output_details, destination_path_list, total_inference_time):
+    """
+    marks the log as completed and processes the output into the origin of the inference.
+    returns the info needed for updating the app cache, None if the log was cancelled in the meantime
+    """
+    from backend.models import InferenceLog
+    from ui_components.methods.common_methods import process_inference_output
+
+    # fetching the current status again (as this could have been cancelled)
+    log = InferenceLog.objects.filter(id=log.id).first()
+    if log.status in [InferenceStatus.FAILED.value, InferenceStatus.CANCELED.value]:
+        return None
+
+    output = destination_path_list[0] if len(destination_path_list) == 1 else destination_path_list
+    output_details["output"] = output
+    update_data = {
+        "status": InferenceStatus.COMPLETED.value,
+        "output_details": json.dumps(output_details),
+        "total_inference_time": total_inference_time,
+    }
+
+    InferenceLog.objects.filter(id=log.id).update(**update_data)
+    origin_data = json.loads(log.input_params).get(InferenceParamType.ORIGIN_DATA.value, {})
+    origin_data["output"] = output
+    origin_data["log_uuid"] = log.uuid
+    print("processing inference output")
+
+    process_inference_output(**origin_data)
+    return (
+        origin_data.get("inference_type", ""),
+        log.project.uuid,
+        origin_data.get("timing_uuid", None),
+        origin_data.get("shot_uuid", None),
+    )
+
+
+def poll_replicate_logs(log_list, replicate_key):
+    """
+    polls the replicate predictions of all the logs in a single batch. status changes are written
+    in one bulk update and the completed predictions are handed over to the workers for processing
+    """
+    from backend.models import InferenceLog
+
+    prediction_log_map = {}
+    for log in log_list:
+        input_params = json.loads(log.input_params)
+        replicate_data = input_params.get(InferenceParamType.REPLICATE_INFERENCE.value, None)
+        prediction_log_map[replicate_data["prediction_id"]] = log
+
+    # the predictions are as old as their logs, also across runner restarts
+    result_map = replicate_poller.poll(
+        list(prediction_log_map.keys()),
+        replicate_key,
+        {prediction_id: log.created_on.timestamp() for prediction_id, log in prediction_log_map.items()},
+    )
+
+    updated_log_list = []
+    for prediction_id, result in result_map.items():
+        log = prediction_log_map[prediction_id]
+        log_status = (
+            replicate_status_map[result["status"]]
+            if result["status"] in replicate_status_map
+            else InferenceStatus.IN_PROGRESS.value
+        )
+
+        if log_status == InferenceStatus.COMPLETED.value:
+            if "output" in result and result["output"]:
+                job_executor.submit(
+                    JobLaneType.REMOTE.value, log.id, process_replicate_output, log.id, result
+                )
+                continue
+
+            log_status = InferenceStatus.FAILED.value
+
+        if log_status != log.status:
+            log.status = log_status
+            updated_log_list.append(log)
+
+    # logs that have been cancelled/failed in the meantime are left untouched
+    if updated_log_list:
+        InferenceLog.objects.filter(
+            status__in=[InferenceStatus.QUEUED.value, InferenceStatus.IN_PROGRESS.value]
+        ).bulk_update(updated_log_list, ["status"])
+
+
+@close_db_connection
+def process_replicate_output(log_id, result):
+    # multiple runners can poll the same prediction, the lock makes sure only one processes the output
+    from backend.models import InferenceLog
+
+    log = InferenceLog.objects.filter(id=log_id, is_disabled=False).first()
+    if not log:
+        return None
+
+    lock_key = get_log_lock_key(log.uuid)
+    if not acquire_lock(lock_key):
+        return None
+
+    try:
+        # fetching the current status again (as this could have been processed or cancelled)
+        log = InferenceLog.objects.filter(id=log_id).first()
+        if log.status not in [InferenceStatus.QUEUED.value, InferenceStatus.IN_PROGRESS.value]:
+            return None
+
+        return save_replicate_output(log, result)
+    finally:
+        release_lock(lock_key)
+
+
+def save_replicate_output(log, result):
+    from backend.models import InferenceLog
+
+    log_status = InferenceStatus.COMPLETED.value
+    output_details = json.loads(log.output_details)
+    output_details["output"] = (
+        result["output"]
+        if (
+            output_details["version"] == "a4a8bafd6089e1716b06057c42b19378250d008b80fe87caa5cd36d40c1eda90"
+            or isinstance(result["output"], str)
+        )
+        else [result["output"][-1]]
+    )
+
+    # updating the output url (to prevent file path errors in the runtime)
+    output = output_details["output"]
+    output = output[0] if isinstance(output, list) else output
+    file_ext = os.path.splitext(urlparse(output).path)[1]
+    file_path = "videos/temp/" + str(uuid.uuid4()) + file_ext
+    # streaming the output to the disk (it can be a large video)
+    local_file_path, move = (
+        (generate_temp_file(output, file_ext).name, True) if urlparse(output).scheme else (output, False)
+    )
+    file_path = save_or_host_local_file(local_file_path, file_path, file_ext, move=move) or file_path
+    output_details["output"] = file_path
+
+    update_data = {"status": log_status, "output_details": json.dumps(output_details)}
+    if "metrics" in result and result["metrics"] and "predict_time" in result["metrics"]:
+        update_data["total_inference_time"] = float(result["metrics"]["predict_time"])
+
+    InferenceLog.objects.filter(id=log.id).update(**update_data)
+    # origin data is attached after the log is queued, so reading it from the latest copy
+    log = InferenceLog.objects.filter(id=log.id).first()
+    origin_data = json.loads(log.input_params).get(InferenceParamType.ORIGIN_DATA.value, {})
+    if not origin_data:
+        return None
+
+    from ui_components.methods.common_methods import process_inference_output
+
+    try:
+        origin_data["output"] = output_details["output"]
+        origin_data["log_uuid"] = log.uuid
+        print("processing inference output")
+        process_inference_output(**origin_data)
+        return (
+            origin_data.get("inference_type", ""),
+            log.project.uuid,
+            origin_data.get("timing_uuid", None),
+            origin_data.get("shot_uuid", None),
+        )
+
+    except Exception as e:
+        app_logger.log(LoggingType.ERROR, f"Error: {e}")
+        output_details["error"] = str(e)
+        InferenceLog.objects.filter(id=log.id).update(
+            status=InferenceStatus.FAILED.value,
+            output_details=json.dumps(output_details),
+        )
+        sentry_sdk.capture_exception(e)
+
+    return None
+
+
+@close_db_connection
+def process_gpu_log(log_id):
+    from backend.models import InferenceLog
+
+    if not job_lease.claim(log_id):
+        return None
+
+    log = InferenceLog.objects.filter(id=log_id).first()
+    try:
+        data = json.loads(json.loads(log.input_params)[InferenceParamType.GPU_INFERENCE.value])
+        setup_comfy_runner()
+
+        start_time = time.time()
+        output = predict_gpu_output(
+            data["workflow_input"],
+            data["file_path_list"],
+            data["output_node_ids"],
+            data.get("extra_model_list", []),
+            data.get("ignore_model_list", []),
+        )
+        end_time = time.time()
+
+        res_output = format_model_output(output, log.model_name)
+        destination_path_list = []
+        for output in res_output:
+            destination_path = "./videos/temp/" + str(uuid.uuid4()) + "." + output.split(".")[-1]
+            shutil.copy2("./output/" + output, destination_path)
+            destination_path_list.append(destination_path)
+
+        output_details = json.loads(log.output_details)
+        return complete_inference_log(log, output_details, destination_path_list, end_time - start_time)
+
+    except Exception as e:
+        print("error occured: ", str(e))
+        # sentry_sdk.capture_exception(e)
+        traceback.print_exc()
+        InferenceLog.objects.filter(id=log.id).update(status=InferenceStatus.FAILED.value)
+    finally:
+        job_lease.release(log_id)
+
+    return None
+
+
+@close_db_connection
+def process_sai_log(log_id):
+    from backend.models import InferenceLog
+
+    if not job_lease.claim(log_id):
+        return None
+
+    log = InferenceLog.objects.filter(id=log_id).first()
+    try:
+        data = json.loads(log.input_params)[InferenceParamType.SAI_INFERENCE.value]
+
+        start_time = time.time()
+        output = predict_sai_output(data)
+        end_time = time.time()
+
+        destination_path = "./videos/temp/" + str(uuid.uuid4()) + "." + output.split(".")[-1]
+        shutil.copy2(output, destination_path)
+
+        output_details = json.loads(log.output_details)
+        return complete_inference_log(log, output_details, [destination_path], end_time - start_time)
+
+    except Exception as e:
+        print("error occured: ", str(e))
+        # sentry_sdk.capture_exception(e)
+        traceback.print_exc()
+        InferenceLog.objects.filter(id=log.id).update(status=InferenceStatus.FAILED.value)
+    finally:
+        job_lease.release(log_id)
+
+    return None
+
+
+def dispatch_inference_log(log, replicate_log_list):
+    """
+    hands the log over to the workers (or the replicate poller), returns True if it is now being
+    worked on by this runner
+    """
+    from backend.models import InferenceLog
+
+    # jobs already picked up in a previous tick are still being worked on
+    if job_executor.is_in_flight(log.id):
+        return True
+
+    input_params = json.loads(log.input_params)
+    if input_params.get(InferenceParamType.REPLICATE_INFERENCE.value, None):
+        # replicate logs are polled together after all the logs are dispatched
+        replicate_log_list.append(log)
+        return True
+    elif input_params.get(InferenceParamType.GPU_INFERENCE.value, None):
+        # local jobs are claimed by moving them out of the queued state
+        if log.status == InferenceStatus.QUEUED.value:
+            return job_executor.submit(JobLaneType.LOCAL_GPU.value, log.id, process_gpu_log, log.id)
+    elif input_params.get(InferenceParamType.SAI_INFERENCE.value, None):
+        if log.status == InferenceStatus.QUEUED.value:
+            return job_executor.submit(JobLaneType.REMOTE.value, log.id, process_sai_log, log.id)
+    else:
+        # if replicate/gpu data is not present then removing the status
+        InferenceLog.objects.filter(id=log.id).update(status="")
+
+    # local logs in progress which aren't in flight here are being run by another runner
+    return False
+
+
+def log_executor_metrics():
+    global LAST_METRICS_LOG_TIME
+    if time.time() - LAST_METRICS_LOG_TIME < METRICS_LOG_FREQUENCY:
+        return
+
+    LAST_METRICS_LOG_TIME = time.time()
+    for lane_name, metrics in job_executor.metrics().items():
+        app_logger.log(LoggingType.DEBUG, f"runner lane {lane_name}: {json.dumps(metrics)}")
+    app_logger.log(LoggingType.DEBUG, f"replicate poller: {json.dumps(replicate_poller.metrics)}")
+
+
 def check_and_update_db():
     # print("updating logs")
     from backend.models import InferenceLog, AppSetting, User
@@ -231,257 +621,47 @@ def check_and_update_db():
     except Exception as e:
         app_logger.log(LoggingType.DEBUG, "db creation pending..")
         time.sleep(3)
-        return
+        return False
 
     if not user:
-        return
+        return False
 
     app_setting = AppSetting.objects.filter(user_id=user.id, is_disabled=False).first()
     replicate_key = app_setting.replicate_key_decrypted
     if not replicate_key:
         # app_logger.log(LoggingType.ERROR, "Replicate key not found")
-        return
+        return False
+
+    requeue_stale_local_jobs()
 
     log_list = InferenceLog.objects.filter(
         status__in=[InferenceStatus.QUEUED.value, InferenceStatus.IN_PROGRESS.value], is_disabled=False
     ).all()
 
+    replicate_log_list = []
+    dispatched = False
+    for log in log_list:
+        dispatched = dispatch_inference_log(log, replicate_log_list) or dispatched
+
+    if replicate_log_list:
+        poll_replicate_logs(replicate_log_list, replicate_key)
+
     # these items will updated in the cache when the app refreshes the next time
     timing_update_list = {}  # {project_id: [timing_uuids]}
     gallery_update_list = {}  # {project_id: True/False}
     shot_update_list = {}  # {project_id: [shot_uuids]}
 
-    for log in log_list:
-        input_params = json.loads(log.input_params)
-        replicate_data = input_params.get(InferenceParamType.REPLICATE_INFERENCE.value, None)
-        local_gpu_data = input_params.get(InferenceParamType.GPU_INFERENCE.value, None)
-        sai_data = input_params.get(InferenceParamType.SAI_INFERENCE.value, None)
-        if replicate_data:
-            prediction_id = replicate_data["prediction_id"]
-
-            url = "https://api.replicate.com/v1/predictions/" + prediction_id
-            headers = {"Authorization": f"Token {replicate_key}"}
-
-            try:
-                response = requests.get(url, headers=headers)
-            except Exception as e:
-                sentry_sdk.capture_exception(e)
-                response = None
-
-            if response and response.status_code in [200, 201]:
-                # print("response: ", response)
-                result = response.json()
-                log_status = (
-                    replicate_status_map[result["status"]]
-                    if result["status"] in replicate_status_map
-                    else InferenceStatus.IN_PROGRESS.value
-                )
-                output_details = json.loads(log.output_details)
-
-                if log_status == InferenceStatus.COMPLETED.value:
-                    if "output" in result and result["output"]:
-                        output_details["output"] = (
-                            result["output"]
-                            if (
-                                output_details["version"]
-                                == "a4a8bafd6089e1716b06057c42b19378250d008b80fe87caa5cd36d40c1eda90"
-                                or isinstance(result["output"], str)
-                            )
-                            else [result["output"][-1]]
-                        )
-
-                        # updating the output url (to prevent file path errors in the runtime)
-                        output = output_details["output"]
-                        output = output[0] if isinstance(output, list) else output
-                        file_bytes, file_ext = get_file_bytes_and_extension(output)
-                        file_path = "videos/temp/" + str(uuid.uuid4()) + "." + file_ext
-                        file_path = save_or_host_file_bytes(file_bytes, file_path, file_ext) or file_path
-                        output_details["output"] = file_path
-
-                        update_data = {"status": log_status, "output_details": json.dumps(output_details)}
-                        if "metrics" in result and result["metrics"] and "predict_time" in result["metrics"]:
-                            update_data["total_inference_time"] = float(result["metrics"]["predict_time"])
-
-                        InferenceLog.objects.filter(id=log.id).update(**update_data)
-                        origin_data = json.loads(log.input_params).get(
-                            InferenceParamType.ORIGIN_DATA.value, {}
-                        )
-                        if origin_data and log_status == InferenceStatus.COMPLETED.value:
-                            from ui_components.methods.common_methods import process_inference_output
-
-                            try:
-                                origin_data["output"] = output_details["output"]
-                                origin_data["log_uuid"] = log.uuid
-                                print("processing inference output")
-                                process_inference_output(**origin_data)
-                                timing_uuid, shot_uuid = origin_data.get(
-                                    "timing_uuid", None
-                                ), origin_data.get("shot_uuid", None)
-                                update_cache_dict(
-                                    origin_data.get("inference_type", ""),
-                                    log,
-                                    timing_uuid,
-                                    shot_uuid,
-                                    timing_update_list,
-                                    shot_update_list,
-                                    gallery_update_list,
-                                )
-
-                            except Exception as e:
-                                app_logger.log(LoggingType.ERROR, f"Error: {e}")
-                                output_details["error"] = str(e)
-                                InferenceLog.objects.filter(id=log.id).update(
-                                    status=InferenceStatus.FAILED.value,
-                                    output_details=json.dumps(output_details),
-                                )
-                                sentry_sdk.capture_exception(e)
-
-                    else:
-                        log_status = InferenceStatus.FAILED.value
-                        InferenceLog.objects.filter(id=log.id).update(
-                            status=log_status, output_details=json.dumps(output_details)
-                        )
-
-                else:
-                    InferenceLog.objects.filter(id=log.id).update(status=log_status)
-            else:
-                if response:
-                    app_logger.log(LoggingType.DEBUG, f"Error: {response.content}")
-                    sentry_sdk.capture_exception(response.content)
-        elif local_gpu_data:
-            data = json.loads(local_gpu_data)
-            try:
-                setup_comfy_runner()
-
-                # fetching the current status again (as this could have been cancelled)
-                log = InferenceLog.objects.filter(id=log.id).first()
-                cur_status = log.status
-                if cur_status in [InferenceStatus.FAILED.value, InferenceStatus.CANCELED.value]:
-                    return
-
-                InferenceLog.objects.filter(id=log.id).update(status=InferenceStatus.IN_PROGRESS.value)
-                start_time = time.time()
-                output = predict_gpu_output(
-                    data["workflow_input"],
-                    data["file_path_list"],
-                    data["output_node_ids"],
-                    data.get("extra_model_list", []),
-                    data.get("ignore_model_list", []),
-                )
-                end_time = time.time()
-
-                res_output = format_model_output(output, log.model_name)
-                destination_path_list = []
-                for output in res_output:
-                    destination_path = "./videos/temp/" + str(uuid.uuid4()) + "." + output.split(".")[-1]
-                    shutil.copy2("./output/" + output, destination_path)
-                    destination_path_list.append(destination_path)
-
-                output_details = json.loads(log.output_details)
-                output_details["output"] = (
-                    destination_path_list[0] if len(destination_path_list) == 1 else destination_path_list
-                )
-
-                log = InferenceLog.objects.filter(id=log.id).first()
-                cur_status = log.status
-                if cur_status in [InferenceStatus.FAILED.value, InferenceStatus.CANCELED.value]:
-                    return
-
-                update_data = {
-                    "status": InferenceStatus.COMPLETED.value,
-                    "output_details": json.dumps(output_details),
-                    "total_inference_time": end_time - start_time,
-                }
-
-                InferenceLog.objects.filter(id=log.id).update(**update_data)
-                origin_data = json.loads(log.input_params).get(InferenceParamType.ORIGIN_DATA.value, {})
-                origin_data["output"] = (
-                    destination_path_list[0] if len(destination_path_list) == 1 else destination_path_list
-                )
-                origin_data["log_uuid"] = log.uuid
-                print("processing inference output")
-
-                from ui_components.methods.common_methods import process_inference_output
-
-                process_inference_output(**origin_data)
-                timing_uuid, shot_uuid = origin_data.get("timing_uuid", None), origin_data.get(
-                    "shot_uuid", None
-                )
-                update_cache_dict(
-                    origin_data.get("inference_type", ""),
-                    log,
-                    timing_uuid,
-                    shot_uuid,
-                    timing_update_list,
-                    shot_update_list,
-                    gallery_update_list,
-                )
-
-            except Exception as e:
-                print("error occured: ", str(e))
-                # sentry_sdk.capture_exception(e)
-                traceback.print_exc()
-                InferenceLog.objects.filter(id=log.id).update(status=InferenceStatus.FAILED.value)
-        elif sai_data:
-            # TODO: a lot of code is being repeated in the different types of inference, will fix this later
-            try:
-                data = sai_data
-                log = InferenceLog.objects.filter(id=log.id).first()
-                cur_status = log.status
-                if cur_status in [InferenceStatus.FAILED.value, InferenceStatus.CANCELED.value]:
-                    return
-
-                InferenceLog.objects.filter(id=log.id).update(status=InferenceStatus.IN_PROGRESS.value)
-                start_time = time.time()
-                output = predict_sai_output(data)
-                end_time = time.time()
-
-                destination_path_list = []
-                destination_path = "./videos/temp/" + str(uuid.uuid4()) + "." + output.split(".")[-1]
-                shutil.copy2(output, destination_path)
-                destination_path_list.append(destination_path)
-
-                output_details = json.loads(log.output_details)
-                output_details["output"] = (
-                    destination_path_list[0] if len(destination_path_list) == 1 else destination_path_list
-                )
-                update_data = {
-                    "status": InferenceStatus.COMPLETED.value,
-                    "output_details": json.dumps(output_details),
-                    "total_inference_time": end_time - start_time,
-                }
-
-                InferenceLog.objects.filter(id=log.id).update(**update_data)
-                origin_data = json.loads(log.input_params).get(InferenceParamType.ORIGIN_DATA.value, {})
-                origin_data["output"] = (
-                    destination_path_list[0] if len(destination_path_list) == 1 else destination_path_list
-                )
-                origin_data["log_uuid"] = log.uuid
-                print("processing inference output")
-
-                from ui_components.methods.common_methods import process_inference_output
-
-                process_inference_output(**origin_data)
-                timing_uuid, shot_uuid = origin_data.get("timing_uuid", None), origin_data.get(
-                    "shot_uuid", None
-                )
-                update_cache_dict(
-                    origin_data.get("inference_type", ""),
-                    log,
-                    timing_uuid,
-                    shot_uuid,
-                    timing_update_list,
-                    shot_update_list,
-                    gallery_update_list,
-                )
-            except Exception as e:
-                print("error occured: ", str(e))
-                # sentry_sdk.capture_exception(e)
-                traceback.print_exc()
-                InferenceLog.objects.filter(id=log.id).update(status=InferenceStatus.FAILED.value)
-        else:
-            # if replicate/gpu data is not present then removing the status
-            InferenceLog.objects.filter(id=log.id).update(status="")
+    # results of the jobs that have finished since the last tick
+    for inference_type, project_uuid, timing_uuid, shot_uuid in job_executor.drain_results():
+        update_cache_dict(
+            inference_type,
+            project_uuid,
+            timing_uuid,
+            shot_uuid,
+            timing_update_list,
+            shot_update_list,
+            gallery_update_list,
+        )
 
     # adding update_data in the project
     from backend.models import Project
@@ -505,11 +685,10 @@ def check_and_update_db():
             _ = Project.objects.filter(uuid=project_uuid).update(meta_data=json.dumps(val))
             release_lock(key)
 
-    if not len(log_list):
-        # app_logger.log(LoggingType.DEBUG, f"No logs found")
-        pass
+    log_executor_metrics()
 
-    return
+    # whether this runner still has some work pending
+    return dispatched or job_executor.has_pending_jobs()
 
 
 main()
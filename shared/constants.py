@@ -127,6 +127,13 @@ class SortOrder(ExtendedEnum):
     DESCENDING = "desc"
 
 
+# entities which can be fetched together through a single batched request
+class BatchEntityType(ExtendedEnum):
+    FILE = "file"
+    TIMING = "timing"
+    SHOT = "shot"
+
+
 class CreativeProcessPage(ExtendedEnum):
     SHOTS = "Shots"
     ADJUST_SHOT = "Adjust Shot"
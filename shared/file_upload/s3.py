@@ -1,7 +1,9 @@
 import hashlib
+import io
 import mimetypes
 from urllib.parse import urlparse
 import boto3
+from boto3.s3.transfer import TransferConfig
 import uuid
 import os
 import shutil
@@ -14,6 +16,8 @@ from ui_components.methods.file_methods import convert_file_to_base64
 
 logger = AppLogger()
 
+S3_TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024, multipart_chunksize=8 * 1024 * 1024)
+
 # TODO: fix proper paths for file uploads
 
 
@@ -38,18 +42,21 @@ def upload_file_from_obj(file, file_extension, bucket=AWS_S3_BUCKET):
     folder = "test/"
     unique_tag = str(uuid.uuid4())
     filename = unique_tag + file_extension
+    if isinstance(file, bytes):
+        file = io.BytesIO(file)
     file.seek(0)
 
     # Upload the file
     content_type = (
         "application/octet-stream" if file_extension not in [".png", ".jpg"] else "image/png"
     )  # hackish sol, will fix later
-    data = {"Body": file, "Bucket": bucket, "Key": folder + filename, "ACL": "public-read"}
+    extra_args = {"ACL": "public-read"}
     if content_type:
-        data["ContentType"] = content_type
+        extra_args["ContentType"] = content_type
 
+    # large files are uploaded in parts, reading only a few chunks of the file at a time
     s3_client = boto3.client("s3", aws_access_key_id=aws_access_key, aws_secret_access_key=aws_secret_key)
-    resp = s3_client.put_object(**data)
+    s3_client.upload_fileobj(file, bucket, folder + filename, ExtraArgs=extra_args, Config=S3_TRANSFER_CONFIG)
     object_url = "https://s3-{0}.amazonaws.com/{1}/{2}".format(AWS_S3_REGION, bucket, folder + filename)
     return object_url
 
@@ -0,0 +1,104 @@
+"""
+cost of moving frames around in a 1000 frame shot, with the order keys (a single row written per
+move) vs shifting the aux_frame_index of all the frames in between (how frames were reordered before).
+usage: python tests/benchmarks/bench_frame_reorder.py [frame_count] [move_count]
+"""
+
+import random
+import sys
+
+from bench_utils import django_test_db, print_table, timeit
+
+
+def create_shot(project, frame_count):
+    from backend.models import ORDER_KEY_GAP, Shot, Timing
+
+    shot = Shot.objects.create(project=project, name="bench", shot_idx=1)
+    Timing.objects.bulk_create(
+        [
+            Timing(shot=shot, aux_frame_index=idx, order_key=(idx + 1) * ORDER_KEY_GAP)
+            for idx in range(frame_count)
+        ],
+        batch_size=500,
+    )
+    return shot
+
+
+def move_with_order_key(timing, new_index):
+    from backend.db_repo import DBRepo
+
+    DBRepo().update_specific_timing(str(timing.uuid), aux_frame_index=new_index)
+    return 1
+
+
+def move_with_index_shift(timing, new_index):
+    from django.db.models import F
+
+    from backend.models import Timing
+
+    # same steps as update_specific_timing used to take, every frame between the old and the new
+    # position is shifted by one
+    timing = Timing.objects.filter(uuid=timing.uuid, is_disabled=False).first()
+    timing_list = Timing.objects.filter(shot_id=timing.shot_id, is_disabled=False)
+    old_index = timing.aux_frame_index
+    if new_index >= old_index:
+        updated_count = timing_list.filter(
+            aux_frame_index__gt=old_index, aux_frame_index__lte=new_index
+        ).update(aux_frame_index=F("aux_frame_index") - 1)
+    else:
+        updated_count = timing_list.filter(
+            aux_frame_index__gte=new_index, aux_frame_index__lt=old_index
+        ).update(aux_frame_index=F("aux_frame_index") + 1)
+
+    # not through save(), which now places the frame through its order key
+    Timing.objects.filter(id=timing.id).update(aux_frame_index=new_index)
+    return updated_count + 1
+
+
+def run(move_fn, shot, move_list):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from backend.models import Timing
+
+    timing_map = {t.id: t for t in Timing.objects.filter(shot_id=shot.id)}
+    written_row_count, query_count, total_time = 0, 0, 0
+    for timing_id, new_index in move_list:
+        timing = timing_map[timing_id]
+        timing.refresh_from_db()
+        with CaptureQueriesContext(connection) as captured:
+            time_taken, row_count = timeit(lambda: move_fn(timing, new_index))
+
+        total_time += time_taken
+        written_row_count += row_count
+        query_count += len(captured.captured_queries)
+
+    move_count = len(move_list)
+    return [
+        f"{total_time / move_count:.2f}",
+        f"{query_count / move_count:.1f}",
+        f"{written_row_count / move_count:.1f}",
+    ]
+
+
+def main(frame_count=1000, move_count=200):
+    with django_test_db(on_disk=True):
+        from backend.models import Project, Timing, User
+
+        user = User.objects.create(name="bench", email="bench@test.com")
+        project = Project.objects.create(name="bench", user=user)
+        row_list = []
+        for name, move_fn in [("order key", move_with_order_key), ("index shift", move_with_index_shift)]:
+            # the same moves for both
+            random.seed(0)
+            shot = create_shot(project, frame_count)
+            id_list = list(Timing.objects.filter(shot_id=shot.id).values_list("id", flat=True))
+            move_list = [(random.choice(id_list), random.randrange(frame_count)) for _ in range(move_count)]
+            row_list.append([name] + run(move_fn, shot, move_list))
+
+        print(f"{move_count} random moves in a {frame_count} frame shot")
+        print_table(["strategy", "ms/move", "queries/move", "rows written/move"], row_list)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
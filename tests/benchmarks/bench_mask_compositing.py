@@ -0,0 +1,76 @@
+"""
+compositing masks over an sdxl sized frame, the vectorized combine_mask_and_input_image vs the per
+pixel getpixel/putpixel loop it replaced, and several masks in one call vs one call per mask.
+usage: python tests/benchmarks/bench_mask_compositing.py [width] [height] [mask_count]
+"""
+
+import sys
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from bench_utils import print_table, setup_django, timeit
+
+
+def create_mask(width, height, seed):
+    # white ellipses on black, like the masks drawn in the inpainting canvas
+    rng = np.random.default_rng(seed)
+    mask = Image.new("RGB", (width, height), (0, 0, 0))
+    draw = ImageDraw.Draw(mask)
+    for _ in range(5):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        rx, ry = rng.integers(20, width // 4), rng.integers(20, height // 4)
+        draw.ellipse((x - rx, y - ry, x + rx, y + ry), fill=(255, 255, 255))
+    return mask
+
+
+def combine_per_pixel(mask_image, input_image, fill_color):
+    # the previous implementation
+    input_image = input_image.convert("RGBA")
+    is_white = lambda pixel, threshold=245: all(value > threshold for value in pixel[:3])
+    for x in range(mask_image.width):
+        for y in range(mask_image.height):
+            if is_white(mask_image.getpixel((x, y))):
+                input_image.putpixel((x, y), fill_color)
+
+    return input_image
+
+
+def main(width=1216, height=832, mask_count=4):
+    setup_django()
+    from ui_components.methods.common_methods import (
+        OVERLAP_COLOR_DICT,
+        combine_mask_and_input_image,
+        combine_mask_list_and_input_image,
+    )
+
+    rng = np.random.default_rng(0)
+    input_image = Image.fromarray(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), "RGB")
+    mask_list = [create_mask(width, height, seed) for seed in range(mask_count)]
+
+    row_list = []
+    for overlap_color in ["transparent", "grey"]:
+        per_pixel_time, expected = timeit(
+            lambda: combine_per_pixel(mask_list[0], input_image, OVERLAP_COLOR_DICT[overlap_color])
+        )
+        vectorized_time, res = timeit(
+            lambda: combine_mask_and_input_image(mask_list[0], input_image, overlap_color), repeat=10
+        )
+        assert np.array_equal(np.array(res), np.array(expected))
+        row_list.append([f"1 mask ({overlap_color})", f"{per_pixel_time:.1f}", f"{vectorized_time:.2f}"])
+
+    one_by_one_time, _ = timeit(
+        lambda: [combine_mask_and_input_image(mask, input_image, "grey") for mask in mask_list][-1], repeat=5
+    )
+    batch_time, _ = timeit(
+        lambda: combine_mask_list_and_input_image(mask_list, input_image, "grey"), repeat=5
+    )
+    row_list.append([f"{mask_count} masks, a call per mask", "-", f"{one_by_one_time:.2f}"])
+    row_list.append([f"{mask_count} masks, a single call", "-", f"{batch_time:.2f}"])
+
+    print(f"{width}x{height} frame")
+    print_table(["case", "per pixel loop (ms)", "vectorized (ms)"], row_list)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
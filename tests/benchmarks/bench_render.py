@@ -0,0 +1,79 @@
+"""
+render of a synthetic project (shot clips + project audio), the shot segments prepared one after the
+other vs across a pool of processes, followed by the concat of the segments.
+usage: python tests/benchmarks/bench_render.py [shot_count] [worker_count]
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from bench_utils import print_table, setup_django, timeit
+
+
+def create_clip(output_path, duration, idx):
+    from utils.media_processor.video import get_ffmpeg_exe
+
+    subprocess.run(
+        [get_ffmpeg_exe(), "-y", "-loglevel", "error", "-f", "lavfi"]
+        + ["-i", f"testsrc=size=512x512:rate=24:duration={duration}", "-vf", f"hue=h={idx * 15}"]
+        + ["-c:v", "libx264", "-pix_fmt", "yuv420p", output_path],
+        check=True,
+    )
+
+
+def create_audio(output_path, duration):
+    from utils.media_processor.video import get_ffmpeg_exe
+
+    subprocess.run(
+        [get_ffmpeg_exe(), "-y", "-loglevel", "error", "-f", "lavfi"]
+        + ["-i", f"sine=frequency=220:sample_rate=44100:duration={duration}", output_path],
+        check=True,
+    )
+
+
+def render(job_list, worker_count, output_path):
+    from utils.media_processor.video import VideoProcessor
+
+    for job in job_list:
+        if os.path.exists(job[-1]):
+            os.remove(job[-1])
+
+    VideoProcessor.prepare_render_segment_list(job_list, worker_count)
+    VideoProcessor.concat_videos([job[-1] for job in job_list], output_path)
+
+
+def main(shot_count=20, worker_count=None):
+    setup_django()
+    from ui_components.methods.video_methods import RENDER_WORKER_COUNT
+
+    worker_count = worker_count or max(RENDER_WORKER_COUNT, 2)
+    shot_duration = 2
+    temp_dir = tempfile.mkdtemp()
+    try:
+        audio_path = os.path.join(temp_dir, "audio.mp3")
+        create_audio(audio_path, shot_count * shot_duration)
+        job_list = []
+        for idx in range(shot_count):
+            clip_path = os.path.join(temp_dir, f"clip_{idx}.mp4")
+            create_clip(clip_path, shot_duration, idx)
+            job_list.append(
+                (clip_path, audio_path, idx * shot_duration, os.path.join(temp_dir, f"segment_{idx}.mp4"))
+            )
+
+        output_path = os.path.join(temp_dir, "render.mp4")
+        row_list = []
+        for name, count in [("serial", 1), (f"{worker_count} processes", worker_count)]:
+            time_taken, _ = timeit(lambda: render(job_list, count, output_path))
+            row_list.append([name, f"{time_taken / 1000:.2f}"])
+
+        print(f"{shot_count} shots of {shot_duration}s with audio, {os.cpu_count()} cpus")
+        print_table(["segments", "render time (s)"], row_list)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
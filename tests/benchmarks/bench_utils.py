@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+# the benchmarks are run as scripts from the repo root (python tests/benchmarks/bench_x.py)
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+def setup_django():
+    os.environ.setdefault("SERVER", "development")
+    os.environ.setdefault("OFFLINE_MODE", "1")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def django_test_db(on_disk=False):
+    """
+    a throwaway db with all the migrations applied, same as the one used by the tests. sqlite test dbs
+    are in memory by default, on_disk=True keeps it in a file so that the writes cost what they do locally
+    """
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if on_disk:
+        test_settings = settings.DATABASES["default"].setdefault("TEST", {})
+        test_settings["NAME"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def timeit(fn, repeat=1):
+    # returns (avg time in ms, result of the last call)
+    res = None
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        res = fn()
+    return (time.perf_counter() - start_time) * 1000 / repeat, res
+
+
+def print_table(header_list, row_list):
+    width_list = [max(len(str(v)) for v in col) for col in zip(header_list, *row_list)]
+    for row in [header_list] + row_list:
+        print("  ".join(str(v).ljust(width) for v, width in zip(row, width_list)))
@@ -0,0 +1,134 @@
+"""
+latency of the DBRepo writes with foreign keys, with the uuids resolved one query per foreign key (how
+the writes looked them up before the resolver), by the resolver with an empty cache and by the resolver
+once the ids are cached.
+usage: python tests/benchmarks/bench_uuid_resolver.py [repeat]
+"""
+
+import contextlib
+import io
+import sys
+
+from bench_utils import django_test_db, print_table, timeit
+
+
+def get_per_field_resolver():
+    from backend.uuid_resolver import UUIDResolver
+
+    class PerFieldResolver(UUIDResolver):
+        # stands in for the lookups done before the resolver, every uuid is fetched with its own query
+        def resolve(self, model, uuid_list):
+            res = {}
+            for value in uuid_list:
+                obj = model.objects.filter(uuid=value, is_disabled=False).first()
+                if obj:
+                    res[str(value)] = obj.id
+            return res
+
+    return PerFieldResolver()
+
+
+def get_write_list(project, shot, model, file_list, timing):
+    from backend.db_repo import DBRepo
+
+    db_repo = DBRepo()
+    project_uuid, model_uuid = str(project.uuid), str(model.uuid)
+    file_uuid_list = [str(f.uuid) for f in file_list]
+    log_data = {"project_id": project_uuid, "model_id": model_uuid, "input_params": "{}", "status": "queued"}
+
+    return [
+        (
+            "create_timing (6 fks)",
+            lambda: db_repo.create_timing(
+                shot_id=str(shot.uuid),
+                model_id=model_uuid,
+                source_image_id=file_uuid_list[0],
+                primary_image_id=file_uuid_list[1],
+                mask_id=file_uuid_list[2],
+                canny_image_id=file_uuid_list[3],
+                aux_frame_index=0,
+            ),
+        ),
+        (
+            "update_specific_timing",
+            lambda: db_repo.update_specific_timing(str(timing.uuid), primary_image_id=file_uuid_list[1]),
+        ),
+        (
+            "create_file",
+            lambda: db_repo.create_file(
+                name="bench", type="image", local_path="videos/temp/bench.png", project_id=project_uuid
+            ),
+        ),
+        ("create_inference_log", lambda: db_repo.create_inference_log(**log_data)),
+        ("create_inference_log_list (10)", lambda: db_repo.create_inference_log_list([log_data] * 10)),
+    ]
+
+
+def run(write_fn, repeat, clear_cache):
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext
+
+    from backend.uuid_resolver import uuid_resolver
+
+    total_time, query_count = 0, 0
+    for _ in range(repeat):
+        if clear_cache:
+            uuid_resolver.clear()
+        # the query log is capped, the count would stop growing once it is full
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            time_taken, res = timeit(write_fn)
+        assert res.status, res.message
+        total_time += time_taken
+        query_count += len(captured.captured_queries)
+
+    return f"{total_time / repeat:.2f}", f"{query_count / repeat:.1f}"
+
+
+def main(repeat=100):
+    with django_test_db(on_disk=True):
+        import backend.db_repo
+        from backend.models import AIModel, InternalFileObject, Project, Shot, Timing, User
+        from backend.uuid_resolver import uuid_resolver
+
+        user = User.objects.create(name="bench", email="bench@test.com")
+        project = Project.objects.create(name="bench", user=user)
+        shot = Shot.objects.create(project=project, name="bench", shot_idx=1)
+        model = AIModel.objects.create(name="bench", user=user)
+        file_list = [
+            InternalFileObject.objects.create(name=f"bench_{i}", type="image", project=project)
+            for i in range(4)
+        ]
+        timing = Timing.objects.create(shot=shot, aux_frame_index=0)
+
+        row_list = []
+        # the writes print their data
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, write_fn in get_write_list(project, shot, model, file_list, timing):
+                backend.db_repo.uuid_resolver = get_per_field_resolver()
+                try:
+                    per_field_res = run(write_fn, repeat, clear_cache=False)
+                finally:
+                    backend.db_repo.uuid_resolver = uuid_resolver
+
+                row_list.append(
+                    [name, *per_field_res, *run(write_fn, repeat, True), *run(write_fn, repeat, False)]
+                )
+
+    print(f"writes averaged over {repeat} runs")
+    print_table(
+        [
+            "write",
+            "per fk ms",
+            "per fk queries",
+            "cold ms",
+            "cold queries",
+            "cached ms",
+            "cached queries",
+        ],
+        row_list,
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
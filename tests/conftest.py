@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# the tests run the local (development) setup against a throwaway sqlite db
+os.environ.setdefault("SERVER", "development")
+os.environ.setdefault("OFFLINE_MODE", "1")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_settings")
+
+import django
+
+django.setup()
+
+from django.db import connection, transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from backend.uuid_resolver import uuid_resolver
+
+
+@pytest.fixture(scope="session", autouse=True)
+def django_test_db():
+    # a separate db with all the migrations applied, removed once the session is over
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    yield
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+    teardown_test_environment()
+
+
+@pytest.fixture
+def db():
+    # every test runs inside a transaction which is rolled back at the end
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+    # the ids of the rolled back rows are reused
+    uuid_resolver.clear()
+
+
+@pytest.fixture
+def project(db):
+    from backend.models import Project, User
+
+    user = User.objects.create(name="test user", email="test@test.com")
+    return Project.objects.create(name="test project", user=user)
+
+
+class StubServer:
+    """
+    local http server standing in for the remote apis (replicate, the hosted backend). handler(request)
+    returns (status, body, headers) where body is json serializable, the requests received are
+    recorded in request_list as {"method", "path", "headers", "body"}
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.request_list = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                body = self.rfile.read(length) if length else b""
+                request = {
+                    "method": self.command,
+                    "path": self.path,
+                    "headers": dict(self.headers),
+                    "body": json.loads(body) if body else None,
+                }
+                with stub._lock:
+                    stub.request_list.append(request)
+
+                status, res, headers = stub.handler(request)
+                content = json.dumps(res).encode() if res is not None else b""
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def get_request_list(self, method=None, path_prefix=""):
+        with self._lock:
+            return [
+                r
+                for r in self.request_list
+                if (method is None or r["method"] == method) and r["path"].startswith(path_prefix)
+            ]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    # usage: server = stub_server(handler)
+    server_list = []
+
+    def start(handler):
+        server_list.append(StubServer(handler))
+        return server_list[-1]
+
+    yield start
+    for server in server_list:
+        server.close()
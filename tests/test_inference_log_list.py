@@ -0,0 +1,62 @@
+import uuid
+
+from utils.data_repo.api_repo import APIRepo
+
+
+def get_log_handler(log_list_supported=True):
+    # fake hosted backend with the single log endpoint and (optionally) the log list create endpoint
+    def handler(request):
+        if request["path"] == "/v1/data/log/list":
+            if not log_list_supported:
+                return 405, {"detail": "method not allowed"}, None
+
+            data = [dict(log_data, uuid=str(uuid.uuid4())) for log_data in request["body"]["log_data_list"]]
+            return 200, {"status": True, "payload": {"data": data}}, None
+
+        data = dict(request["body"], uuid=str(uuid.uuid4()))
+        return 200, {"status": True, "payload": {"data": data}}, None
+
+    return handler
+
+
+def get_api_repo(monkeypatch, server):
+    monkeypatch.setenv("SERVER_URL", server.url)
+    return APIRepo()
+
+
+def get_single_log_request_list(server):
+    return [r for r in server.get_request_list("POST") if r["path"] == "/v1/data/log"]
+
+
+def get_log_data_list(count):
+    return [
+        {"model_name": "model", "input_params": f'{{"idx": {i}}}', "status": "queued"} for i in range(count)
+    ]
+
+
+def test_logs_are_created_with_a_single_request(monkeypatch, stub_server):
+    server = stub_server(get_log_handler())
+    api_repo = get_api_repo(monkeypatch, server)
+
+    res = api_repo.create_inference_log_list(get_log_data_list(3))
+
+    assert res.status
+    assert [log["input_params"] for log in res.data["data"]] == [f'{{"idx": {i}}}' for i in range(3)]
+    assert len(server.request_list) == 1
+    assert server.request_list[0]["method"] == "POST"
+
+
+def test_logs_are_created_one_by_one_without_the_list_endpoint(monkeypatch, stub_server):
+    server = stub_server(get_log_handler(log_list_supported=False))
+    api_repo = get_api_repo(monkeypatch, server)
+
+    res = api_repo.create_inference_log_list(get_log_data_list(3))
+    assert res.status
+    assert [log["input_params"] for log in res.data["data"]] == [f'{{"idx": {i}}}' for i in range(3)]
+    assert len(server.get_request_list("POST", "/v1/data/log/list")) == 1
+    assert len(get_single_log_request_list(server)) == 3
+
+    # the list endpoint isn't tried again
+    api_repo.create_inference_log_list(get_log_data_list(2))
+    assert len(server.get_request_list("POST", "/v1/data/log/list")) == 1
+    assert len(get_single_log_request_list(server)) == 5
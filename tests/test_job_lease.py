@@ -0,0 +1,114 @@
+import datetime
+import json
+import threading
+
+import pytest
+from django.utils import timezone
+
+from shared.constants import InferenceParamType, InferenceStatus
+from utils.runner.job_executor import InferenceJobExecutor, JobLaneType
+from utils.runner.job_lease import LocalJobLease
+
+
+def is_local_log(log):
+    input_params = json.loads(log.input_params)
+    return bool(input_params.get(InferenceParamType.GPU_INFERENCE.value, None))
+
+
+class Runner:
+    # a runner process, its own executor and lease over the shared db
+    def __init__(self, runner_id, ttl=60):
+        self.lease = LocalJobLease(runner_id, ttl)
+        self.executor = InferenceJobExecutor({JobLaneType.LOCAL_GPU.value: 1})
+        self.finish_event = threading.Event()
+
+    def run(self, log_id):
+        # claiming happens on the calling thread, the test db is only accessed from there
+        if not self.lease.claim(log_id):
+            return False
+
+        return self.executor.submit(JobLaneType.LOCAL_GPU.value, log_id, self.finish_event.wait, 10)
+
+    def shutdown(self):
+        self.finish_event.set()
+        self.executor.shutdown(wait=True)
+
+
+def create_log(project, params_type, status=InferenceStatus.QUEUED.value):
+    from backend.models import InferenceLog
+
+    return InferenceLog.objects.create(
+        project=project, input_params=json.dumps({params_type: "{}"}), output_details="{}", status=status
+    )
+
+
+def expire_lease(log, ttl):
+    from backend.models import InferenceLog
+
+    InferenceLog.objects.filter(id=log.id).update(
+        claimed_at=timezone.now() - datetime.timedelta(seconds=ttl + 1)
+    )
+
+
+@pytest.fixture
+def runner_list():
+    res = []
+    yield res
+    for runner in res:
+        runner.shutdown()
+
+
+def test_jobs_of_a_live_runner_are_not_requeued(project, runner_list):
+    runner_a, runner_b = Runner("runner_a"), Runner("runner_b")
+    runner_list.extend([runner_a, runner_b])
+    log = create_log(project, InferenceParamType.GPU_INFERENCE.value)
+
+    assert runner_a.run(log.id)
+    assert runner_a.executor.is_in_flight(log.id)
+
+    # runner b starts while runner a is still running the job
+    assert runner_b.lease.requeue_expired(is_local_log) == 0
+    assert not runner_b.run(log.id)
+    log.refresh_from_db()
+    assert (log.status, log.claimed_by) == (InferenceStatus.IN_PROGRESS.value, "runner_a")
+
+    # the heartbeat keeps the lease alive however long the job runs
+    expire_lease(log, runner_a.lease.ttl)
+    assert runner_a.lease.refresh() == 1
+    assert runner_b.lease.requeue_expired(is_local_log) == 0
+    assert not runner_b.executor.is_in_flight(log.id)
+
+
+def test_jobs_of_a_dead_runner_are_requeued_once_the_lease_expires(project, runner_list):
+    from backend.models import InferenceLog
+
+    runner_a, runner_b = Runner("runner_a"), Runner("runner_b")
+    runner_list.extend([runner_a, runner_b])
+    log = create_log(project, InferenceParamType.GPU_INFERENCE.value)
+    assert runner_a.run(log.id)
+
+    # runner a dies, its lease is no longer refreshed
+    expire_lease(log, runner_a.lease.ttl)
+    assert runner_b.lease.requeue_expired(is_local_log) == 1
+    assert runner_b.run(log.id)
+    log.refresh_from_db()
+    assert (log.status, log.claimed_by) == (InferenceStatus.IN_PROGRESS.value, "runner_b")
+
+    # runner a can't keep the job it has lost
+    assert runner_a.lease.refresh() == 0
+    assert InferenceLog.objects.get(id=log.id).claimed_by == "runner_b"
+
+
+def test_only_local_logs_without_a_lease_are_requeued(project):
+    legacy_log = create_log(
+        project, InferenceParamType.GPU_INFERENCE.value, InferenceStatus.IN_PROGRESS.value
+    )
+    replicate_log = create_log(
+        project, InferenceParamType.REPLICATE_INFERENCE.value, InferenceStatus.IN_PROGRESS.value
+    )
+
+    assert LocalJobLease("runner_a").requeue_expired(is_local_log) == 1
+    legacy_log.refresh_from_db()
+    replicate_log.refresh_from_db()
+    assert legacy_log.status == InferenceStatus.QUEUED.value
+    assert replicate_log.status == InferenceStatus.IN_PROGRESS.value
@@ -0,0 +1,61 @@
+import uuid
+
+from django.db import connection
+
+from backend.models import InferenceLog, InternalFileObject, Shot, Timing
+from shared.constants import InferenceStatus, InternalFileTag, InternalFileType
+
+
+def get_query_plan(query):
+    sql, params = query.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return " | ".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def assert_index_used(query, index_name=None):
+    plan = get_query_plan(query)
+    assert "USING INDEX" in plan or "USING COVERING INDEX" in plan, plan
+    if index_name:
+        assert index_name in plan, plan
+
+
+# the uuid lookups behind most of the reads and the foreign key resolution of the writes
+def test_uuid_lookups_use_the_unique_index(db):
+    assert_index_used(Shot.objects.filter(uuid=uuid.uuid4(), is_disabled=False))
+    assert_index_used(Timing.objects.filter(uuid=uuid.uuid4(), is_disabled=False))
+    assert_index_used(
+        InternalFileObject.objects.filter(uuid__in=[uuid.uuid4(), uuid.uuid4()], is_disabled=False)
+    )
+
+
+def test_file_list_uses_the_project_tag_index(project):
+    query = InternalFileObject.objects.filter(
+        project_id=project.id,
+        tag=InternalFileTag.GALLERY_IMAGE.value,
+        type=InternalFileType.IMAGE.value,
+        is_disabled=False,
+    ).order_by("-created_on")
+    assert_index_used(query, "file_project_tag_idx")
+
+
+def test_shot_file_list_uses_the_shot_uuid_index(db):
+    query = InternalFileObject.objects.filter(
+        shot_uuid__in=[str(uuid.uuid4())], tag=InternalFileTag.GALLERY_IMAGE.value, is_disabled=False
+    )
+    assert_index_used(query, "file_shot_uuid_idx")
+
+
+def test_log_list_uses_the_project_index(project):
+    query = InferenceLog.objects.filter(
+        project_id=project.id, status__in=[InferenceStatus.COMPLETED.value], is_disabled=False
+    ).order_by("-created_on")
+    assert_index_used(query, "inference_log_project_idx")
+
+
+# polled by the runner every few seconds
+def test_pending_log_lookup_uses_the_status_index(db):
+    query = InferenceLog.objects.filter(
+        status__in=[InferenceStatus.QUEUED.value, InferenceStatus.IN_PROGRESS.value], is_disabled=False
+    )
+    assert_index_used(query, "inference_log_status_idx")
@@ -0,0 +1,141 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from utils.runner import replicate_poller
+from utils.runner.replicate_poller import PredictionPollState, ReplicatePredictionPoller
+
+
+def get_prediction_handler(status_map, delay=0, created_at_map=None):
+    # fake replicate, GET /predictions/<id> with an etag per (id, status)
+    active_request_count = {"current": 0, "max": 0}
+    lock = threading.Lock()
+
+    def handler(request):
+        with lock:
+            active_request_count["current"] += 1
+            active_request_count["max"] = max(active_request_count["max"], active_request_count["current"])
+
+        time.sleep(delay)
+        prediction_id = request["path"].split("/")[-1]
+        status = status_map.get(prediction_id, None)
+        with lock:
+            active_request_count["current"] -= 1
+
+        if status is None:
+            return 500, {"detail": "server error"}, None
+
+        etag = f'"{prediction_id}-{status}"'
+        if request["headers"].get("If-None-Match", None) == etag:
+            return 304, None, {"ETag": etag}
+
+        res = {"id": prediction_id, "status": status}
+        if created_at_map and prediction_id in created_at_map:
+            res["created_at"] = created_at_map[prediction_id]
+        return 200, res, {"ETag": etag}
+
+    return handler, active_request_count
+
+
+def test_predictions_are_polled_concurrently_and_only_when_due(stub_server):
+    handler, active_request_count = get_prediction_handler({f"p{i}": "processing" for i in range(4)}, 0.2)
+    server = stub_server(handler)
+    poller = ReplicatePredictionPoller(base_url=server.url, max_workers=4)
+
+    res = poller.poll([f"p{i}" for i in range(4)], "key")
+    assert {k: v["status"] for k, v in res.items()} == {f"p{i}": "processing" for i in range(4)}
+    assert active_request_count["max"] > 1
+    assert all(r["headers"]["Authorization"] == "Token key" for r in server.request_list)
+
+    # new predictions are polled every second
+    assert poller.poll([f"p{i}" for i in range(4)], "key") == {}
+    assert len(server.request_list) == 4
+    poller.shutdown()
+
+
+def test_unchanged_predictions_are_not_downloaded_again(stub_server):
+    status_map = {"p1": "processing"}
+    server = stub_server(get_prediction_handler(status_map)[0])
+    poller = ReplicatePredictionPoller(base_url=server.url)
+
+    poller.poll(["p1"], "key")
+    poller._state["p1"].next_poll_at = 0
+    res = poller.poll(["p1"], "key")
+    assert res["p1"]["status"] == "processing"
+    assert server.request_list[-1]["headers"]["If-None-Match"] == '"p1-processing"'
+    assert poller.metrics["not_modified"] == 1
+
+    status_map["p1"] = "succeeded"
+    poller._state["p1"].next_poll_at = 0
+    assert poller.poll(["p1"], "key")["p1"]["status"] == "succeeded"
+    poller.shutdown()
+
+
+def test_failed_polls_back_off(stub_server):
+    server = stub_server(get_prediction_handler({})[0])
+    poller = ReplicatePredictionPoller(base_url=server.url)
+
+    assert poller.poll(["p1"], "key") == {}
+    state = poller._state["p1"]
+    assert state.error_count == 1
+    assert state.next_poll_at - time.time() > 1.5
+    poller.shutdown()
+
+
+def test_poll_interval_grows_with_the_age_of_the_prediction():
+    poller = ReplicatePredictionPoller(base_url="http://127.0.0.1")
+    now = time.time()
+
+    def get_interval(age):
+        state = PredictionPollState(now - age)
+        state.last_status = "processing"
+        return poller.get_poll_interval(state, now)
+
+    assert get_interval(5) == 1
+    assert get_interval(100) == 3
+    assert get_interval(600) == 10
+    poller.shutdown()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # the poll schedule is checked against this instead of the real time
+    current_time = {"value": time.time()}
+    monkeypatch.setattr(replicate_poller.time, "time", lambda: current_time["value"])
+    return current_time
+
+
+def get_polled_id_list(poller, prediction_id_list, created_at_dict=None):
+    return sorted(poller.poll(prediction_id_list, "key", created_at_dict).keys())
+
+
+def test_predictions_created_before_a_restart_are_not_polled_as_new_ones(stub_server, clock):
+    server = stub_server(get_prediction_handler({"new": "processing", "old": "processing"})[0])
+    # a runner which has just been (re)started
+    poller = ReplicatePredictionPoller(base_url=server.url)
+
+    created_at_dict = {"old": clock["value"] - 600}
+    assert get_polled_id_list(poller, ["new", "old"], created_at_dict) == ["new", "old"]
+
+    # the new prediction is polled every second, the old one every 10 secs
+    clock["value"] += 2
+    assert get_polled_id_list(poller, ["new", "old"], created_at_dict) == ["new"]
+    clock["value"] += 9
+    assert get_polled_id_list(poller, ["new", "old"], created_at_dict) == ["new", "old"]
+    poller.shutdown()
+
+
+def test_prediction_age_is_taken_from_its_created_at(stub_server, clock):
+    created_at = datetime.datetime.fromtimestamp(clock["value"] - 600, datetime.timezone.utc)
+    created_at_map = {"old": created_at.isoformat().replace("+00:00", "Z")}
+    server = stub_server(get_prediction_handler({"old": "processing"}, created_at_map=created_at_map)[0])
+    poller = ReplicatePredictionPoller(base_url=server.url)
+
+    assert get_polled_id_list(poller, ["old"]) == ["old"]
+    clock["value"] += 2
+    assert get_polled_id_list(poller, ["old"]) == []
+    clock["value"] += 9
+    assert get_polled_id_list(poller, ["old"]) == ["old"]
+    poller.shutdown()
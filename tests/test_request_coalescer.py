@@ -0,0 +1,109 @@
+import threading
+import time
+import types
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from shared.constants import BatchEntityType
+from utils.data_repo import request_coalescer
+from utils.data_repo.api_repo import APIRepo
+from utils.data_repo.request_coalescer import reset_request_batch
+
+
+ENTITY_URL_MAP = {
+    "/v1/data/file": BatchEntityType.FILE.value,
+    "/v1/data/timing": BatchEntityType.TIMING.value,
+    "/v1/data/shot": BatchEntityType.SHOT.value,
+}
+
+
+def get_backend_handler(batch_supported=True, delay=0):
+    # fake hosted backend with the single entity endpoints and the batch endpoint
+    def handler(request):
+        time.sleep(delay)
+        parsed_url = urlparse(request["path"])
+        if parsed_url.path == "/v1/data/batch":
+            if not batch_supported:
+                return 404, {"detail": "not found"}, None
+
+            entity_uuid_map = request["body"]["entity_uuid_map"]
+            data = {
+                entity_type: [{"uuid": obj_uuid, "type": entity_type} for obj_uuid in uuid_list]
+                for entity_type, uuid_list in entity_uuid_map.items()
+            }
+            return 200, {"status": True, "payload": {"data": data}}, None
+
+        obj_uuid = parse_qs(parsed_url.query)["uuid"][0]
+        data = {"uuid": obj_uuid, "type": ENTITY_URL_MAP[parsed_url.path]}
+        return 200, {"status": True, "payload": {"data": data}}, None
+
+    return handler
+
+
+@pytest.fixture
+def script_run(monkeypatch):
+    # lookups are only batched inside a streamlit script run, this stands in for its context and state
+    monkeypatch.setattr(request_coalescer, "get_script_run_ctx", lambda: object())
+    monkeypatch.setattr(request_coalescer, "st", types.SimpleNamespace(session_state={}))
+    reset_request_batch()
+
+
+def get_api_repo(monkeypatch, server):
+    monkeypatch.setenv("SERVER_URL", server.url)
+    return APIRepo()
+
+
+def test_prefetched_lookups_are_fetched_in_a_single_batch(monkeypatch, stub_server, script_run):
+    server = stub_server(get_backend_handler())
+    api_repo = get_api_repo(monkeypatch, server)
+    file_uuid_list = [str(uuid.uuid4()) for _ in range(3)]
+    timing_uuid_list = [str(uuid.uuid4()) for _ in range(2)]
+
+    api_repo.prefetch_entity_list(BatchEntityType.FILE.value, file_uuid_list)
+    api_repo.prefetch_entity_list(BatchEntityType.TIMING.value, timing_uuid_list)
+    file_list = [api_repo.get_file_from_uuid(file_uuid) for file_uuid in file_uuid_list]
+    timing_list = [api_repo.get_timing_from_uuid(timing_uuid) for timing_uuid in timing_uuid_list]
+    # already fetched in this run
+    api_repo.get_file_from_uuid(file_uuid_list[0])
+
+    assert [f.data["data"]["uuid"] for f in file_list] == file_uuid_list
+    assert [t.data["data"]["uuid"] for t in timing_list] == timing_uuid_list
+    assert len(server.request_list) == 1
+    assert server.request_list[0]["path"] == "/v1/data/batch"
+
+
+def test_lookups_fall_back_to_the_entity_endpoints_without_the_batch_endpoint(
+    monkeypatch, stub_server, script_run
+):
+    server = stub_server(get_backend_handler(batch_supported=False))
+    api_repo = get_api_repo(monkeypatch, server)
+    file_uuid_list = [str(uuid.uuid4()) for _ in range(3)]
+
+    api_repo.prefetch_entity_list(BatchEntityType.FILE.value, file_uuid_list)
+    file_list = [api_repo.get_file_from_uuid(file_uuid) for file_uuid in file_uuid_list]
+
+    assert [f.data["data"]["uuid"] for f in file_list] == file_uuid_list
+    assert len(server.get_request_list("POST", "/v1/data/batch")) == 1
+    assert len(server.get_request_list("GET", "/v1/data/file")) == 3
+
+
+def test_identical_lookups_in_flight_are_sent_once(monkeypatch, stub_server):
+    server = stub_server(get_backend_handler(delay=0.3))
+    api_repo = get_api_repo(monkeypatch, server)
+    file_uuid = str(uuid.uuid4())
+
+    res_list = []
+    thread_list = [
+        threading.Thread(target=lambda: res_list.append(api_repo.get_file_from_uuid(file_uuid)))
+        for _ in range(5)
+    ]
+    for thread in thread_list:
+        thread.start()
+    for thread in thread_list:
+        thread.join()
+
+    assert [res.data["data"]["uuid"] for res in res_list] == [file_uuid] * 5
+    assert len(server.request_list) == 1
+    assert api_repo.coalescer.metrics["deduplicated"] == 4
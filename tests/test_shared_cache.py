@@ -0,0 +1,90 @@
+import types
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from utils.cache import cache
+from utils.cache.cache import CacheKey, SharedCache, StCache
+
+
+class SessionSwitcher:
+    # stands in for the streamlit session state, each session has its own StCache
+    def __init__(self, monkeypatch):
+        self.st = types.SimpleNamespace(session_state={})
+        monkeypatch.setattr(cache, "st", self.st)
+
+    def new_session(self):
+        self.st.session_state = {}
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    SharedCache._store = {}
+    yield SessionSwitcher(monkeypatch)
+    SharedCache._store = {}
+
+
+@pytest.fixture
+def data_repo():
+    from utils.data_repo.data_repo import DataRepo
+
+    return DataRepo()
+
+
+def fetch_with_query_count(fn):
+    with CaptureQueriesContext(connection) as captured:
+        res = fn()
+    return res, len(captured.captured_queries)
+
+
+def test_sessions_share_a_single_ai_model_fetch(project, sessions, data_repo):
+    from backend.models import AIModel
+
+    model = AIModel.objects.create(name="sdxl", replicate_url="sdxl", user=project.user)
+
+    res, query_count = fetch_with_query_count(lambda: data_repo.get_ai_model_from_uuid(str(model.uuid)))
+    assert res.name == "sdxl" and query_count > 0
+
+    sessions.new_session()
+    res, query_count = fetch_with_query_count(lambda: data_repo.get_ai_model_from_uuid(str(model.uuid)))
+    assert (res.name, query_count) == ("sdxl", 0)
+    # the new session has its own copy
+    assert StCache.get(str(model.uuid), CacheKey.AI_MODEL.value) is res
+
+    sessions.new_session()
+    res, query_count = fetch_with_query_count(
+        lambda: data_repo.get_ai_model_from_name("sdxl", str(project.user.uuid))
+    )
+    assert query_count > 0
+    sessions.new_session()
+    assert (
+        fetch_with_query_count(lambda: data_repo.get_ai_model_from_name("sdxl", str(project.user.uuid)))[1]
+        == 0
+    )
+
+
+def test_ai_model_writes_invalidate_the_shared_models(project, sessions, data_repo):
+    from backend.models import AIModel
+
+    model = AIModel.objects.create(name="sdxl", user=project.user)
+    data_repo.get_ai_model_from_uuid(str(model.uuid))
+
+    sessions.new_session()
+    data_repo.delete_ai_model_from_uuid(str(model.uuid))
+    sessions.new_session()
+    res, query_count = fetch_with_query_count(lambda: data_repo.get_ai_model_from_uuid(str(model.uuid)))
+    assert res is None and query_count > 0
+
+
+def test_sessions_share_a_single_project_setting_fetch(project, sessions, data_repo):
+    from backend.models import Setting
+
+    Setting.objects.create(project=project, default_model=None)
+
+    res, query_count = fetch_with_query_count(lambda: data_repo.get_project_setting(str(project.uuid)))
+    assert res and query_count > 0
+
+    sessions.new_session()
+    res, query_count = fetch_with_query_count(lambda: data_repo.get_project_setting(str(project.uuid)))
+    assert res and query_count == 0
@@ -0,0 +1,82 @@
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.db_repo import DBRepo
+from backend.models import AIModel, InferenceLog, InternalFileObject, Shot, Timing
+from shared.constants import InternalFileTag, InternalFileType
+
+
+def create_shot_list(project, shot_count, frames_per_shot):
+    # bulk created, the save() side effects (reindexing, downloads) aren't needed here
+    model = AIModel.objects.create(name="test model", user=project.user)
+    log = InferenceLog.objects.create(project=project, model=model, status="completed")
+
+    def create_file_list(count, tag, type=InternalFileType.IMAGE.value):
+        return InternalFileObject.objects.bulk_create(
+            [
+                InternalFileObject(
+                    name=f"{tag}_{idx}",
+                    type=type,
+                    tag=tag,
+                    local_path=f"videos/{tag}_{idx}",
+                    project=project,
+                    inference_log=log,
+                )
+                for idx in range(count)
+            ]
+        )
+
+    frame_count = shot_count * frames_per_shot
+    primary_image_list = create_file_list(frame_count, InternalFileTag.GALLERY_IMAGE.value)
+    source_image_list = create_file_list(frame_count, InternalFileTag.BACKGROUND_IMAGE.value)
+    clip_list = create_file_list(shot_count * 2, InternalFileTag.GENERATED_VIDEO.value, "video")
+
+    shot_list = Shot.objects.bulk_create(
+        [
+            Shot(
+                project=project,
+                name=f"shot {idx}",
+                shot_idx=idx + 1,
+                main_clip=clip_list[2 * idx],
+                interpolated_clip_list=json.dumps([str(c.uuid) for c in clip_list[2 * idx : 2 * idx + 2]]),
+            )
+            for idx in range(shot_count)
+        ]
+    )
+    Timing.objects.bulk_create(
+        [
+            Timing(
+                shot=shot_list[idx // frames_per_shot],
+                model=model,
+                primary_image=primary_image_list[idx],
+                source_image=source_image_list[idx],
+                alternative_images=json.dumps([str(primary_image_list[idx].uuid)]),
+                order_key=(idx % frames_per_shot + 1) * 1024.0,
+            )
+            for idx in range(frame_count)
+        ]
+    )
+
+
+def count_shot_list_queries(project):
+    with CaptureQueriesContext(connection) as captured:
+        res = DBRepo().get_shot_list(str(project.uuid))
+
+    assert res.status
+    return res.data["data"], len(captured.captured_queries)
+
+
+def test_shot_list_loads_in_a_fixed_number_of_queries(project):
+    create_shot_list(project, 2, 10)
+    _, small_query_count = count_shot_list_queries(project)
+
+    create_shot_list(project, 48, 10)
+    shot_list, query_count = count_shot_list_queries(project)
+
+    assert len(shot_list) == 50
+    assert sum(len(shot["timing_list"]) for shot in shot_list) == 500
+    assert all(len(shot["interpolated_clip_list"]) == 2 for shot in shot_list)
+    assert query_count == small_query_count
+    assert query_count <= 5
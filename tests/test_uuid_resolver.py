@@ -0,0 +1,118 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend import uuid_resolver as uuid_resolver_module
+from backend.db_repo import DBRepo
+from backend.models import Project, Shot, Timing
+from backend.uuid_resolver import UUIDResolver, uuid_resolver
+
+
+@pytest.fixture
+def project_list(project):
+    return [project] + [Project.objects.create(name=f"project {i}", user=project.user) for i in range(2)]
+
+
+def resolve_with_query_count(resolver, model, uuid_list):
+    with CaptureQueriesContext(connection) as captured:
+        res = resolver.resolve(model, uuid_list)
+    return res, len(captured.captured_queries)
+
+
+def test_uuids_of_a_table_are_resolved_with_a_single_query(project_list):
+    resolver = UUIDResolver()
+    uuid_list = [p.uuid for p in project_list] + [str(project_list[0].uuid), str(uuid.uuid4())]
+
+    res, query_count = resolve_with_query_count(resolver, Project, uuid_list)
+    assert res == {str(p.uuid): p.id for p in project_list}
+    assert query_count == 1
+
+    # cached, except for the uuid which doesn't belong to any row
+    assert resolve_with_query_count(resolver, Project, uuid_list[:3]) == (res, 0)
+    assert resolve_with_query_count(resolver, Project, uuid_list[-1:]) == ({}, 1)
+
+
+def test_resolved_ids_expire_after_the_ttl(project, monkeypatch):
+    resolver = UUIDResolver(ttl=30)
+    current_time = {"value": 1000}
+    monkeypatch.setattr(uuid_resolver_module.time, "time", lambda: current_time["value"])
+
+    resolver.resolve(Project, [project.uuid])
+    current_time["value"] += 29
+    assert resolve_with_query_count(resolver, Project, [project.uuid])[1] == 0
+    current_time["value"] += 2
+    assert resolve_with_query_count(resolver, Project, [project.uuid])[1] == 1
+
+
+def test_least_recently_used_ids_are_evicted_over_the_max_size(project_list):
+    resolver = UUIDResolver(max_size=2)
+    first, second, third = [p.uuid for p in project_list]
+
+    resolver.resolve(Project, [first])
+    resolver.resolve(Project, [second])
+    # first is used again, so second is the one evicted
+    resolver.resolve(Project, [first])
+    resolver.resolve(Project, [third])
+
+    assert resolve_with_query_count(resolver, Project, [first])[1] == 0
+    assert resolve_with_query_count(resolver, Project, [third])[1] == 0
+    assert resolve_with_query_count(resolver, Project, [second])[1] == 1
+
+
+def test_ids_are_reused_till_the_end_of_the_request_scope(project):
+    # nothing is kept across requests
+    resolver = UUIDResolver(ttl=0)
+
+    with resolver.request_scope():
+        resolver.resolve(Project, [project.uuid])
+        assert resolve_with_query_count(resolver, Project, [project.uuid]) == (
+            {str(project.uuid): project.id},
+            0,
+        )
+
+    assert resolve_with_query_count(resolver, Project, [project.uuid])[1] == 1
+
+
+def test_disabled_rows_are_no_longer_resolved(project):
+    uuid_resolver.resolve(Project, [project.uuid])
+
+    with uuid_resolver.request_scope():
+        uuid_resolver.resolve(Project, [project.uuid])
+        project.is_disabled = True
+        project.save()
+        assert uuid_resolver.resolve(Project, [project.uuid]) == {}
+
+
+def test_timings_disabled_in_bulk_are_no_longer_resolved(project):
+    shot = Shot.objects.create(project=project, name="shot", shot_idx=1)
+    timing_list = [Timing.objects.create(shot=shot, aux_frame_index=idx) for idx in range(2)]
+    timing_uuid_list = [t.uuid for t in timing_list]
+    assert len(uuid_resolver.resolve(Timing, timing_uuid_list)) == 2
+
+    # the first frame is dropped from the shot
+    res = DBRepo().apply_shot_frame_layout(str(shot.uuid), [{"uuid": str(timing_list[1].uuid)}])
+    assert res.status
+    assert list(uuid_resolver.resolve(Timing, timing_uuid_list).values()) == [timing_list[1].id]
+
+    DBRepo().remove_existing_timing(str(project.uuid))
+    assert uuid_resolver.resolve(Timing, timing_uuid_list) == {}
+
+
+def test_log_list_foreign_keys_go_through_the_resolver(project):
+    log_data = {"project_id": str(project.uuid), "input_params": "{}", "status": "queued"}
+
+    res = DBRepo().create_inference_log_list([log_data] * 3)
+    assert res.status
+    assert [log["project"]["uuid"] for log in res.data["data"]] == [str(project.uuid)] * 3
+
+    # the project uuid is now cached, only the project itself is fetched (by id) for the logs
+    with CaptureQueriesContext(connection) as captured:
+        assert DBRepo().create_inference_log_list([log_data] * 3).status
+    assert not [q for q in captured.captured_queries if '"project"."uuid" IN' in q["sql"]]
+
+    project.is_disabled = True
+    project.save()
+    res = DBRepo().create_inference_log_list([log_data])
+    assert (res.status, res.message) == (False, "invalid project")
@@ -0,0 +1,96 @@
+import copy
+import json
+import os
+import types
+
+import pytest
+
+from utils.ml_processor import comfy_data_transform
+from utils.ml_processor.comfy_data_transform import (
+    MODEL_PATH_DICT,
+    WORKFLOW_PATCH_DICT,
+    ComfyDataTransform,
+    reseed_workflow,
+)
+from utils.ml_processor.constants import ComfyWorkflow
+from utils.ml_processor.workflow_cache import (
+    WorkflowOverlay,
+    get_patch_spec_error_list,
+    workflow_template_cache,
+)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def repo_dir(monkeypatch):
+    # the workflow templates are read relative to the repo root
+    monkeypatch.chdir(REPO_DIR)
+    workflow_template_cache.clear()
+
+
+def get_template(model):
+    path = "./utils/ml_processor/" + MODEL_PATH_DICT[model]["workflow_path"]
+    return workflow_template_cache.get(path, WORKFLOW_PATCH_DICT.get(model, None))
+
+
+def get_sdxl_query(prompt):
+    return types.SimpleNamespace(
+        width=1024,
+        height=1024,
+        prompt=prompt,
+        negative_prompt="blurry",
+        num_inference_steps=20,
+        guidance_scale=7,
+    )
+
+
+def test_transforms_leave_the_cached_template_unchanged():
+    template = get_template(ComfyWorkflow.SDXL)
+    original_template = copy.deepcopy(template)
+
+    first = json.loads(ComfyDataTransform.transform_sdxl_workflow(get_sdxl_query("a cat"))[0])
+    second = json.loads(ComfyDataTransform.transform_sdxl_workflow(get_sdxl_query("a dog"))[0])
+
+    assert get_template(ComfyWorkflow.SDXL) is template
+    assert template == original_template
+    assert (first["6"]["inputs"]["text"], second["6"]["inputs"]["text"]) == ("a cat", "a dog")
+
+
+@pytest.mark.parametrize("model", list(MODEL_PATH_DICT.keys()), ids=lambda model: model.value)
+def test_patch_specs_match_their_templates(model):
+    path = "./utils/ml_processor/" + MODEL_PATH_DICT[model]["workflow_path"]
+    with open(path, "r", encoding="utf-8") as f:
+        template = json.load(f)
+
+    assert get_patch_spec_error_list(template, WORKFLOW_PATCH_DICT.get(model, {})) == []
+
+
+def test_reseed_only_changes_the_seed(monkeypatch):
+    monkeypatch.setattr(comfy_data_transform, "random_seed", lambda: 1)
+    workflow_json = ComfyDataTransform.transform_sdxl_workflow(get_sdxl_query("a cat"))[0]
+
+    monkeypatch.setattr(comfy_data_transform, "random_seed", lambda: 2)
+    reseeded_workflow = json.loads(
+        reseed_workflow(types.SimpleNamespace(workflow_name=ComfyWorkflow.SDXL), workflow_json)
+    )
+
+    workflow = json.loads(workflow_json)
+    assert reseeded_workflow["10"]["inputs"].pop("noise_seed") == 2
+    assert workflow["10"]["inputs"].pop("noise_seed") == 1
+    assert reseeded_workflow == workflow
+
+
+def test_overlay_accessors_copy_the_shared_nodes():
+    template = {str(i): {"inputs": {"value": i}} for i in range(4)}
+    original_template = copy.deepcopy(template)
+    workflow = WorkflowOverlay(template)
+
+    workflow.pop("0")["inputs"]["value"] = -1
+    workflow.popitem()[1]["inputs"]["value"] = -1
+    workflow.setdefault("1", {})["inputs"]["value"] = -1
+    workflow.update({"2": {"inputs": {"value": -1}}})
+    workflow.copy()["2"]["inputs"]["value"] = -2
+
+    assert template == original_template
+    assert workflow == {"1": {"inputs": {"value": -1}}, "2": {"inputs": {"value": -1}}}
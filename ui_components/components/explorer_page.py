@@ -12,6 +12,7 @@ from ui_components.widgets.add_key_frame_element import add_key_frame
 from ui_components.widgets.inpainting_element import inpainting_image_input
 from utils.common_utils import refresh_app
 from utils.constants import MLQueryObject, T2IModel
+from utils.cache.thumbnail_store import get_thumbnail_location_list
 from utils.data_repo.data_repo import DataRepo
 from shared.constants import (
     GPU_INFERENCE_ENABLED,
@@ -26,12 +27,12 @@ from utils import st_memory
 import time
 from utils.encryption import Encryptor
 from utils.enum import ExtendedEnum
-from utils.ml_processor.ml_interface import get_ml_client
+from utils.ml_processor.ml_interface import get_async_ml_client
 from utils.ml_processor.constants import ML_MODEL
 import numpy as np
 from PIL import Image
 from utils import st_memory
-from utils.ml_processor.sai.sai import StabilityProcessor
+from utils.ml_processor.sai.async_sai import AsyncStabilityProcessor
 
 
 class InputImageStyling(ExtendedEnum):
@@ -275,139 +276,19 @@ def generate_images_element(position="explorer", project_uuid=None, timing_uuid=
         st.write(" ")
         # ------------------- Generating output -------------------------------------
         if st.session_state.get(position + "_generate_inference"):
-            ml_client = get_ml_client()
-
-            for _ in range(number_to_generate):
-                log = None
-                generation_method = InputImageStyling.value_list()[st.session_state["type_of_generation_key"]]
-                if generation_method == InputImageStyling.TEXT2IMAGE.value:
-                    if t2i_model == T2IModel.SDXL.value:
-                        query_obj = MLQueryObject(
-                            timing_uuid=None,
-                            model_uuid=None,
-                            guidance_scale=8,
-                            seed=-1,
-                            num_inference_steps=25,
-                            strength=0.5,
-                            adapter_type=None,
-                            prompt=prompt,
-                            negative_prompt=negative_prompt,
-                            height=project_settings.height,
-                            width=project_settings.width,
-                            data={"shot_uuid": shot_uuid},
-                        )
-
-                        output, log = ml_client.predict_model_output_standardized(
-                            ML_MODEL.sdxl, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES
-                        )
-                    else:
-                        # query for SD3
-                        encryptor = Encryptor()
-                        query_obj = MLQueryObject(
-                            timing_uuid=None,
-                            model_uuid=None,
-                            guidance_scale=8,
-                            seed=-1,
-                            num_inference_steps=25,
-                            strength=0.5,
-                            adapter_type=None,
-                            prompt=prompt,
-                            negative_prompt=negative_prompt,
-                            height=project_settings.height,
-                            width=project_settings.width,
-                            data={
-                                "shot_uuid": shot_uuid,
-                                "stability_key": encryptor.encrypt_json(st.session_state["stability_key"]),
-                            },
-                        )
-
-                        sai_client = StabilityProcessor()
-                        output, log = sai_client.predict_model_output_standardized(
-                            ML_MODEL.sd3, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES
-                        )
-
-                elif generation_method == InputImageStyling.IMAGE2IMAGE.value:
-                    input_image_file = save_new_image(st.session_state["input_image_1"], project_uuid)
-                    query_obj = MLQueryObject(
-                        timing_uuid=None,
-                        model_uuid=None,
-                        image_uuid=input_image_file.uuid,
-                        guidance_scale=5,
-                        seed=-1,
-                        num_inference_steps=30,
-                        strength=strength_of_image,
-                        adapter_type=None,
-                        prompt=prompt,
-                        negative_prompt=negative_prompt,
-                        height=project_settings.height,
-                        width=project_settings.width,
-                        data={"shot_uuid": shot_uuid},
-                    )
+            ml_client = get_async_ml_client()
 
-                    output, log = ml_client.predict_model_output_standardized(
-                        ML_MODEL.sdxl_img2img, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES
-                    )
-
-                elif generation_method == InputImageStyling.IPADAPTER_COMPOSITION.value:
-                    input_img = st.session_state["input_image_1"]
-                    input_image_file = save_new_image(input_img, project_uuid)
+            client, model, query_obj = None, None, None
+            generation_method = InputImageStyling.value_list()[st.session_state["type_of_generation_key"]]
+            if generation_method == InputImageStyling.TEXT2IMAGE.value:
+                if t2i_model == T2IModel.SDXL.value:
                     query_obj = MLQueryObject(
                         timing_uuid=None,
                         model_uuid=None,
-                        image_uuid=input_image_file.uuid,
-                        guidance_scale=5,
+                        guidance_scale=8,
                         seed=-1,
-                        num_inference_steps=30,
-                        strength=strength_of_image / 100,
-                        adapter_type=None,
-                        prompt=prompt,
-                        negative_prompt=negative_prompt,
-                        height=project_settings.height,
-                        width=project_settings.width,
-                        data={"condition_scale": 1, "shot_uuid": shot_uuid},
-                    )
-
-                    output, log = ml_client.predict_model_output_standardized(
-                        ML_MODEL.ipadapter_composition, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES
-                    )
-
-                # elif generation_method == InputImageStyling.CONTROLNET_CANNY.value:
-                #     edge_pil_img = get_canny_img(st.session_state["input_image_1"], low_threshold=50, high_threshold=150)    # redundant incase of local inference
-                #     input_img = edge_pil_img if not GPU_INFERENCE_ENABLED else st.session_state["input_image_1"]
-                #     input_image_file = save_new_image(input_img, project_uuid)
-                #     query_obj = MLQueryObject(
-                #         timing_uuid=None,
-                #         model_uuid=None,
-                #         image_uuid=input_image_file.uuid,
-                #         guidance_scale=5,
-                #         seed=-1,
-                #         num_inference_steps=30,
-                #         strength=strength_of_image/100,
-                #         adapter_type=None,
-                #         prompt=prompt,
-                #         negative_prompt=negative_prompt,
-                #         height=project_settings.height,
-                #         width=project_settings.width,
-                #         data={'condition_scale': 1, "shot_uuid": shot_uuid}
-                #     )
-
-                #     output, log = ml_client.predict_model_output_standardized(ML_MODEL.sdxl_controlnet, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES)
-
-                elif generation_method == InputImageStyling.IPADAPTER_FACE.value:
-                    # validation
-                    if not (st.session_state["input_image_1"]):
-                        st.error("Please upload an image")
-                        return
-
-                    input_image_file = save_new_image(st.session_state["input_image_1"], project_uuid)
-                    query_obj = MLQueryObject(
-                        timing_uuid=None,
-                        model_uuid=None,
-                        image_uuid=input_image_file.uuid,
-                        guidance_scale=5,
-                        seed=-1,
-                        num_inference_steps=30,
-                        strength=strength_of_image / 100,
+                        num_inference_steps=25,
+                        strength=0.5,
                         adapter_type=None,
                         prompt=prompt,
                         negative_prompt=negative_prompt,
@@ -416,71 +297,14 @@ def generate_images_element(position="explorer", project_uuid=None, timing_uuid=
                         data={"shot_uuid": shot_uuid},
                     )
 
-                    output, log = ml_client.predict_model_output_standardized(
-                        ML_MODEL.ipadapter_face, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES
-                    )
-
-                elif generation_method == InputImageStyling.IPADAPTER_PLUS.value:
-                    input_image_file = save_new_image(st.session_state["input_image_1"], project_uuid)
-                    query_obj = MLQueryObject(
-                        timing_uuid=None,
-                        model_uuid=None,
-                        image_uuid=input_image_file.uuid,
-                        guidance_scale=5,
-                        seed=-1,
-                        num_inference_steps=30,
-                        strength=strength_of_image / 100,
-                        adapter_type=None,
-                        prompt=prompt,
-                        negative_prompt=negative_prompt,
-                        height=project_settings.height,
-                        width=project_settings.width,
-                        data={"condition_scale": 1, "shot_uuid": shot_uuid},
-                    )
-
-                    output, log = ml_client.predict_model_output_standardized(
-                        ML_MODEL.ipadapter_plus, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES
-                    )
-
-                elif generation_method == InputImageStyling.IPADPTER_FACE_AND_PLUS.value:
-                    # validation
-                    if not (st.session_state["input_image_2"] and st.session_state["input_image_1"]):
-                        st.error("Please upload both images")
-                        return
-
-                    plus_image_file = save_new_image(st.session_state["input_image_1"], project_uuid)
-                    face_image_file = save_new_image(st.session_state["input_image_2"], project_uuid)
-                    query_obj = MLQueryObject(
-                        timing_uuid=None,
-                        model_uuid=None,
-                        image_uuid=plus_image_file.uuid,
-                        guidance_scale=5,
-                        seed=-1,
-                        num_inference_steps=30,
-                        strength=(strength_of_image_1 / 100, strength_of_image_2 / 100),  # (face, plus)
-                        adapter_type=None,
-                        prompt=prompt,
-                        negative_prompt=negative_prompt,
-                        height=project_settings.height,
-                        width=project_settings.width,
-                        data={"file_image_2_uuid": face_image_file.uuid, "shot_uuid": shot_uuid},
-                    )
-
-                    output, log = ml_client.predict_model_output_standardized(
-                        ML_MODEL.ipadapter_face_plus, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES
-                    )
-
-                elif generation_method == InputImageStyling.INPAINTING.value:
-                    if not ("mask_to_use" in st.session_state and st.session_state["mask_to_use"]):
-                        st.error("Please create and save mask before generation")
-                        toggle_generate_inference(position)
-                        time.sleep(0.7)
-                        return
-
+                    client, model = ml_client, ML_MODEL.sdxl
+                else:
+                    # query for SD3
+                    encryptor = Encryptor()
                     query_obj = MLQueryObject(
                         timing_uuid=None,
                         model_uuid=None,
-                        guidance_scale=6,
+                        guidance_scale=8,
                         seed=-1,
                         num_inference_steps=25,
                         strength=0.5,
@@ -491,32 +315,204 @@ def generate_images_element(position="explorer", project_uuid=None, timing_uuid=
                         width=project_settings.width,
                         data={
                             "shot_uuid": shot_uuid,
-                            "mask": st.session_state["mask_to_use"],
-                            "input_image": st.session_state["editing_image"],
-                            "project_uuid": project_uuid,
+                            "stability_key": encryptor.encrypt_json(st.session_state["stability_key"]),
                         },
                     )
 
-                    output, log = ml_client.predict_model_output_standardized(
-                        ML_MODEL.sdxl_inpainting, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES
-                    )
+                    client, model = AsyncStabilityProcessor(), ML_MODEL.sd3
+
+            elif generation_method == InputImageStyling.IMAGE2IMAGE.value:
+                input_image_file = save_new_image(st.session_state["input_image_1"], project_uuid)
+                query_obj = MLQueryObject(
+                    timing_uuid=None,
+                    model_uuid=None,
+                    image_uuid=input_image_file.uuid,
+                    guidance_scale=5,
+                    seed=-1,
+                    num_inference_steps=30,
+                    strength=strength_of_image,
+                    adapter_type=None,
+                    prompt=prompt,
+                    negative_prompt=negative_prompt,
+                    height=project_settings.height,
+                    width=project_settings.width,
+                    data={"shot_uuid": shot_uuid},
+                )
+
+                client, model = ml_client, ML_MODEL.sdxl_img2img
+
+            elif generation_method == InputImageStyling.IPADAPTER_COMPOSITION.value:
+                input_img = st.session_state["input_image_1"]
+                input_image_file = save_new_image(input_img, project_uuid)
+                query_obj = MLQueryObject(
+                    timing_uuid=None,
+                    model_uuid=None,
+                    image_uuid=input_image_file.uuid,
+                    guidance_scale=5,
+                    seed=-1,
+                    num_inference_steps=30,
+                    strength=strength_of_image / 100,
+                    adapter_type=None,
+                    prompt=prompt,
+                    negative_prompt=negative_prompt,
+                    height=project_settings.height,
+                    width=project_settings.width,
+                    data={"condition_scale": 1, "shot_uuid": shot_uuid},
+                )
 
-                if log:
-                    inference_data = {
-                        "inference_type": (
-                            InferenceType.GALLERY_IMAGE_GENERATION.value
-                            if position == "explorer"
-                            else InferenceType.FRAME_TIMING_IMAGE_INFERENCE.value
-                        ),
-                        "output": output,
-                        "log_uuid": log.uuid,
+                client, model = ml_client, ML_MODEL.ipadapter_composition
+
+            # elif generation_method == InputImageStyling.CONTROLNET_CANNY.value:
+            #     edge_pil_img = get_canny_img(st.session_state["input_image_1"], low_threshold=50, high_threshold=150)    # redundant incase of local inference
+            #     input_img = edge_pil_img if not GPU_INFERENCE_ENABLED else st.session_state["input_image_1"]
+            #     input_image_file = save_new_image(input_img, project_uuid)
+            #     query_obj = MLQueryObject(
+            #         timing_uuid=None,
+            #         model_uuid=None,
+            #         image_uuid=input_image_file.uuid,
+            #         guidance_scale=5,
+            #         seed=-1,
+            #         num_inference_steps=30,
+            #         strength=strength_of_image/100,
+            #         adapter_type=None,
+            #         prompt=prompt,
+            #         negative_prompt=negative_prompt,
+            #         height=project_settings.height,
+            #         width=project_settings.width,
+            #         data={'condition_scale': 1, "shot_uuid": shot_uuid}
+            #     )
+
+            #     output, log = ml_client.predict_model_output_standardized(ML_MODEL.sdxl_controlnet, query_obj, queue_inference=QUEUE_INFERENCE_QUERIES)
+
+            elif generation_method == InputImageStyling.IPADAPTER_FACE.value:
+                # validation
+                if not (st.session_state["input_image_1"]):
+                    st.error("Please upload an image")
+                    return
+
+                input_image_file = save_new_image(st.session_state["input_image_1"], project_uuid)
+                query_obj = MLQueryObject(
+                    timing_uuid=None,
+                    model_uuid=None,
+                    image_uuid=input_image_file.uuid,
+                    guidance_scale=5,
+                    seed=-1,
+                    num_inference_steps=30,
+                    strength=strength_of_image / 100,
+                    adapter_type=None,
+                    prompt=prompt,
+                    negative_prompt=negative_prompt,
+                    height=project_settings.height,
+                    width=project_settings.width,
+                    data={"shot_uuid": shot_uuid},
+                )
+
+                client, model = ml_client, ML_MODEL.ipadapter_face
+
+            elif generation_method == InputImageStyling.IPADAPTER_PLUS.value:
+                input_image_file = save_new_image(st.session_state["input_image_1"], project_uuid)
+                query_obj = MLQueryObject(
+                    timing_uuid=None,
+                    model_uuid=None,
+                    image_uuid=input_image_file.uuid,
+                    guidance_scale=5,
+                    seed=-1,
+                    num_inference_steps=30,
+                    strength=strength_of_image / 100,
+                    adapter_type=None,
+                    prompt=prompt,
+                    negative_prompt=negative_prompt,
+                    height=project_settings.height,
+                    width=project_settings.width,
+                    data={"condition_scale": 1, "shot_uuid": shot_uuid},
+                )
+
+                client, model = ml_client, ML_MODEL.ipadapter_plus
+
+            elif generation_method == InputImageStyling.IPADPTER_FACE_AND_PLUS.value:
+                # validation
+                if not (st.session_state["input_image_2"] and st.session_state["input_image_1"]):
+                    st.error("Please upload both images")
+                    return
+
+                plus_image_file = save_new_image(st.session_state["input_image_1"], project_uuid)
+                face_image_file = save_new_image(st.session_state["input_image_2"], project_uuid)
+                query_obj = MLQueryObject(
+                    timing_uuid=None,
+                    model_uuid=None,
+                    image_uuid=plus_image_file.uuid,
+                    guidance_scale=5,
+                    seed=-1,
+                    num_inference_steps=30,
+                    strength=(strength_of_image_1 / 100, strength_of_image_2 / 100),  # (face, plus)
+                    adapter_type=None,
+                    prompt=prompt,
+                    negative_prompt=negative_prompt,
+                    height=project_settings.height,
+                    width=project_settings.width,
+                    data={"file_image_2_uuid": face_image_file.uuid, "shot_uuid": shot_uuid},
+                )
+
+                client, model = ml_client, ML_MODEL.ipadapter_face_plus
+
+            elif generation_method == InputImageStyling.INPAINTING.value:
+                if not ("mask_to_use" in st.session_state and st.session_state["mask_to_use"]):
+                    st.error("Please create and save mask before generation")
+                    toggle_generate_inference(position)
+                    time.sleep(0.7)
+                    return
+
+                query_obj = MLQueryObject(
+                    timing_uuid=None,
+                    model_uuid=None,
+                    guidance_scale=6,
+                    seed=-1,
+                    num_inference_steps=25,
+                    strength=0.5,
+                    adapter_type=None,
+                    prompt=prompt,
+                    negative_prompt=negative_prompt,
+                    height=project_settings.height,
+                    width=project_settings.width,
+                    data={
+                        "shot_uuid": shot_uuid,
+                        "mask": st.session_state["mask_to_use"],
+                        "input_image": st.session_state["editing_image"],
                         "project_uuid": project_uuid,
-                        "timing_uuid": timing_uuid,
-                        "promote_new_generation": False,
-                        "shot_uuid": shot_uuid if shot_uuid else "explorer",
-                    }
+                    },
+                )
+
+                client, model = ml_client, ML_MODEL.sdxl_inpainting
 
-                    process_inference_output(**inference_data)
+            # the generations are sent together (concurrently for the remote inference), the variants
+            # share the query and its input images
+            res_list = (
+                client.predict_model_output_standardized_variants(
+                    model, query_obj, number_to_generate, queue_inference=QUEUE_INFERENCE_QUERIES
+                )
+                if client
+                else []
+            )
+            for res in res_list:
+                output, log = res if res else (None, None)
+                if not log:
+                    continue
+
+                inference_data = {
+                    "inference_type": (
+                        InferenceType.GALLERY_IMAGE_GENERATION.value
+                        if position == "explorer"
+                        else InferenceType.FRAME_TIMING_IMAGE_INFERENCE.value
+                    ),
+                    "output": output,
+                    "log_uuid": log.uuid,
+                    "project_uuid": project_uuid,
+                    "timing_uuid": timing_uuid,
+                    "promote_new_generation": False,
+                    "shot_uuid": shot_uuid if shot_uuid else "explorer",
+                }
+
+                process_inference_output(**inference_data)
 
             st.info("Check the Generation Log to the left for the status.")
             time.sleep(0.5)
@@ -748,16 +744,18 @@ def gallery_image_view(project_uuid, shortlist=False, view=["main"], shot=None,
     if shot_uuid_list and not sidebar:
         gallery_image_filter_data["shot_uuid_list"] = shot_uuid_list
 
+    # the inference logs are only needed when their details are displayed
+    gallery_image_filter_data["slim"] = "view_inference_details" not in view
     gallery_image_list, res_payload = data_repo.get_all_file_list(**gallery_image_filter_data)
 
+    # the page count is approximate, the page selector picks up the updated count on the next run
+    total_pages = res_payload.get("total_pages", None)
     if not shortlist:
-        if project_settings.total_gallery_pages != res_payload["total_pages"]:
-            project_settings.total_gallery_pages = res_payload["total_pages"]
-            st.rerun()
+        if total_pages and project_settings.total_gallery_pages != total_pages:
+            project_settings.total_gallery_pages = total_pages
     else:
-        if project_settings.total_shortlist_gallery_pages != res_payload["total_pages"]:
-            project_settings.total_shortlist_gallery_pages = res_payload["total_pages"]
-            st.rerun()
+        if total_pages and project_settings.total_shortlist_gallery_pages != total_pages:
+            project_settings.total_shortlist_gallery_pages = total_pages
 
     if shortlist is False:
         _, fetch2, fetch3, _ = st.columns([0.25, 1, 1, 0.25])
@@ -801,12 +799,14 @@ def gallery_image_view(project_uuid, shortlist=False, view=["main"], shot=None,
         end_index = min(start_index + num_items_per_page, total_image_count)
         shot_names = [s.name for s in shot_list]
         shot_names.append("**Create New Shot**")
+        # the missing previews are generated together
+        thumbnail_location_list = get_thumbnail_location_list(gallery_image_list)
         for i in range(start_index, end_index, num_columns):
             cols = st.columns(num_columns)
             for j in range(num_columns):
                 if i + j < len(gallery_image_list):
                     with cols[j]:
-                        st.image(gallery_image_list[i + j].location, use_column_width=True)
+                        st.image(thumbnail_location_list[i + j], use_column_width=True)
                         # ---------- add to shot btn ---------------
                         if "last_shot_number" not in st.session_state:
                             st.session_state["last_shot_number"] = 0
@@ -898,10 +898,10 @@ def gallery_image_view(project_uuid, shortlist=False, view=["main"], shot=None,
                                     st.rerun()
 
                         # -------- inference details --------------
-                        if gallery_image_list[i + j].inference_log:
-                            log = gallery_image_list[
-                                i + j
-                            ].inference_log  # data_repo.get_inference_log_from_uuid(gallery_image_list[i + j].inference_log.uuid)
+                        if not gallery_image_list[i + j].inference_log_uuid:
+                            st.warning("No data found")
+                        elif "view_inference_details" in view:
+                            log = gallery_image_list[i + j].inference_log
                             if log:
                                 input_params = json.loads(log.input_params)
                                 prompt = input_params.get("prompt", None)
@@ -910,14 +910,11 @@ def gallery_image_view(project_uuid, shortlist=False, view=["main"], shot=None,
                                         "prompt", "Prompt not found"
                                     )
                                 model = json.loads(log.output_details)["model_name"].split("/")[-1]
-                                if "view_inference_details" in view:
-                                    with st.expander("Prompt Details", expanded=open_detailed_view_for_all):
-                                        st.info(f"**Prompt:** {prompt}\n\n**Model:** {model}")
+                                with st.expander("Prompt Details", expanded=open_detailed_view_for_all):
+                                    st.info(f"**Prompt:** {prompt}\n\n**Model:** {model}")
 
                             else:
                                 st.warning("No inference data")
-                        else:
-                            st.warning("No data found")
 
             st.markdown("***")
     else:
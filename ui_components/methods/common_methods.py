@@ -29,6 +29,7 @@ from shared.logging.logging import AppLogger
 from ui_components.constants import SECOND_MASK_FILE, WorkflowStageType
 from ui_components.methods.file_methods import (
     convert_bytes_to_file,
+    convert_local_file_to_file,
     generate_pil_image,
     generate_temp_file,
     save_or_host_file,
@@ -498,29 +499,33 @@ def extract_canny_lines(
     return canny_image_file
 
 
+# rgba fill of the masked area for every overlap_color (grey is used for the unknown ones)
+OVERLAP_COLOR_DICT = {"transparent": (0, 0, 0, 0), "grey": (128, 128, 128, 255)}
+MASK_WHITE_THRESHOLD = 245
+
+
 def combine_mask_and_input_image(mask_path, input_image_path, overlap_color="transparent"):
-    # Open the input image and the mask
+    return combine_mask_list_and_input_image([mask_path], input_image_path, overlap_color)
+
+
+# fills the white area of all the masks in the input image (in a single pass over the image array)
+def combine_mask_list_and_input_image(mask_path_list, input_image_path, overlap_color="transparent"):
     input_image = (
         Image.open(input_image_path) if not isinstance(input_image_path, Image.Image) else input_image_path
     )
-    mask_image = Image.open(mask_path) if not isinstance(mask_path, Image.Image) else mask_path
-    input_image = input_image.convert("RGBA")
-
-    # input_image.save("input_image.png")
-    # mask_image.save("mask_image.png")
-    is_white = lambda pixel, threshold=245: all(value > threshold for value in pixel[:3])
-    fill_color = (0.5, 0.5, 0.5, 1)  # default grey
-    if overlap_color == "transparent":
-        fill_color = (0, 0, 0, 0)
-    elif overlap_color == "grey":
-        fill_color = (0.5, 0.5, 0.5, 1)
+    input_array = np.array(input_image.convert("RGBA"))
+    height, width = input_array.shape[:2]
 
-    for x in range(mask_image.width):
-        for y in range(mask_image.height):
-            if is_white(mask_image.getpixel((x, y))):
-                input_image.putpixel((x, y), fill_color)
+    masked_area = np.zeros((height, width), dtype=bool)
+    for mask_path in mask_path_list:
+        mask_image = Image.open(mask_path) if not isinstance(mask_path, Image.Image) else mask_path
+        # a pixel is masked if all of its rgb values are above the threshold (alpha is ignored)
+        mask_array = np.asarray(mask_image.convert("RGB"))[:height, :width]
+        mask_height, mask_width = mask_array.shape[:2]
+        masked_area[:mask_height, :mask_width] |= (mask_array > MASK_WHITE_THRESHOLD).all(axis=2)
 
-    return input_image
+    input_array[masked_area] = OVERLAP_COLOR_DICT.get(overlap_color, OVERLAP_COLOR_DICT["grey"])
+    return Image.fromarray(input_array, "RGBA")
 
 
 # the input image is an image created by the PIL library
@@ -780,32 +785,35 @@ def process_inference_output(**kwargs):
                 return False
 
             output = output[-1] if isinstance(output, list) else output
-            # output can also be an url
-            if isinstance(output, str):
-                if output.startswith("http"):
-                    temp_output_file = generate_temp_file(output, ".mp4")
-                    output = None
-                    with open(temp_output_file.name, "rb") as f:
-                        output = f.read()
-
-                    os.remove(temp_output_file.name)
-                else:
-                    with open(output, "rb") as f:
-                        output = f.read()
-
             # if 'normalise_speed' in settings and settings['normalise_speed']:
             #     output = VideoProcessor.update_video_bytes_speed(output, shot.duration)
 
             video_location = (
                 "videos/" + str(shot.project.uuid) + "/assets/videos/0_raw/" + str(uuid.uuid4()) + ".mp4"
             )
-            video = convert_bytes_to_file(
-                file_location_to_save=video_location,
-                mime_type="video/mp4",
-                file_bytes=output,
-                project_uuid=shot.project.uuid,
-                inference_log_id=log_uuid,
-            )
+            # output can also be an url or a file path, these are streamed/copied instead of being read in memory
+            if isinstance(output, str):
+                if output.startswith("http"):
+                    output, move = generate_temp_file(output, ".mp4").name, True
+                else:
+                    move = False
+
+                video = convert_local_file_to_file(
+                    file_location_to_save=video_location,
+                    mime_type="video/mp4",
+                    local_file_path=output,
+                    project_uuid=shot.project.uuid,
+                    inference_log_id=log_uuid,
+                    move=move,
+                )
+            else:
+                video = convert_bytes_to_file(
+                    file_location_to_save=video_location,
+                    mime_type="video/mp4",
+                    file_bytes=output,
+                    project_uuid=shot.project.uuid,
+                    inference_log_id=log_uuid,
+                )
 
             if not shot.main_clip or settings.get("promote_to_main_variant", False):
                 output_video = sync_audio_and_duration(video, shot_uuid)
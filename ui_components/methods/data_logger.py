@@ -10,23 +10,22 @@ from utils.ml_processor.constants import ML_MODEL, MLModel
 
 
 def log_model_inference(model: MLModel, time_taken, **kwargs):
-    kwargs_dict = dict(kwargs)
-
-    # removing object like bufferedreader, image_obj ..
-    for key, value in dict(kwargs_dict).items():
-        if not isinstance(value, (int, str, list, dict)):
-            del kwargs_dict[key]
+    data_repo = DataRepo()
+    log_data = get_inference_log_data(model, time_taken, get_log_ai_model(model), kwargs)
+    log = data_repo.create_inference_log(**log_data)
+    return log
 
-    data_str = json.dumps(kwargs_dict)
-    time_taken = round(time_taken, 2) if time_taken else 0
 
-    # system_logger = AppLogger()
-    # logging_payload = LoggingPayload(message="logging inference data", data=data)
+# logs a batch of inferences of the same model (e.g. variants) with a single insert
+def log_model_inference_list(model: MLModel, time_taken, kwargs_list):
+    data_repo = DataRepo()
+    ai_model = get_log_ai_model(model)
+    log_data_list = [get_inference_log_data(model, time_taken, ai_model, kwargs) for kwargs in kwargs_list]
+    log_list = data_repo.create_inference_log_list(log_data_list)
+    return log_list
 
-    # # logging in console
-    # system_logger.log(LoggingType.INFERENCE_CALL, logging_payload)
 
-    # storing the log in db
+def get_log_ai_model(model: MLModel):
     data_repo = DataRepo()
     user_id = get_current_user_uuid()
     ai_model = data_repo.get_ai_model_from_name(model.name, user_id)
@@ -41,6 +40,26 @@ def log_model_inference(model: MLModel, time_taken, **kwargs):
     ]:
         ai_model = data_repo.get_ai_model_from_name(ML_MODEL.sdxl.name, user_id)
 
+    return ai_model
+
+
+def get_inference_log_data(model: MLModel, time_taken, ai_model, kwargs):
+    kwargs_dict = dict(kwargs)
+
+    # removing object like bufferedreader, image_obj ..
+    for key, value in dict(kwargs_dict).items():
+        if not isinstance(value, (int, str, list, dict)):
+            del kwargs_dict[key]
+
+    data_str = json.dumps(kwargs_dict)
+    time_taken = round(time_taken, 2) if time_taken else 0
+
+    # system_logger = AppLogger()
+    # logging_payload = LoggingPayload(message="logging inference data", data=data)
+
+    # # logging in console
+    # system_logger.log(LoggingType.INFERENCE_CALL, logging_payload)
+
     log_data = {
         "project_id": st.session_state["project_uuid"],
         "model_id": ai_model.uuid if ai_model else None,
@@ -59,5 +78,4 @@ def log_model_inference(model: MLModel, time_taken, **kwargs):
         "model_name": model.display_name(),
     }
 
-    log = data_repo.create_inference_log(**log_data)
-    return log
+    return log_data
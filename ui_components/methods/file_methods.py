@@ -21,9 +21,13 @@ import requests
 import streamlit as st
 from shared.constants import SERVER, InternalFileType, ServerType
 from ui_components.models import InternalFileObject
+from utils.cache.media_cache import get_local_file_path, media_cache
 from utils.data_repo.data_repo import DataRepo
 
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # files are downloaded in chunks of this size (bytes)
+
+
 # depending on the environment it will either save or host the PIL image object
 def save_or_host_file(file, path, mime_type="image/png", dim=None):
     data_repo = DataRepo()
@@ -114,6 +118,27 @@ def normalize_size_internal_file_obj(file_obj: InternalFileObject, **kwargs):
     return file_obj
 
 
+# same as save_or_host_file_bytes but for a file on the disk, which is either uploaded as a stream or
+# moved (copied if move is False) to path, so the file is never loaded in memory
+def save_or_host_local_file(local_file_path, path, ext=".mp4", move=True):
+    uploaded_url = None
+    if SERVER != ServerType.DEVELOPMENT.value:
+        data_repo = DataRepo()
+        with open(local_file_path, "rb") as f:
+            uploaded_url = data_repo.upload_file(f, ext)
+
+        if move:
+            os.remove(local_file_path)
+    elif os.path.abspath(local_file_path) != os.path.abspath(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if move:
+            shutil.move(local_file_path, path)
+        else:
+            shutil.copyfile(local_file_path, path)
+
+    return uploaded_url
+
+
 def save_or_host_file_bytes(video_bytes, path, ext=".mp4"):
     uploaded_url = None
     if SERVER != ServerType.DEVELOPMENT.value:
@@ -151,17 +176,29 @@ def add_temp_file_to_project(project_uuid, key, file_path):
 
 
 def generate_temp_file(url, ext=".mp4"):
-    response = requests.get(url)
-    if not response.ok:
-        raise ValueError(f"Could not download video from URL: {url}")
-
     temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=ext, mode="wb")
-    temp_file.write(response.content)
     temp_file.close()
 
+    try:
+        download_file(url, temp_file.name)
+    except Exception:
+        os.remove(temp_file.name)
+        raise ValueError(f"Could not download video from URL: {url}")
+
     return temp_file
 
 
+def download_file(url, file_path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    # streams the response to the disk, so the memory used doesn't depend on the size of the file
+    with requests.get(url, stream=True) as response:
+        response.raise_for_status()
+        with open(file_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+
+    return file_path
+
+
 def generate_pil_image(img: Union[Image.Image, str, np.ndarray, io.BytesIO]):
     # Check if img is a PIL image
     if isinstance(img, Image.Image):
@@ -169,8 +206,7 @@ def generate_pil_image(img: Union[Image.Image, str, np.ndarray, io.BytesIO]):
 
     # Check if img is a URL
     elif isinstance(img, str) and bool(urlparse(img).netloc):
-        response = requests.get(img)
-        img = Image.open(BytesIO(response.content))
+        img = Image.open(get_local_file_path(img))
 
     # Check if img is a local file
     elif isinstance(img, str):
@@ -229,6 +265,47 @@ def convert_bytes_to_file(
     return file
 
 
+# same as convert_bytes_to_file but for a file which is already on the disk (avoids loading it in memory locally)
+def convert_local_file_to_file(
+    file_location_to_save,
+    mime_type,
+    local_file_path,
+    project_uuid,
+    inference_log_id=None,
+    filename=None,
+    tag="",
+    move=True,
+) -> InternalFileObject:
+    data_repo = DataRepo()
+
+    hosted_url = save_or_host_local_file(
+        local_file_path, file_location_to_save, "." + mime_type.split("/")[1], move=move
+    )
+
+    file_data = {
+        "name": str(uuid.uuid4()) + "." + mime_type.split("/")[1] if not filename else filename,
+        "type": (
+            InternalFileType.VIDEO.value
+            if "video" in mime_type
+            else (InternalFileType.AUDIO.value if "audio" in mime_type else InternalFileType.IMAGE.value)
+        ),
+        "project_id": project_uuid,
+        "tag": tag,
+    }
+
+    if inference_log_id:
+        file_data.update({"inference_log_id": str(inference_log_id)})
+
+    if hosted_url:
+        file_data.update({"hosted_url": hosted_url})
+    else:
+        file_data.update({"local_path": file_location_to_save})
+
+    file = data_repo.create_file(**file_data)
+
+    return file
+
+
 def convert_file_to_base64(fh: io.IOBase) -> str:
     fh.seek(0)
 
@@ -284,28 +361,19 @@ def zip_images(image_locations, zip_filename="images.zip", filename_list=[]):
             else:
                 image_name = f"{padded_idx}.png"
 
-            if image_location.startswith("http"):
-                response = requests.get(image_location)
-                image_data = response.content
+            image_location = get_local_file_path(image_location)
 
-                # Open the image for inspection and possible conversion
-                with Image.open(BytesIO(image_data)) as img:
+            # open, possibly convert, and then add to zip
+            with Image.open(image_location) as img:
+                if img.mode == "RGB" and img.format == "PNG":
+                    # the file can be added as it is
+                    zip_file.write(image_location, image_name)
+                else:
                     if img.mode != "RGB":
                         img = img.convert("RGB")
 
-                    # Save the potentially converted image to a byte stream
-                    with BytesIO() as output:
+                    with zip_file.open(image_name, "w") as output:
                         img.save(output, format="PNG")
-                        zip_file.writestr(image_name, output.getvalue())
-            else:
-                # For local files, open, possibly convert, and then add to zip
-                with Image.open(image_location) as img:
-                    if img.mode != "RGB":
-                        img = img.convert("RGB")
-
-                    img.save(image_name, format="PNG")
-                    zip_file.write(image_name, image_name)
-                    os.remove(image_name)  # Clean up the temporary file
 
     return zip_filename
 
@@ -453,7 +521,14 @@ def detect_and_draw_contour(image):
 
 def get_file_size(file_path):
     file_size = 0
-    if file_path.startswith("http://") or file_path.startswith("https://"):
+    cached_file_path = (
+        media_cache.get_cached_file_path(file_path)
+        if urlparse(file_path).scheme in ["http", "https"]
+        else None
+    )
+    if cached_file_path:
+        file_size = os.path.getsize(cached_file_path)
+    elif file_path.startswith("http://") or file_path.startswith("https://"):
         response = requests.head(file_path)
         if response.status_code == 200:
             file_size = int(response.headers.get("content-length", 0))
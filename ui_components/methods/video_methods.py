@@ -1,3 +1,5 @@
+import hashlib
+import json
 import os
 import random
 import string
@@ -19,19 +21,27 @@ from moviepy.editor import (
 )
 from pydub import AudioSegment
 
-from shared.constants import QUEUE_INFERENCE_QUERIES, InferenceType, InternalFileTag
+from shared.constants import SERVER, QUEUE_INFERENCE_QUERIES, InferenceType, InternalFileTag, ServerType
 from shared.file_upload.s3 import is_s3_image_url
-from ui_components.methods.file_methods import save_or_host_file_bytes
+from ui_components.methods.file_methods import save_or_host_file_bytes, save_or_host_local_file
 from ui_components.models import InternalFileObject, InternalFrameTimingObject, InternalShotObject
 from utils.common_utils import padded_integer
 from utils.constants import MLQueryObject
 from utils.data_repo.data_repo import DataRepo
+from utils.cache.media_cache import get_local_file_path
 from utils.media_processor.interpolator import VideoInterpolator
-from utils.media_processor.video import VideoProcessor
+from utils.media_processor.video import SEGMENT_AUDIO_SETTINGS, VideoProcessor
 from utils.ml_processor.constants import ML_MODEL
 from utils.ml_processor.ml_interface import get_ml_client
 
 
+RENDER_CACHE_VERSION = 1  # bump this when the way segments are processed changes
+# number of processes the shot segments are prepared across
+RENDER_WORKER_COUNT = int(os.getenv("RENDER_WORKER_COUNT", min(8, os.cpu_count() or 1)))
+# unused segments are only pruned after this long (secs), other renders of the project may still need them
+RENDER_CACHE_GRACE_PERIOD = 24 * 60 * 60
+
+
 def create_single_interpolated_clip(
     shot_uuid, quality, settings={}, variant_count=1, backlog=False, img_list=[]
 ):
@@ -136,13 +146,11 @@ def upscale_video(shot_uuid, styling_model, upscale_factor, promote_to_main_vari
 
 
 def update_speed_of_video_clip(video_file: InternalFileObject, duration) -> InternalFileObject:
-    from ui_components.methods.file_methods import generate_temp_file, convert_bytes_to_file
-
-    temp_video_file = None
-    if video_file.hosted_url and is_s3_image_url(video_file.hosted_url):
-        temp_video_file = generate_temp_file(video_file.hosted_url, ".mp4")
-
-    location_of_video = temp_video_file.name if temp_video_file else video_file.local_path
+    location_of_video = (
+        get_local_file_path(video_file.hosted_url)
+        if video_file.hosted_url and is_s3_image_url(video_file.hosted_url)
+        else video_file.local_path
+    )
 
     new_file_name = "".join(random.choices(string.ascii_lowercase + string.digits, k=16)) + ".mp4"
     new_file_location = (
@@ -158,9 +166,6 @@ def update_speed_of_video_clip(video_file: InternalFileObject, duration) -> Inte
     else:
         data_repo.update_file(video_file.uuid, local_path=new_file_location)
 
-    if temp_video_file:
-        os.remove(temp_video_file.name)
-
     return video_file
 
 
@@ -203,8 +208,6 @@ def sync_audio_and_duration(video_file: InternalFileObject, shot_uuid, audio_syn
     """
     audio_sync_required: this ensures that entire video clip is filled with proper audio
     """
-    from ui_components.methods.file_methods import convert_bytes_to_file, generate_temp_file
-
     data_repo = DataRepo()
     shot: InternalShotObject = data_repo.get_shot_from_uuid(shot_uuid)
     shot_list = data_repo.get_shot_list(shot.project.uuid)
@@ -215,9 +218,6 @@ def sync_audio_and_duration(video_file: InternalFileObject, shot_uuid, audio_syn
     output_video = video_file
 
     # --------- add audio
-    temp_file_list = []
-    temp_audio_file = None
-
     if not project_settings.audio:
         print("no audio to sync")
         if not audio_sync_required:
@@ -225,18 +225,9 @@ def sync_audio_and_duration(video_file: InternalFileObject, shot_uuid, audio_syn
         else:
             return None
 
-    if "http" in project_settings.audio.location:
-        temp_audio_file = generate_temp_file(project_settings.audio.location, ".mp4")
-        temp_file_list.append(temp_audio_file)
-
-    audio_location = temp_audio_file.name if temp_audio_file else project_settings.audio.location
-
-    temp_video_file = None
-    if output_video.hosted_url:
-        temp_video_file = generate_temp_file(output_video.hosted_url, ".mp4")
-        temp_file_list.append(temp_video_file)
-
-    video_location = temp_video_file.name if temp_video_file else output_video.local_path
+    # hosted files are downloaded only once (check media_cache)
+    audio_location = get_local_file_path(project_settings.audio.location)
+    video_location = get_local_file_path(output_video.hosted_url or output_video.local_path)
 
     audio_clip = AudioFileClip(audio_location)
     video_clip = VideoFileClip(video_location)
@@ -267,9 +258,6 @@ def sync_audio_and_duration(video_file: InternalFileObject, shot_uuid, audio_syn
         else:
             video_clip = video_clip.set_audio(trimmed_audio_clip)
     else:
-        for file in temp_file_list:
-            os.remove(file.name)
-
         return output_video
 
     # writing the video to the temp file
@@ -277,33 +265,67 @@ def sync_audio_and_duration(video_file: InternalFileObject, shot_uuid, audio_syn
     video_clip.write_videofile(output_temp_video_file.name, codec="libx264", audio=True, audio_codec="aac")
 
     output_temp_video_file.close()
-    video_bytes = None
-    with open(output_temp_video_file.name, "rb") as f:
-        video_bytes = f.read()
 
-    temp_file_list.append(output_temp_video_file)
     unique_name = str(uuid.uuid4())
     output_video_file = f"videos/{shot.project.uuid}/assets/videos/0_raw/{unique_name}.mp4"
-    hosted_url = save_or_host_file_bytes(video_bytes, output_video_file, ext=".mp4")
+    hosted_url = save_or_host_local_file(output_temp_video_file.name, output_video_file, ext=".mp4")
     if hosted_url:
         data_repo.update_file(output_video.uuid, hosted_url=hosted_url)
     else:
         data_repo.update_file(output_video.uuid, local_path=output_video_file)
 
-    for file in temp_file_list:
-        os.remove(file.name)
-
     output_video = data_repo.get_file_from_uuid(output_video.uuid)
     _ = data_repo.get_shot_list(shot.project.uuid, invalidate_cache=True)
     return output_video
 
 
-def render_video(final_video_name, project_uuid, file_tag=InternalFileTag.GENERATED_VIDEO.value):
+def get_render_segment_key(shot: InternalShotObject, audio_file: InternalFileObject, start_timestamp):
+    # the segment of a shot only needs to be processed again if any of these change
+    key_data = {
+        "version": RENDER_CACHE_VERSION,
+        "main_clip": str(shot.main_clip.uuid),
+        "audio": str(audio_file.uuid) if audio_file else None,
+        "start_timestamp": start_timestamp,
+        "duration": shot.duration,
+        "settings": SEGMENT_AUDIO_SETTINGS,
+    }
+    return hashlib.sha1(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+
+def prune_render_cache(render_cache_dir, video_list, grace_period=RENDER_CACHE_GRACE_PERIOD):
     """
-    combines the main variant of all the shots to form the final video. no processing happens in this, only
-    simple combination
+    removes the finished segments which aren't part of video_list and haven't been used for grace_period.
+    the segments being written (*.tmp.mp4) and the ones used by other renders in the meantime are kept
     """
-    from ui_components.methods.file_methods import convert_bytes_to_file, generate_temp_file
+    current_time = time.time()
+    for file_name in os.listdir(render_cache_dir):
+        file_path = os.path.join(render_cache_dir, file_name)
+        if not file_name.endswith(".mp4") or file_name.endswith(".tmp.mp4") or file_path in video_list:
+            continue
+
+        try:
+            if current_time - os.path.getmtime(file_path) > grace_period:
+                os.remove(file_path)
+        except FileNotFoundError:
+            # already removed by another render
+            pass
+
+
+def render_video(
+    final_video_name,
+    project_uuid,
+    file_tag=InternalFileTag.GENERATED_VIDEO.value,
+    reencode=False,
+    max_workers=RENDER_WORKER_COUNT,
+):
+    """
+    combines the main variant of all the shots (along with the project audio) to form the final video.
+    no processing happens in this, only simple combination. the clips are joined without re-encoding
+    whenever they are compatible (check VideoProcessor.concat_videos), reencode=True re-encodes the entire video.
+    the per shot segments are cached in the render_cache dir of the project, so only the shots which
+    have changed since the last render are processed again (max_workers at a time)
+    """
+    from ui_components.methods.file_methods import convert_local_file_to_file
 
     data_repo = DataRepo()
 
@@ -312,11 +334,6 @@ def render_video(final_video_name, project_uuid, file_tag=InternalFileTag.GENERA
         time.sleep(0.3)
         return False
 
-    video_list = []
-    temp_file_list = []
-
-    # combining all the main_clip of shots in finalclip, and keeping track of temp video files
-    # in temp_file_list
     shot_list: List[InternalShotObject] = data_repo.get_shot_list(project_uuid)
     for shot in shot_list:
         if not shot.main_clip:
@@ -324,46 +341,67 @@ def render_video(final_video_name, project_uuid, file_tag=InternalFileTag.GENERA
             time.sleep(0.7)
             return False
 
-        shot_video = sync_audio_and_duration(shot.main_clip, shot.uuid, audio_sync_required=False)
-        if not shot_video:
-            st.error("Audio sync failed. Length mismatch")
-            time.sleep(0.7)
-            return False
-
-        data_repo.update_shot(uuid=shot.uuid, main_clip_id=shot_video.uuid)
-        data_repo.add_interpolated_clip(shot.uuid, interpolated_clip_id=shot_video.uuid)
-
-        temp_video_file = None
-        if shot_video.hosted_url:
-            temp_video_file = generate_temp_file(shot_video.hosted_url, ".mp4")
-            temp_file_list.append(temp_video_file)
-
-        file_path = temp_video_file.name if temp_video_file else shot_video.local_path
-        video_list.append(file_path)
+    temp_file_list = []
+    project_settings = data_repo.get_project_setting(project_uuid)
+    audio_file = project_settings.audio
+    # resolved by each segment job, a local copy fetched at the start could be evicted from the media
+    # cache while a long render is still going on
+    audio_location = audio_file.location if audio_file else None
 
-    finalclip = concatenate_videoclips([VideoFileClip(v) for v in video_list])
+    render_cache_dir = f"videos/{project_uuid}/assets/videos/render_cache"
+    os.makedirs(render_cache_dir, exist_ok=True)
 
-    # writing the video to the temp file
+    video_list = []  # in the order of the shots
+    segment_job_list = []
+    start_timestamp = 0
+    for shot in shot_list:
+        if not (audio_file or shot.main_clip.hosted_url):
+            # nothing to process, the clip can be used as it is
+            video_list.append(shot.main_clip.local_path)
+        else:
+            segment_key = get_render_segment_key(shot, audio_file, start_timestamp)
+            segment_path = os.path.join(render_cache_dir, f"{segment_key}.mp4")
+            if os.path.exists(segment_path):
+                # marking the segment as recently used, so that it isn't pruned by another render
+                os.utime(segment_path)
+            elif segment_path not in [j[-1] for j in segment_job_list]:
+                segment_job_list.append(
+                    (shot.main_clip.location, audio_location, start_timestamp, segment_path)
+                )
+            video_list.append(segment_path)
+
+        start_timestamp = round(start_timestamp + round(shot.duration, 2), 2)
+
+    # the segments are independent of each other, so they are prepared in parallel
+    if segment_job_list:
+        progress_bar = st.progress(0)
+        VideoProcessor.prepare_render_segment_list(
+            segment_job_list,
+            max_workers,
+            lambda done_count, total_count: progress_bar.progress(
+                done_count / total_count, text=f"Prepared {done_count} of {total_count} shots"
+            ),
+        )
+
+    prune_render_cache(render_cache_dir, video_list)
+
+    # writing the video directly to its final location (a temp file when it has to be uploaded)
     output_video_file = f"videos/{project_uuid}/assets/videos/2_completed/{final_video_name}.mp4"
-    temp_video_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-    finalclip.write_videofile(
-        temp_video_file.name,
-        fps=60,  # or 60 if your original video is 60fps
-        audio_bitrate="128k",
-        bitrate="5000k",
-        codec="libx264",
-        audio_codec="aac",
-    )
+    if SERVER == ServerType.DEVELOPMENT.value:
+        os.makedirs(os.path.dirname(output_video_file), exist_ok=True)
+        render_location = output_video_file
+    else:
+        temp_video_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
+        temp_video_file.close()
+        temp_file_list.append(temp_video_file)
+        render_location = temp_video_file.name
 
-    temp_video_file.close()
-    video_bytes = None
-    with open(temp_video_file.name, "rb") as f:
-        video_bytes = f.read()
+    VideoProcessor.concat_videos(video_list, render_location, reencode=reencode)
 
-    _ = convert_bytes_to_file(
+    _ = convert_local_file_to_file(
         file_location_to_save=output_video_file,
         mime_type="video/mp4",
-        file_bytes=video_bytes,
+        local_file_path=render_location,
         project_uuid=project_uuid,
         inference_log_id=None,
         filename=final_video_name,
@@ -19,10 +19,54 @@ class InternalFileObject:
         self.tag = kwargs["tag"] if key_present("tag", kwargs) else None
         self.created_on = kwargs["created_on"] if key_present("created_on", kwargs) else None
         self.shot_uuid = kwargs["shot_uuid"] if key_present("shot_uuid", kwargs) else ""
-        self.inference_log = (
+        self._inference_log = (
             InferenceLogObject(**kwargs["inference_log"]) if key_present("inference_log", kwargs) else None
         )
-        self.project = InternalProjectObject(**kwargs["project"]) if key_present("project", kwargs) else None
+        self._project = InternalProjectObject(**kwargs["project"]) if key_present("project", kwargs) else None
+        # slim objects (SlimInternalFileDto) only have the uuids of the relations, these are
+        # fetched the first time they are accessed
+        self._is_hydrated = not ("inference_log_uuid" in kwargs or "project_uuid" in kwargs)
+        self.inference_log_uuid = (
+            kwargs["inference_log_uuid"]
+            if key_present("inference_log_uuid", kwargs)
+            else (self._inference_log.uuid if self._inference_log else None)
+        )
+        self.project_uuid = (
+            kwargs["project_uuid"]
+            if key_present("project_uuid", kwargs)
+            else (self._project.uuid if self._project else None)
+        )
+
+    def _hydrate(self):
+        from utils.data_repo.data_repo import DataRepo
+
+        # fetched without the cache, the cached file can be this (slim) object itself
+        self._is_hydrated = True
+        res = DataRepo().db_repo.get_file_from_uuid(self.uuid)
+        if res.status and res.data["data"]:
+            fresh_obj = InternalFileObject(**res.data["data"])
+            self._inference_log = fresh_obj.inference_log
+            self._project = fresh_obj.project
+
+    @property
+    def inference_log(self):
+        if not self._is_hydrated and self.inference_log_uuid:
+            self._hydrate()
+        return self._inference_log
+
+    @inference_log.setter
+    def inference_log(self, value):
+        self._inference_log = value
+
+    @property
+    def project(self):
+        if not self._is_hydrated and self.project_uuid:
+            self._hydrate()
+        return self._project
+
+    @project.setter
+    def project(self, value):
+        self._project = value
 
     @property
     def location(self):
@@ -143,7 +187,13 @@ class InternalFrameTimingObject:
         self.source_image = (
             InternalFileObject(**kwargs["source_image"]) if key_present("source_image", kwargs) else None
         )
-        self.shot = InternalShotObject(**kwargs["shot"]) if key_present("shot", kwargs) else None
+        self._shot = InternalShotObject(**kwargs["shot"]) if key_present("shot", kwargs) else None
+        # slim objects (SlimTimingDto) only have the shot uuid, the shot is fetched when accessed
+        self.shot_uuid = (
+            kwargs["shot_uuid"]
+            if key_present("shot_uuid", kwargs)
+            else (self._shot.uuid if self._shot else None)
+        )
         self.mask = InternalFileObject(**kwargs["mask"]) if key_present("mask", kwargs) else None
         self.canny_image = (
             InternalFileObject(**kwargs["canny_image"]) if key_present("canny_image", kwargs) else None
@@ -158,6 +208,19 @@ class InternalFrameTimingObject:
         self.clip_duration = kwargs["clip_duration"] if key_present("clip_duration", kwargs) else 0
         self.aux_frame_index = kwargs["aux_frame_index"] if "aux_frame_index" in kwargs else 0
 
+    @property
+    def shot(self):
+        if not self._shot and self.shot_uuid:
+            from utils.data_repo.data_repo import DataRepo
+
+            data_repo = DataRepo()
+            self._shot = data_repo.get_shot_from_uuid(self.shot_uuid)
+        return self._shot
+
+    @shot.setter
+    def shot(self, value):
+        self._shot = value
+
     @property
     def alternative_images_list(self):
         if not (self.alternative_images and len(self.alternative_images)):
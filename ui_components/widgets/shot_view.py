@@ -11,16 +11,19 @@ from io import BytesIO
 import pandas as pd
 import streamlit as st
 import uuid
-import random
 from shared.constants import AppSubPage, InferenceParamType
 from ui_components.constants import WorkflowStageType
 from ui_components.methods.file_methods import generate_pil_image, get_file_bytes_and_extension, get_file_size
 from streamlit_option_menu import option_menu
 from shared.constants import InternalFileType
 from ui_components.models import InternalFrameTimingObject, InternalShotObject
-from ui_components.widgets.add_key_frame_element import add_key_frame, add_key_frame_section
+from ui_components.widgets.add_key_frame_element import add_key_frame_section
 from ui_components.widgets.common_element import duplicate_shot_button
-from ui_components.methods.common_methods import apply_coord_transformations, apply_image_transformations
+from ui_components.methods.common_methods import (
+    apply_coord_transformations,
+    apply_image_transformations,
+    save_new_image,
+)
 from ui_components.widgets.frame_movement_widgets import (
     change_frame_shot,
     delete_frame_button,
@@ -31,6 +34,7 @@ from ui_components.widgets.frame_movement_widgets import (
     delete_frame,
 )
 from utils.common_utils import refresh_app
+from utils.cache.thumbnail_store import get_thumbnail_location_list
 from utils.data_repo.data_repo import DataRepo
 from ui_components.methods.file_methods import save_or_host_file
 from utils import st_memory
@@ -60,8 +64,8 @@ def shot_keyframe_element(shot_uuid, items_per_row, column=None, position="Shots
                     use_container_width=True,
                     type="primary",
                 ):
-                    update_shot_frames(shot_uuid)
-                    st.rerun()
+                    if update_shot_frames(shot_uuid):
+                        st.rerun()
                 if f"shot_data_{shot_uuid}" not in st.session_state:
                     st.session_state[f"shot_data_{shot_uuid}"] = None
                 if st.session_state[f"shot_data_{shot_uuid}"] is None:
@@ -172,8 +176,8 @@ def shot_keyframe_element(shot_uuid, items_per_row, column=None, position="Shots
                 use_container_width=True,
                 type="primary",
             ):
-                update_shot_frames(shot_uuid)
-                st.rerun()
+                if update_shot_frames(shot_uuid):
+                    st.rerun()
             if st.button(
                 "Discard changes",
                 key=f"discard_changes_{shot.uuid}_2",
@@ -322,7 +326,8 @@ def default_shot_view(shot_uuid, items_per_row, position):
     option to jump to individual frame view
     """
     data_repo = DataRepo()
-    timing_list = data_repo.get_timing_list_from_shot(shot_uuid)
+    timing_list = data_repo.get_timing_list_from_shot(shot_uuid, slim=True)
+    thumbnail_location_list = get_thumbnail_location_list([timing.primary_image for timing in timing_list])
 
     for i in range(0, len(timing_list) + 1, items_per_row):
         with st.container():
@@ -337,7 +342,7 @@ def default_shot_view(shot_uuid, items_per_row, position):
                         else:
                             timing = timing_list[idx]
                             if timing.primary_image and timing.primary_image.location:
-                                st.image(timing.primary_image.location, use_column_width=True)
+                                st.image(thumbnail_location_list[idx], use_column_width=True)
                                 jump_to_single_frame_view_button(
                                     idx + 1, timing_list, f"jump_to_{idx + 1}", uuid=shot_uuid
                                 )
@@ -501,9 +506,14 @@ def move_temp_frame(df, current_position, direction):
     return df.sort_values("position").reset_index(drop=True)
 
 
+COPY_PREFIX = "Copy_of_"
+
+
 def copy_temp_frame(df, position_to_copy):
     new_row = df.loc[position_to_copy].copy()
-    new_row["uuid"] = f"Copy_of_{new_row['uuid']}"
+    # a copy of a copy is a copy of the same original frame
+    if not str(new_row["uuid"]).startswith(COPY_PREFIX):
+        new_row["uuid"] = f"{COPY_PREFIX}{new_row['uuid']}"
     df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
     # make the position current frame + 1 and all the frames after it + 1
     df.loc[position_to_copy + 1 :, "position"] = df.loc[position_to_copy + 1 :, "position"] + 1
@@ -719,30 +729,41 @@ def shot_animation_button(shot, show_label=False):
 
 def update_shot_frames(shot_uuid):
     """
-    Removes all the current frames present in the shot and adds new frames based on
-    the "shot_data_{shot_uuid}" key in the session_state
-    value of "shot_data_{shot_uuid}" is a pandas dataframe with image_location, uuid and idx columns
+    Applies the frame layout in the "shot_data_{shot_uuid}" key of the session_state to the shot
+    (moved, copied and deleted frames are saved in a single update). returns True if it was saved,
+    the edited layout is kept otherwise
+    value of "shot_data_{shot_uuid}" is a pandas dataframe with image_location, uuid and position columns
     """
     data_repo = DataRepo()
-    st.session_state[f"open_frame_changer_{shot_uuid}"] = False
-    timing_list = data_repo.get_timing_list_from_shot(shot_uuid)
-    data_repo.update_bulk_timing(
-        [timing.uuid for timing in timing_list], [{"is_disabled": True}] * len(timing_list)
-    )
-
-    progress_bar = st.progress(0)
-    total_items = len(st.session_state[f"shot_data_{shot_uuid}"])
-    random_list_of_emojis = ["🎉", "🎊", "🎈", "🎁", "🎀", "🎆", "🎇", "🧨", "🪅"]
-
-    # Add frames again and update progress
-    for idx, (index, row) in enumerate(st.session_state[f"shot_data_{shot_uuid}"].iterrows()):
-        selected_image_location = row["image_location"]
-        add_key_frame(selected_image_location, shot_uuid, refresh_state=False)
-
-        # Update the progress bar
-        progress = (idx + 1) / total_items
-        random_emoji = random.choice(random_list_of_emojis)
-        st.caption(f"Saving frame {idx + 1} of {total_items} {random_emoji}")
-        progress_bar.progress(progress)
+    shot = data_repo.get_shot_from_uuid(shot_uuid)
+    timing_map = {
+        str(timing.uuid): timing for timing in data_repo.get_timing_list_from_shot(shot_uuid, slim=True)
+    }
+
+    frame_list = []
+    with st.spinner("Saving frames..."):
+        for _, row in st.session_state[f"shot_data_{shot_uuid}"].iterrows():
+            # copied frames have their uuid prefixed with "Copy_of_" (older layouts can have it repeated)
+            timing_uuid = str(row["uuid"])
+            is_copy = timing_uuid.startswith(COPY_PREFIX)
+            while timing_uuid.startswith(COPY_PREFIX):
+                timing_uuid = timing_uuid[len(COPY_PREFIX) :]
+            frame = {"copy_of": timing_uuid} if is_copy else {"uuid": timing_uuid}
+
+            # saving the images which were edited in this view
+            timing = timing_map.get(frame.get("uuid", frame.get("copy_of")), None)
+            original_location = timing.primary_image.location if timing and timing.primary_image else None
+            if row["image_location"] and row["image_location"] != original_location:
+                frame["primary_image_id"] = save_new_image(row["image_location"], shot.project.uuid).uuid
+
+            frame_list.append(frame)
+
+        status = data_repo.apply_shot_frame_layout(shot_uuid, frame_list)
+
+    if not status:
+        st.error("Unable to save the frames, please try again")
+        return False
 
+    st.session_state[f"open_frame_changer_{shot_uuid}"] = False
     st.session_state[f"shot_data_{shot_uuid}"] = None
+    return True
@@ -3,6 +3,7 @@ import streamlit as st
 
 from shared.constants import (
     AppSubPage,
+    BatchEntityType,
     CreativeProcessPage,
     InferenceParamType,
     InferenceStatus,
@@ -16,6 +17,7 @@ import json
 import math
 from ui_components.widgets.frame_selector import update_current_frame_index
 
+from utils.cache.thumbnail_store import THUMBNAIL_SMALL, get_thumbnail_location
 from utils.data_repo.data_repo import DataRepo
 from utils.ml_processor.constants import ML_MODEL, MODEL_FILTERS
 
@@ -113,11 +115,11 @@ def sidebar_logger(shot_uuid):
 
     log_list, total_page_count = data_repo.get_all_inference_log_list(**log_filter_data)
 
-    if project_setting.total_log_pages != total_page_count:
+    # the page count is approximate, the page selector picks up the updated count on the next run
+    if total_page_count and project_setting.total_log_pages != total_page_count:
         project_setting.total_log_pages = total_page_count
-        st.rerun()
     with z2:
-        if total_page_count > 1:
+        if total_page_count and total_page_count > 1:
             st.caption(f"Total page count: {total_page_count}")
     # display_list = log_list[(page_number - 1) * items_per_page : page_number * items_per_page]
 
@@ -127,6 +129,17 @@ def sidebar_logger(shot_uuid):
         for file in file_list:
             log_file_dict[str(file.inference_log.uuid)] = file
 
+        # timings of the logs are fetched together instead of one request per log
+        timing_uuid_list = []
+        for log in log_list:
+            origin_data = json.loads(log.input_params).get(InferenceParamType.ORIGIN_DATA.value, None)
+            if (
+                origin_data
+                and origin_data.get("inference_type", "") == InferenceType.FRAME_TIMING_IMAGE_INFERENCE.value
+            ):
+                timing_uuid_list.append(origin_data.get("timing_uuid", None))
+        data_repo.prefetch_entity_list(BatchEntityType.TIMING.value, timing_uuid_list)
+
         # st.markdown("---")
         for _, log in enumerate(log_list):
             origin_data = json.loads(log.input_params).get(InferenceParamType.ORIGIN_DATA.value, None)
@@ -267,13 +280,13 @@ def video_inference_image_grid(origin_data):
             total_size = len(origin_data["settings"]["file_uuid_list"])
             file_uuid_list = origin_data["settings"]["file_uuid_list"][:2]
             image_list, _ = data_repo.get_all_file_list(
-                uuid__in=file_uuid_list, file_type=InternalFileType.IMAGE.value
+                uuid__in=file_uuid_list, file_type=InternalFileType.IMAGE.value, slim=True
             )  # extra element for displaying pending count
 
             num_images = len(image_list)
             for index in range(num_images + 1):
                 if index < num_images and image_list[index]:
-                    st.image(image_list[index].location, width=30)
+                    st.image(get_thumbnail_location(image_list[index], THUMBNAIL_SMALL), width=30)
                 else:
                     pending_count = total_size - len(image_list)
                     if pending_count:
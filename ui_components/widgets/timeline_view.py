@@ -21,6 +21,7 @@ from ui_components.widgets.shot_view import (
     delete_shot_button,
     create_video_download_button,
 )
+from utils.cache.thumbnail_store import get_thumbnail_location_list
 from utils.data_repo.data_repo import DataRepo
 from utils import st_memory
 
@@ -46,6 +47,9 @@ def timeline_view(shot_uuid, stage):
             if shot.main_clip and shot.main_clip.location:
                 individual_video_display_element(shot.main_clip)
             else:
+                thumbnail_location_list = get_thumbnail_location_list(
+                    [timing.primary_image for timing in timing_list]
+                )
                 for i in range(0, len(timing_list), items_per_row):
                     if i % items_per_row == 0:
                         grid_timing = st.columns(items_per_row)
@@ -55,7 +59,7 @@ def timeline_view(shot_uuid, stage):
                             with grid_timing[j]:
                                 timing = timing_list[i + j]
                                 if timing.primary_image and timing.primary_image.location:
-                                    st.image(timing.primary_image.location, use_column_width=True)
+                                    st.image(thumbnail_location_list[i + j], use_column_width=True)
 
             switch1, switch2 = st.columns([1, 1])
             with switch1:
@@ -8,6 +8,7 @@ import os
 from PIL import Image
 from shared.constants import (
     COMFY_BASE_PATH,
+    BatchEntityType,
     InferenceParamType,
     InternalFileTag,
     InferenceParamType,
@@ -25,6 +26,7 @@ from ui_components.widgets.shot_view import create_video_download_button
 from ui_components.models import InternalAIModelObject, InternalFileObject
 from ui_components.widgets.add_key_frame_element import add_key_frame
 from utils import st_memory
+from utils.cache.thumbnail_store import THUMBNAIL_LARGE, get_thumbnail_location_list
 from utils.data_repo.data_repo import DataRepo
 from utils.ml_processor.constants import ML_MODEL, ComfyWorkflow
 
@@ -128,6 +130,29 @@ def variant_comparison_grid(ele_uuid, stage=CreativeProcessType.MOTION.value):
             else int(timing.primary_variant_index)
         )
 
+        # Determine the start and end indices for additional variants on the current page
+        additional_variants = [idx for idx in range(len(variants) - 1, -1, -1) if idx != current_variant]
+        page_start = (page - 1) * items_to_show
+        page_end = page_start + items_to_show
+        page_indices = additional_variants[page_start:page_end]
+
+        # the variants shown are hydrated together instead of one request per variant
+        data_repo.prefetch_entity_list(
+            BatchEntityType.FILE.value,
+            [variants[idx].uuid for idx in [current_variant] + page_indices if variants[idx]],
+        )
+        # previews of the image variants, the missing ones are generated together
+        thumbnail_location_dict = (
+            dict(
+                zip(
+                    page_indices,
+                    get_thumbnail_location_list([variants[idx] for idx in page_indices], THUMBNAIL_LARGE),
+                )
+            )
+            if stage != CreativeProcessType.MOTION.value
+            else {}
+        )
+
         st.markdown("***")
         if stage == CreativeProcessType.MOTION.value:
             video_generation_counter(shot_uuid)
@@ -180,12 +205,6 @@ def variant_comparison_grid(ele_uuid, stage=CreativeProcessType.MOTION.value):
                 st.image(variants[current_variant].location, use_column_width=True)
                 image_variant_details(variants[current_variant])
 
-        # Determine the start and end indices for additional variants on the current page
-        additional_variants = [idx for idx in range(len(variants) - 1, -1, -1) if idx != current_variant]
-        page_start = (page - 1) * items_to_show
-        page_end = page_start + items_to_show
-        page_indices = additional_variants[page_start:page_end]
-
         next_col = 1
         for i, variant_index in enumerate(page_indices):
             with cols[next_col]:
@@ -226,7 +245,7 @@ def variant_comparison_grid(ele_uuid, stage=CreativeProcessType.MOTION.value):
 
                 else:
                     if variants[variant_index]:
-                        st.image(variants[variant_index].location, use_column_width=True)
+                        st.image(thumbnail_location_dict[variant_index], use_column_width=True)
                         image_variant_details(variants[variant_index])
                     else:
                         st.error("No image present")
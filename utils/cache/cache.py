@@ -1,5 +1,12 @@
+import copy
+import hashlib
+import sys
+import threading
+import time
+
 import streamlit as st
 
+from shared.constants import SERVER, ServerType
 from utils.enum import ExtendedEnum
 
 
@@ -19,72 +26,224 @@ class CacheKey(ExtendedEnum):
     USER = "user"
 
 
+def _get_uuid(data):
+    return str(data["uuid"] if type(data) is dict else data.uuid)
+
+
+# secondary keys through which the cached objects can be looked up, {data_type: {key_name: key_fn}}
+SECONDARY_INDEX_KEYS = {
+    CacheKey.FILE.value: {
+        "name": lambda file: file.name,
+        "inference_log_uuid": lambda file: file.inference_log_uuid,
+    },
+    CacheKey.AI_MODEL.value: {
+        "name": lambda model: model.name,
+    },
+}
+
+# max number of objects cached per data type, least recently used objects are evicted first.
+# types that are read back as complete lists (timings, shots, projects..) are not capped, as
+# evicting a part of them would return incomplete lists
+CACHE_CAPACITY = {
+    CacheKey.FILE.value: 2000,
+    CacheKey.LOG.value: 1000,
+    CacheKey.LOG_PAGES.value: 100,
+}
+
+# seconds after which the temp items are dropped from the cache. projects and users are read back as
+# complete lists, expiring them one by one would return incomplete lists (they are kept in sync by the
+# writes instead)
+CACHE_TTL = {
+    CacheKey.LOG.value: 60,
+    CacheKey.LOG_PAGES.value: 60,
+}
+
+CACHE_STATS_KEY = "cache__stats"
+
+
+def _approx_size(obj, seen=None, depth=0):
+    # rough deep size of the cached objects, only used for sizing the cache
+    seen = seen if seen is not None else set()
+    if id(obj) in seen or depth > 6:
+        return 0
+
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            _approx_size(k, seen, depth + 1) + _approx_size(v, seen, depth + 1) for k, v in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_approx_size(v, seen, depth + 1) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _approx_size(vars(obj), seen, depth + 1)
+
+    return size
+
+
 class StCache:
+    """
+    objects are stored in the session state as {uuid: obj} in lru order (least recently used first).
+    next to it are the secondary indexes {key_name: {key: uuid}} and the time at which every object
+    was added (for the ttl), so that lookups don't scan the entire list
+    """
+
+    @staticmethod
+    def _meta_key(data_type):
+        return data_type + "__meta"
+
+    @staticmethod
+    def _get_meta(data_type):
+        return st.session_state[StCache._meta_key(data_type)]
+
+    @staticmethod
+    def _get_store(data_type, create=False):
+        store = st.session_state.get(data_type, None)
+        if isinstance(store, list):
+            # list stored by an older version of the cache, rebuilding it as a dict
+            object_list, store = store, None
+            StCache.delete_all(data_type)
+            StCache.add_all(object_list, data_type)
+            store = st.session_state[data_type]
+
+        if store is None and create:
+            store = {}
+            st.session_state[data_type] = store
+            st.session_state[StCache._meta_key(data_type)] = {
+                "index": {key_name: {} for key_name in SECONDARY_INDEX_KEYS.get(data_type, {})},
+                "added_at": {},
+            }
+
+        if store and data_type in CACHE_TTL:
+            StCache._remove_expired(store, data_type)
+
+        return store
+
+    @staticmethod
+    def _remove_expired(store, data_type):
+        # added_at is in insertion order, so the expired objects are always at the start
+        added_at = StCache._get_meta(data_type)["added_at"]
+        expiry_time = time.time() - CACHE_TTL[data_type]
+        expired_list = []
+        for uuid, ts in added_at.items():
+            if ts > expiry_time:
+                break
+            expired_list.append(uuid)
+
+        for uuid in expired_list:
+            StCache._remove(store, uuid, data_type)
+            StCache._record(data_type, "expired")
+
+    @staticmethod
+    def _remove(store, uuid, data_type):
+        meta = StCache._get_meta(data_type)
+        data = store.pop(uuid)
+        meta["added_at"].pop(uuid, None)
+        for key_name, key_fn in SECONDARY_INDEX_KEYS.get(data_type, {}).items():
+            key = key_fn(data)
+            # the key might be pointing to a different object with the same key
+            if key is not None and meta["index"][key_name].get(key, None) == uuid:
+                del meta["index"][key_name][key]
+
+    @staticmethod
+    def _insert(store, data, uuid, data_type):
+        meta = StCache._get_meta(data_type)
+        store[uuid] = data
+        meta["added_at"][uuid] = time.time()
+        for key_name, key_fn in SECONDARY_INDEX_KEYS.get(data_type, {}).items():
+            key = key_fn(data)
+            if key is not None:
+                meta["index"][key_name][key] = uuid
+
+    @staticmethod
+    def _record(data_type, counter, count=1):
+        if CACHE_STATS_KEY not in st.session_state:
+            st.session_state[CACHE_STATS_KEY] = {}
+
+        stats = st.session_state[CACHE_STATS_KEY].setdefault(data_type, {})
+        stats[counter] = stats.get(counter, 0) + count
+
+    @staticmethod
+    def _lookup(store, uuid, data_type):
+        obj = store.get(uuid, None) if store else None
+        if obj is None:
+            StCache._record(data_type, "misses")
+            return None
+
+        # moving it to the end, marking it as the most recently used
+        store[uuid] = store.pop(uuid)
+        StCache._record(data_type, "hits")
+        return obj
+
     @staticmethod
     def get(uuid, data_type):
-        uuid = str(uuid)
-        if data_type in st.session_state:
-            for ele in st.session_state[data_type]:
-                ele_uuid = ele["uuid"] if type(ele) is dict else str(ele.uuid)
-                if ele_uuid == uuid:
-                    return ele
+        store = StCache._get_store(data_type)
+        return StCache._lookup(store, str(uuid), data_type)
 
-        return None
+    @staticmethod
+    def get_by_key(key_name, key, data_type):
+        # lookup through one of the secondary keys (SECONDARY_INDEX_KEYS)
+        store = StCache._get_store(data_type)
+        uuid = StCache._get_meta(data_type)["index"][key_name].get(key, None) if store else None
+        return StCache._lookup(store, uuid, data_type)
 
     @staticmethod
-    def update(data, data_type) -> bool:
-        object_found = False
-        uuid = data["uuid"] if type(data) is dict else data.uuid
-        uuid = str(uuid)
+    def get_list(uuid_list, data_type):
+        # returns {uuid: obj} of the objects that are present in the cache
+        store = StCache._get_store(data_type)
+        res = {}
+        for uuid in uuid_list:
+            obj = StCache._lookup(store, str(uuid), data_type)
+            if obj is not None:
+                res[uuid] = obj
 
-        if data_type in st.session_state:
-            object_list = st.session_state[data_type]
-            for idx, ele in enumerate(object_list):
-                ele_uuid = ele["uuid"] if type(ele) is dict else str(ele.uuid)
-                if ele_uuid == uuid:
-                    object_list[idx] = data
-                    object_found = True
+        return res
 
-            st.session_state[data_type] = object_list
+    @staticmethod
+    def update(data, data_type) -> bool:
+        uuid = _get_uuid(data)
+        store = StCache._get_store(data_type)
+        if not store or uuid not in store:
+            return False
 
-        return object_found
+        StCache._remove(store, uuid, data_type)
+        StCache._insert(store, data, uuid, data_type)
+        return True
 
     @staticmethod
     def add(data, data_type) -> bool:
-        uuid = data["uuid"] if type(data) is dict else data.uuid
-        uuid = str(uuid)
-        obj = StCache.get(uuid, data_type)
-        if obj:
-            StCache.update(data, data_type)
-        else:
-            if data_type in st.session_state:
-                object_list = st.session_state[data_type]
-            else:
-                object_list = []
+        if StCache.update(data, data_type):
+            return True
+
+        uuid = _get_uuid(data)
+        store = StCache._get_store(data_type, create=True)
+        StCache._insert(store, data, uuid, data_type)
 
-            object_list.append(data)
+        capacity = CACHE_CAPACITY.get(data_type, None)
+        if capacity and len(store) > capacity:
+            evict_list = list(store.keys())[: len(store) - capacity]
+            for evict_uuid in evict_list:
+                StCache._remove(store, evict_uuid, data_type)
+            StCache._record(data_type, "evictions", len(evict_list))
 
-            st.session_state[data_type] = object_list
+        return True
 
     @staticmethod
     def delete(uuid, data_type) -> bool:
-        object_found = False
         uuid = str(uuid)
-        if data_type in st.session_state:
-            object_list = st.session_state[data_type]
-            for ele in object_list:
-                ele_uuid = ele["uuid"] if type(ele) is dict else str(ele.uuid)
-                if ele_uuid == uuid:
-                    object_list.remove(ele)
-                    object_found = True
-                    break
-
-            st.session_state[data_type] = object_list
+        store = StCache._get_store(data_type)
+        if not store or uuid not in store:
+            return False
 
-        return object_found
+        StCache._remove(store, uuid, data_type)
+        return True
 
     @staticmethod
     def delete_all(data_type) -> bool:
+        meta_key = StCache._meta_key(data_type)
+        if meta_key in st.session_state:
+            del st.session_state[meta_key]
+
         if data_type in st.session_state:
             del st.session_state[data_type]
             return True
@@ -100,8 +259,9 @@ class StCache:
 
     @staticmethod
     def get_all(data_type):
-        if data_type in st.session_state:
-            return st.session_state[data_type]
+        store = StCache._get_store(data_type)
+        if store:
+            return list(store.values())
 
         return []
 
@@ -112,3 +272,143 @@ class StCache:
             StCache.delete_all(c)
 
         return True
+
+    @staticmethod
+    def get_cache_stats():
+        """
+        object count, approximate size (in bytes) and the hit/miss/eviction counters
+        of every data type cached in this session
+        """
+        counter_dict = st.session_state.get(CACHE_STATS_KEY, {})
+        res = {}
+        for data_type in CacheKey.value_list():
+            store = st.session_state.get(data_type, None)
+            res[data_type] = {
+                "count": len(store) if store else 0,
+                "approx_size": _approx_size(store) if store else 0,
+                "hits": 0,
+                "misses": 0,
+                "evictions": 0,
+                "expired": 0,
+                **counter_dict.get(data_type, {}),
+            }
+
+        res["total_approx_size"] = sum(v["approx_size"] for v in res.values())
+        return res
+
+
+# max number of objects kept in the process wide cache per data type
+SHARED_CACHE_CAPACITY = {
+    CacheKey.LOG.value: 5000,
+    CacheKey.AI_MODEL.value: 1000,
+    CacheKey.APP_SETTING.value: 1000,
+    CacheKey.PROJECT_SETTING.value: 1000,
+}
+
+# seconds after which the shared objects are dropped. the writes made by other processes (runner, other
+# app servers) don't invalidate this cache, so this bounds how long an object can be stale
+SHARED_CACHE_TTL = {
+    CacheKey.LOG.value: 600,
+    CacheKey.AI_MODEL.value: 300,
+    CacheKey.APP_SETTING.value: 60,
+    CacheKey.PROJECT_SETTING.value: 60,
+}
+
+
+def get_shared_cache_scope():
+    """
+    the shared objects are only visible to the sessions of the same user. locally there is a single
+    user, in the hosted mode the scope is the auth token of the session (None if there isn't one,
+    in which case the shared cache is skipped)
+    """
+    if SERVER == ServerType.DEVELOPMENT.value:
+        return ""
+
+    from utils.constants import AUTH_TOKEN
+    from utils.local_storage.url_storage import get_url_param
+
+    auth_token = get_url_param(AUTH_TOKEN)
+    return hashlib.sha256(str(auth_token).encode()).hexdigest() if auth_token else None
+
+
+class SharedCache:
+    """
+    process wide cache shared by all the streamlit sessions, for the data which every session fetches
+    again (ai models, app/project settings, completed inference logs). it sits behind the per-session
+    StCache and is invalidated by the same write wrappers, the entries are scoped to the user
+    (get_shared_cache_scope) and expire after SHARED_CACHE_TTL. objects are stored by uuid, or by the key
+    they are looked up with. copies are returned, so the sessions never modify the shared objects
+    """
+
+    _lock = threading.Lock()
+    _store = {}  # {data_type: {uuid: {scope: (obj, added_at)}}} in lru order
+
+    @staticmethod
+    def get(uuid, data_type):
+        scope, obj = get_shared_cache_scope(), None
+        if scope is not None:
+            with SharedCache._lock:
+                store = SharedCache._store.get(data_type, None)
+                scope_dict = store.pop(str(uuid), None) if store else None
+                if scope_dict is not None:
+                    store[str(uuid)] = scope_dict
+                    obj, added_at = scope_dict.get(scope, (None, 0))
+                    if obj is not None and time.time() - added_at > SHARED_CACHE_TTL[data_type]:
+                        del scope_dict[scope]
+                        obj = None
+
+        StCache._record(data_type, "shared_hits" if obj is not None else "shared_misses")
+        return copy.copy(obj) if obj is not None else None
+
+    @staticmethod
+    def get_list(uuid_list, data_type):
+        res = {}
+        for uuid in uuid_list:
+            obj = SharedCache.get(uuid, data_type)
+            if obj is not None:
+                res[uuid] = obj
+
+        return res
+
+    @staticmethod
+    def add(data, data_type, key=None):
+        scope = get_shared_cache_scope()
+        if scope is None:
+            return
+
+        uuid = str(key) if key is not None else _get_uuid(data)
+        with SharedCache._lock:
+            store = SharedCache._store.setdefault(data_type, {})
+            scope_dict = store.pop(uuid, {})
+            scope_dict[scope] = (copy.copy(data), time.time())
+            store[uuid] = scope_dict
+
+            capacity = SHARED_CACHE_CAPACITY.get(data_type, None)
+            if capacity and len(store) > capacity:
+                for evict_uuid in list(store.keys())[: len(store) - capacity]:
+                    del store[evict_uuid]
+
+    @staticmethod
+    def add_all(data_list, data_type):
+        for data in data_list:
+            SharedCache.add(data, data_type)
+
+    @staticmethod
+    def delete(uuid, data_type) -> bool:
+        # removed for all the scopes
+        with SharedCache._lock:
+            store = SharedCache._store.get(data_type, None)
+            return bool(store) and store.pop(str(uuid), None) is not None
+
+    @staticmethod
+    def delete_all(data_type) -> bool:
+        with SharedCache._lock:
+            return SharedCache._store.pop(data_type, None) is not None
+
+    @staticmethod
+    def get_cache_stats():
+        with SharedCache._lock:
+            return {
+                data_type: {"count": len(store), "approx_size": _approx_size(store)}
+                for data_type, store in SharedCache._store.items()
+            }
@@ -1,6 +1,7 @@
 import uuid
+from shared.constants import BatchEntityType, InferenceStatus
 from shared.logging.logging import AppLogger
-from utils.cache.cache import CacheKey, StCache
+from utils.cache.cache import CacheKey, SharedCache, StCache
 import streamlit as st
 
 logger = AppLogger()
@@ -42,6 +43,7 @@ def cache_data(cls):
         if status:
             StCache.delete(args[0], CacheKey.TIMING_DETAILS.value)
             StCache.delete_all(CacheKey.TIMING_DETAILS.value)
+            StCache.delete(args[0], CacheKey.FILE.value)
 
     setattr(cls, "_original_delete_file_from_uuid", cls.delete_file_from_uuid)
     setattr(cls, "delete_file_from_uuid", _cache_delete_file_from_uuid)
@@ -60,11 +62,10 @@ def cache_data(cls):
     setattr(cls, "update_file", _cache_update_file)
 
     def _cache_get_file_from_name(self, *args, **kwargs):
-        file_list = StCache.get_all(CacheKey.FILE.value)
-        if file_list and len(file_list) and len(args) > 0:
-            for file in file_list:
-                if file.name == args[0]:
-                    return file
+        if len(args) > 0:
+            file = StCache.get_by_key("name", args[0], CacheKey.FILE.value)
+            if file:
+                return file
 
         original_func = getattr(cls, "_original_get_file_from_name")
         file = original_func(self, *args, **kwargs)
@@ -77,11 +78,10 @@ def cache_data(cls):
     setattr(cls, "get_file_from_name", _cache_get_file_from_name)
 
     def _cache_get_file_from_uuid(self, *args, **kwargs):
-        file_list = StCache.get_all(CacheKey.FILE.value)
-        if file_list and len(file_list) and len(args) > 0:
-            for file in file_list:
-                if file.uuid == args[0]:
-                    return file
+        if len(args) > 0:
+            file = StCache.get(args[0], CacheKey.FILE.value)
+            if file:
+                return file
 
         original_func = getattr(cls, "_original_get_file_from_uuid")
         file = original_func(self, *args, **kwargs)
@@ -94,13 +94,9 @@ def cache_data(cls):
     setattr(cls, "get_file_from_uuid", _cache_get_file_from_uuid)
 
     def _cache_get_image_list_from_uuid_list(self, *args, **kwargs):
-        not_found_list, found_list = [], {}
+        not_found_list = []
         # finding the images in the cache
-        file_list = StCache.get_all(CacheKey.FILE.value)
-        if file_list and len(file_list) and len(args) > 0:
-            for file in file_list:
-                if file.uuid in args[0]:
-                    found_list[file.uuid] = file
+        found_list = StCache.get_list(args[0], CacheKey.FILE.value)
 
         for file_uuid in args[0]:
             if file_uuid not in found_list:
@@ -121,7 +117,6 @@ def cache_data(cls):
                     res.append(found_list[file_uuid])
 
         for file in res:
-            StCache.delete(file, CacheKey.FILE.value)
             StCache.add(file, CacheKey.FILE.value)
 
         return res
@@ -132,11 +127,10 @@ def cache_data(cls):
     def _cache_get_file_list_from_log_uuid_list(self, *args, **kwargs):
         not_found_list, found_list = [], {}
         # finding files in the cache
-        file_list = StCache.get_all(CacheKey.FILE.value)
-        if file_list and len(file_list) and len(args) > 0:
-            for file in file_list:
-                if file.inference_log and file.inference_log.uuid in args[0]:
-                    found_list[file.inference_log.uuid] = file
+        for log_uuid in args[0]:
+            file = StCache.get_by_key("inference_log_uuid", log_uuid, CacheKey.FILE.value)
+            if file:
+                found_list[log_uuid] = file
 
         for log_uuid in args[0]:
             if log_uuid not in found_list:
@@ -156,7 +150,6 @@ def cache_data(cls):
                     res.append(found_list[log_uuid])
 
         for file in res:
-            StCache.delete(file, CacheKey.FILE.value)
             StCache.add(file, CacheKey.FILE.value)
 
         return res
@@ -170,6 +163,7 @@ def cache_data(cls):
         project = original_func(self, *args, **kwargs)
         if project:
             StCache.delete_all(CacheKey.PROJECT_SETTING.value)
+            SharedCache.delete_all(CacheKey.PROJECT_SETTING.value)
 
         return project
 
@@ -183,22 +177,29 @@ def cache_data(cls):
         if status:
             StCache.delete_all(CacheKey.PROJECT_SETTING.value)
             StCache.delete_all(CacheKey.TIMING_DETAILS.value)
+            SharedCache.delete_all(CacheKey.PROJECT_SETTING.value)
+            SharedCache.delete_all(CacheKey.LOG.value)
 
     setattr(cls, "_original_delete_project_from_uuid", cls.delete_project_from_uuid)
     setattr(cls, "delete_project_from_uuid", _cache_delete_project_from_uuid)
 
     # -------------------- AI MODEL METHODS ----------------------
     def _cache_get_ai_model_from_uuid(self, *args, **kwargs):
-        model_list = StCache.get_all(CacheKey.AI_MODEL.value)
-        if model_list and len(model_list) and len(args) > 0:
-            for model in model_list:
-                if model.uuid == args[0]:
-                    return model
+        if len(args) > 0:
+            model = StCache.get(args[0], CacheKey.AI_MODEL.value)
+            if model:
+                return model
+
+            model = SharedCache.get(args[0], CacheKey.AI_MODEL.value)
+            if model:
+                StCache.add(model, CacheKey.AI_MODEL.value)
+                return model
 
         original_func = getattr(cls, "_original_get_ai_model_from_uuid")
         model = original_func(self, *args, **kwargs)
         if model:
             StCache.add(model, CacheKey.AI_MODEL.value)
+            SharedCache.add(model, CacheKey.AI_MODEL.value)
 
         return model
 
@@ -206,16 +207,24 @@ def cache_data(cls):
     setattr(cls, "get_ai_model_from_uuid", _cache_get_ai_model_from_uuid)
 
     def _cache_get_ai_model_from_name(self, *args, **kwargs):
-        model_list = StCache.get_all(CacheKey.AI_MODEL.value)
-        if model_list and len(model_list) and len(args) > 0:
-            for model in model_list:
-                if model.name == args[0]:
-                    return model
+        if len(args) > 0:
+            model = StCache.get_by_key("name", args[0], CacheKey.AI_MODEL.value)
+            if model:
+                return model
+
+            # models are looked up by name for the user's session, the shared key includes both
+            shared_key = "name__" + "__".join(str(arg) for arg in args)
+            model = SharedCache.get(shared_key, CacheKey.AI_MODEL.value)
+            if model:
+                StCache.add(model, CacheKey.AI_MODEL.value)
+                return model
 
         original_func = getattr(cls, "_original_get_ai_model_from_name")
         model = original_func(self, *args, **kwargs)
         if model:
             StCache.add(model, CacheKey.AI_MODEL.value)
+            if len(args) > 0:
+                SharedCache.add(model, CacheKey.AI_MODEL.value, shared_key)
 
         return model
 
@@ -227,6 +236,7 @@ def cache_data(cls):
         ai_model = original_func(self, *args, **kwargs)
         if ai_model:
             StCache.delete_all(CacheKey.AI_MODEL.value)
+            SharedCache.delete_all(CacheKey.AI_MODEL.value)
 
         return ai_model
 
@@ -238,6 +248,7 @@ def cache_data(cls):
         ai_model = original_func(self, *args, **kwargs)
         if ai_model:
             StCache.delete_all(CacheKey.AI_MODEL.value)
+            SharedCache.delete_all(CacheKey.AI_MODEL.value)
 
         return ai_model
 
@@ -250,10 +261,59 @@ def cache_data(cls):
 
         if status:
             StCache.delete_all(CacheKey.AI_MODEL.value)
+            SharedCache.delete_all(CacheKey.AI_MODEL.value)
 
     setattr(cls, "_original_delete_ai_model_from_uuid", cls.delete_ai_model_from_uuid)
     setattr(cls, "delete_ai_model_from_uuid", _cache_delete_ai_model_from_uuid)
 
+    # ------------------- INFERENCE LOG METHODS ---------------------
+    def _cache_get_inference_log_from_uuid(self, *args, **kwargs):
+        # only completed logs are cached, as the others are still being updated by the runner
+        log = SharedCache.get(args[0] if len(args) else kwargs["uuid"], CacheKey.LOG.value)
+        if log:
+            return log
+
+        original_func = getattr(cls, "_original_get_inference_log_from_uuid")
+        log = original_func(self, *args, **kwargs)
+        if log and log.status == InferenceStatus.COMPLETED.value:
+            SharedCache.add(log, CacheKey.LOG.value)
+
+        return log
+
+    setattr(cls, "_original_get_inference_log_from_uuid", cls.get_inference_log_from_uuid)
+    setattr(cls, "get_inference_log_from_uuid", _cache_get_inference_log_from_uuid)
+
+    def _cache_update_inference_log(self, *args, **kwargs):
+        original_func = getattr(cls, "_original_update_inference_log")
+        log = original_func(self, *args, **kwargs)
+        SharedCache.delete(args[0] if len(args) else kwargs["uuid"], CacheKey.LOG.value)
+
+        return log
+
+    setattr(cls, "_original_update_inference_log", cls.update_inference_log)
+    setattr(cls, "update_inference_log", _cache_update_inference_log)
+
+    def _cache_update_inference_log_list(self, *args, **kwargs):
+        original_func = getattr(cls, "_original_update_inference_log_list")
+        status = original_func(self, *args, **kwargs)
+        for log_uuid in args[0] if len(args) else kwargs["uuid_list"]:
+            SharedCache.delete(log_uuid, CacheKey.LOG.value)
+
+        return status
+
+    setattr(cls, "_original_update_inference_log_list", cls.update_inference_log_list)
+    setattr(cls, "update_inference_log_list", _cache_update_inference_log_list)
+
+    def _cache_delete_inference_log_from_uuid(self, *args, **kwargs):
+        original_func = getattr(cls, "_original_delete_inference_log_from_uuid")
+        status = original_func(self, *args, **kwargs)
+        SharedCache.delete(args[0] if len(args) else kwargs["uuid"], CacheKey.LOG.value)
+
+        return status
+
+    setattr(cls, "_original_delete_inference_log_from_uuid", cls.delete_inference_log_from_uuid)
+    setattr(cls, "delete_inference_log_from_uuid", _cache_delete_inference_log_from_uuid)
+
     # ------------------- TIMING METHODS ---------------------
     def _cache_get_timing_list_from_project(self, *args, **kwargs):
         # checking if it's already present in the cache
@@ -319,11 +379,10 @@ def cache_data(cls):
 
     def _cache_get_timing_from_uuid(self, *args, **kwargs):
         if not kwargs.get("invalidate_cache", False):
-            timing_list = StCache.get_all(CacheKey.TIMING_DETAILS.value)
-            if timing_list and len(timing_list) and len(args) > 0:
-                for timing in timing_list:
-                    if timing.uuid == args[0]:
-                        return timing
+            if len(args) > 0:
+                timing = StCache.get(args[0], CacheKey.TIMING_DETAILS.value)
+                if timing:
+                    return timing
 
         original_func = getattr(cls, "_original_get_timing_from_uuid")
         timing = original_func(self, *args, **kwargs)
@@ -347,6 +406,19 @@ def cache_data(cls):
     setattr(cls, "_original_delete_timing_from_uuid", cls.delete_timing_from_uuid)
     setattr(cls, "delete_timing_from_uuid", _cache_delete_timing_from_uuid)
 
+    def _cache_apply_shot_frame_layout(self, *args, **kwargs):
+        original_func = getattr(cls, "_original_apply_shot_frame_layout")
+        status = original_func(self, *args, **kwargs)
+
+        if status:
+            StCache.delete_all(CacheKey.TIMING_DETAILS.value)
+            StCache.delete_all(CacheKey.SHOT.value)
+
+        return status
+
+    setattr(cls, "_original_apply_shot_frame_layout", cls.apply_shot_frame_layout)
+    setattr(cls, "apply_shot_frame_layout", _cache_apply_shot_frame_layout)
+
     def _cache_remove_existing_timing(self, *args, **kwargs):
         original_func = getattr(cls, "_original_remove_existing_timing")
         status = original_func(self, *args, **kwargs)
@@ -391,10 +463,18 @@ def cache_data(cls):
                 if app_setting.uuid == kwargs["uuid"]:
                     return app_setting
 
+        # keyed by the requested uuid, the default app setting is stored under an empty key
+        shared_key = str(args[0] if len(args) else kwargs.get("uuid", None) or "")
+        app_setting = SharedCache.get(shared_key, CacheKey.APP_SETTING.value)
+        if app_setting:
+            StCache.add(app_setting, CacheKey.APP_SETTING.value)
+            return app_setting
+
         original_func = getattr(cls, "_original_get_app_setting_from_uuid")
         app_setting = original_func(self, *args, **kwargs)
         if app_setting:
             StCache.add(app_setting, CacheKey.APP_SETTING.value)
+            SharedCache.add(app_setting, CacheKey.APP_SETTING.value, shared_key)
 
         return app_setting
 
@@ -439,6 +519,7 @@ def cache_data(cls):
         if status:
             StCache.delete_all(CacheKey.APP_SETTING.value)
             StCache.delete_all(CacheKey.APP_SECRET.value)
+            SharedCache.delete_all(CacheKey.APP_SETTING.value)
 
         return status
 
@@ -451,6 +532,7 @@ def cache_data(cls):
         if app_setting:
             StCache.delete_all(CacheKey.APP_SETTING.value)
             StCache.delete_all(CacheKey.APP_SECRET.value)
+            SharedCache.delete_all(CacheKey.APP_SETTING.value)
 
             StCache.add(app_setting, CacheKey.APP_SETTING.value)
 
@@ -466,6 +548,7 @@ def cache_data(cls):
         if status:
             StCache.delete_all(CacheKey.APP_SETTING.value)
             StCache.delete_all(CacheKey.APP_SECRET.value)
+            SharedCache.delete_all(CacheKey.APP_SETTING.value)
 
         return status
 
@@ -479,10 +562,17 @@ def cache_data(cls):
             if str(ele.project.uuid) == str(args[0]):
                 return ele
 
+        project_setting = SharedCache.get(args[0], CacheKey.PROJECT_SETTING.value)
+        if project_setting:
+            StCache.add(project_setting, CacheKey.PROJECT_SETTING.value)
+            return project_setting
+
         original_func = getattr(cls, "_original_get_project_setting")
         project_setting = original_func(self, *args, **kwargs)
         if project_setting:
             StCache.add(project_setting, CacheKey.PROJECT_SETTING.value)
+            # keyed by the project uuid it is looked up with
+            SharedCache.add(project_setting, CacheKey.PROJECT_SETTING.value, args[0])
 
         return project_setting
 
@@ -494,6 +584,7 @@ def cache_data(cls):
         project_setting = original_func(self, *args, **kwargs)
         if project_setting:
             StCache.add(project_setting, CacheKey.PROJECT_SETTING.value)
+            SharedCache.delete_all(CacheKey.PROJECT_SETTING.value)
 
         return project_setting
 
@@ -506,6 +597,7 @@ def cache_data(cls):
 
         if status:
             StCache.delete_all(CacheKey.PROJECT_SETTING.value)
+            SharedCache.delete_all(CacheKey.PROJECT_SETTING.value)
 
         return status
 
@@ -518,6 +610,7 @@ def cache_data(cls):
 
         if status:
             StCache.delete_all(CacheKey.PROJECT_SETTING.value)
+            SharedCache.delete_all(CacheKey.PROJECT_SETTING.value)
 
         return status
 
@@ -576,16 +669,15 @@ def cache_data(cls):
 
     # ---------------------- SHOT METHODS ---------------------
     def _cache_get_shot_from_uuid(self, *args, **kwargs):
-        shot_list = StCache.get_all(CacheKey.SHOT.value)
-        if shot_list and len(shot_list):
-            for shot in shot_list:
-                if shot.uuid == args[0]:
-                    return shot
+        shot = StCache.get(args[0], CacheKey.SHOT.value)
+        if shot:
+            return shot
 
+        is_shot_list_cached = bool(StCache.get_all(CacheKey.SHOT.value))
         original_func = getattr(cls, "_original_get_shot_from_uuid")
         shot = original_func(self, *args, **kwargs)
 
-        if shot and not (shot_list and len(shot_list)):
+        if shot and not is_shot_list_cached:
             original_func = getattr(cls, "_original_get_shot_list")
             shot_list = original_func(self, shot.project.uuid)
             if shot_list:
@@ -817,4 +909,22 @@ def cache_data(cls):
     setattr(cls, "_original_get_all_user_list", cls.get_all_user_list)
     setattr(cls, "get_all_user_list", _cache_get_all_user_list)
 
+    # ---------------- BATCH METHODS ----------------------
+    def _cache_prefetch_entity_list(self, *args, **kwargs):
+        entity_type, uuid_list = args[0], args[1]
+        # entities already in the cache are not fetched again
+        cache_key = {
+            BatchEntityType.FILE.value: CacheKey.FILE.value,
+            BatchEntityType.TIMING.value: CacheKey.TIMING_DETAILS.value,
+            BatchEntityType.SHOT.value: CacheKey.SHOT.value,
+        }[entity_type]
+        uuid_list = [uuid for uuid in uuid_list if uuid and not StCache.get(uuid, cache_key)]
+
+        if uuid_list:
+            original_func = getattr(cls, "_original_prefetch_entity_list")
+            original_func(self, entity_type, uuid_list)
+
+    setattr(cls, "_original_prefetch_entity_list", cls.prefetch_entity_list)
+    setattr(cls, "prefetch_entity_list", _cache_prefetch_entity_list)
+
     return cls
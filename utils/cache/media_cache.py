@@ -0,0 +1,130 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+from shared.logging.constants import LoggingType
+from shared.logging.logging import app_logger
+
+
+MEDIA_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR", "videos/temp/media_cache")
+MEDIA_CACHE_MAX_SIZE = int(os.getenv("MEDIA_CACHE_MAX_SIZE_MB", 2048)) * 1024 * 1024
+# files used within this many seconds are never evicted, another process may be about to open them
+MEDIA_CACHE_EVICTION_GRACE_PERIOD = 60
+# partial downloads older than this are left over from a crashed process
+STALE_DOWNLOAD_AGE = 60 * 60
+PARTIAL_DOWNLOAD_SUFFIX = ".part"
+
+
+class MediaCache:
+    """
+    disk backed cache of hosted files (urls -> local copies), shared by the app and the runner process.
+    files are keyed by the hash of their url (hosted files are never overwritten at the same url), written
+    atomically (downloaded to a temp file and then renamed) and evicted in lru order (by mtime, which is
+    updated on every access) once the cache grows beyond max_size
+    """
+
+    def __init__(self, cache_dir=MEDIA_CACHE_DIR, max_size=MEDIA_CACHE_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._download_lock_map = {}  # {file_path: lock}, a file is downloaded only once by this process
+
+    def get_file_path(self, url):
+        file_ext = os.path.splitext(urlparse(url).path)[1]
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest() + file_ext)
+
+    def get(self, url):
+        # local path of the file at url, it is downloaded if not already present in the cache
+        file_path = self.get_file_path(url)
+        if self._touch(file_path):
+            return file_path
+
+        with self._lock:
+            download_lock = self._download_lock_map.setdefault(file_path, threading.Lock())
+
+        with download_lock:
+            if not self._touch(file_path):
+                self._download(url, file_path)
+                self.evict()
+
+        with self._lock:
+            self._download_lock_map.pop(file_path, None)
+
+        return file_path
+
+    def get_cached_file_path(self, url):
+        # local path of the file at url only if it is already cached
+        file_path = self.get_file_path(url)
+        return file_path if self._touch(file_path) else None
+
+    def _touch(self, file_path):
+        try:
+            os.utime(file_path, None)
+            return True
+        except OSError:
+            return False
+
+    def _download(self, url, file_path):
+        from ui_components.methods.file_methods import download_file
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_file_path = tempfile.mkstemp(dir=self.cache_dir, suffix=PARTIAL_DOWNLOAD_SUFFIX)
+        os.close(fd)
+        try:
+            download_file(url, temp_file_path)
+            os.replace(temp_file_path, file_path)
+        except Exception:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            raise
+
+    def evict(self):
+        now = time.time()
+        entry_list, total_size = [], 0
+        for entry in os.scandir(self.cache_dir):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # removed by another process
+
+            if entry.name.endswith(PARTIAL_DOWNLOAD_SUFFIX):
+                if now - stat.st_mtime > STALE_DOWNLOAD_AGE:
+                    self._remove(entry.path)
+                continue
+
+            entry_list.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+
+        # least recently used first
+        for mtime, size, file_path in sorted(entry_list):
+            if total_size <= self.max_size:
+                break
+
+            if now - mtime < MEDIA_CACHE_EVICTION_GRACE_PERIOD:
+                continue
+
+            if self._remove(file_path):
+                total_size -= size
+
+    def _remove(self, file_path):
+        try:
+            os.remove(file_path)
+            return True
+        except OSError as e:
+            # already removed or still open (windows)
+            app_logger.log(LoggingType.DEBUG, f"unable to evict {file_path}: {str(e)}")
+            return False
+
+
+media_cache = MediaCache()
+
+
+def get_local_file_path(location):
+    # hosted files are resolved through the media cache, local paths are returned as they are
+    if urlparse(location).scheme in ["http", "https"]:
+        return media_cache.get(location)
+
+    return location
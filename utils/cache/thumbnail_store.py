@@ -0,0 +1,153 @@
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from shared.constants import InternalFileType
+from shared.logging.constants import LoggingType
+from shared.logging.logging import app_logger
+from utils.cache.media_cache import MediaCache, PARTIAL_DOWNLOAD_SUFFIX, get_local_file_path
+
+
+THUMBNAIL_DIR = os.getenv("THUMBNAIL_DIR", "videos/temp/thumbnails")
+THUMBNAIL_MAX_SIZE = int(os.getenv("THUMBNAIL_MAX_SIZE_MB", 512)) * 1024 * 1024
+THUMBNAIL_WORKER_COUNT = 4
+# the thumbnails of the new files are created by a separate pool, so that they don't hold up the views
+THUMBNAIL_BACKGROUND_WORKER_COUNT = 2
+# longest side of the thumbnails in px
+THUMBNAIL_SMALL = 64
+THUMBNAIL_MEDIUM = 256
+THUMBNAIL_LARGE = 512
+THUMBNAIL_SIZE_LIST = [THUMBNAIL_SMALL, THUMBNAIL_MEDIUM, THUMBNAIL_LARGE]
+# jpeg is served by st.image as it is, other formats (webp, png with alpha) are re-encoded on every run
+THUMBNAIL_FORMAT = "JPEG"
+THUMBNAIL_EXT = ".jpg"
+THUMBNAIL_QUALITY = 85
+# jpeg has no alpha, the transparent parts are flattened onto this (instead of turning black)
+THUMBNAIL_BACKGROUND_COLOR = (240, 242, 246)
+ALPHA_MODE_LIST = ["RGBA", "RGBa", "LA", "La", "PA"]
+# bumped when the way the thumbnails are created changes, so that the old ones aren't served anymore
+THUMBNAIL_VERSION = 2
+# animated images are shown as they are
+UNSUPPORTED_EXT_LIST = [".gif", ".svg"]
+
+
+class ThumbnailStore(MediaCache):
+    """
+    disk backed store of the downscaled previews of image files, used by the grid views. thumbnails of all
+    the sizes are generated from a single decode of the image, in the background when the file is created
+    or on the first access for the older files. they are keyed by the file uuid, size and location (so a
+    file updated in place gets new ones) and evicted in lru order like the media cache
+    """
+
+    def __init__(self, cache_dir=THUMBNAIL_DIR, max_size=THUMBNAIL_MAX_SIZE):
+        super().__init__(cache_dir, max_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=THUMBNAIL_WORKER_COUNT, thread_name_prefix="thumbnail"
+        )
+        self._background_executor = ThreadPoolExecutor(
+            max_workers=THUMBNAIL_BACKGROUND_WORKER_COUNT, thread_name_prefix="thumbnail_background"
+        )
+
+    def is_supported(self, file):
+        return (
+            file is not None
+            and file.type == InternalFileType.IMAGE.value
+            and bool(file.location)
+            and os.path.splitext(file.filename)[1].lower() not in UNSUPPORTED_EXT_LIST
+        )
+
+    def get_thumbnail_path(self, file, size):
+        version = hashlib.sha256(f"{THUMBNAIL_VERSION}_{file.location}".encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{file.uuid}_{size}_{version}{THUMBNAIL_EXT}")
+
+    def get_thumbnail(self, file, size):
+        # local path of the thumbnail (generated if not already present), None if it can't be created
+        if not self.is_supported(file):
+            return None
+
+        file_path = self.get_thumbnail_path(file, size)
+        if self._touch(file_path):
+            return file_path
+
+        try:
+            self._generate(file)
+        except Exception as e:
+            app_logger.log(LoggingType.ERROR, f"unable to create thumbnail of {file.uuid}: {str(e)}")
+            return None
+
+        return file_path
+
+    def get_thumbnail_list(self, file_list, size):
+        # the missing thumbnails are generated concurrently
+        return list(self._executor.map(lambda file: self.get_thumbnail(file, size), file_list))
+
+    def schedule(self, file):
+        # generates the thumbnails of a new file in the background
+        if self.is_supported(file):
+            self._background_executor.submit(self.get_thumbnail, file, THUMBNAIL_SIZE_LIST[0])
+
+    def _generate(self, file):
+        with self._lock:
+            generate_lock = self._download_lock_map.setdefault(str(file.uuid), threading.Lock())
+
+        with generate_lock:
+            missing_size_list = [
+                size for size in THUMBNAIL_SIZE_LIST if not self._touch(self.get_thumbnail_path(file, size))
+            ]
+            if missing_size_list:
+                self._create_thumbnails(file, missing_size_list)
+                self.evict()
+
+        with self._lock:
+            self._download_lock_map.pop(str(file.uuid), None)
+
+    def _create_thumbnails(self, file, size_list):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with Image.open(get_local_file_path(file.location)) as image:
+            # lets the jpeg decoder skip the detail which isn't needed
+            image.draft("RGB", (max(size_list), max(size_list)))
+            image = self._flatten(image)
+
+        # largest first, each size is downscaled from the previous one
+        for size in sorted(size_list, reverse=True):
+            image.thumbnail((size, size), Image.LANCZOS)
+            self._save(image, self.get_thumbnail_path(file, size))
+
+    def _flatten(self, image):
+        if image.mode not in ALPHA_MODE_LIST and "transparency" not in image.info:
+            return image.convert("RGB")
+
+        image = image.convert("RGBA")
+        res = Image.new("RGB", image.size, THUMBNAIL_BACKGROUND_COLOR)
+        res.paste(image, mask=image.getchannel("A"))
+        return res
+
+    def _save(self, image, file_path):
+        fd, temp_file_path = tempfile.mkstemp(dir=self.cache_dir, suffix=PARTIAL_DOWNLOAD_SUFFIX)
+        os.close(fd)
+        try:
+            image.save(temp_file_path, format=THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+            os.replace(temp_file_path, file_path)
+        except Exception:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+            raise
+
+
+thumbnail_store = ThumbnailStore()
+
+
+def get_thumbnail_location(file, size=THUMBNAIL_MEDIUM):
+    # location to display the file at the given size, the file itself if it has no thumbnail
+    return thumbnail_store.get_thumbnail(file, size) or file.location
+
+
+def get_thumbnail_location_list(file_list, size=THUMBNAIL_MEDIUM):
+    thumbnail_list = thumbnail_store.get_thumbnail_list(file_list, size)
+    return [
+        thumbnail or (file.location if file else None) for file, thumbnail in zip(file_list, thumbnail_list)
+    ]
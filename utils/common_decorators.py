@@ -28,20 +28,6 @@ def count_calls(cls):
     return Wrapper
 
 
-def log_time(func):
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
-        print(
-            f"{args[1] if args and len(args) >= 2 else kwargs['url']} took {execution_time:.4f} seconds to execute."
-        )
-        return result
-
-    return wrapper
-
-
 def measure_execution_time(cls):
     class WrapperClass:
         def __init__(self, *args, **kwargs):
@@ -72,8 +58,12 @@ def session_state_attributes(default_value_cls):
         original_getattr = cls.__getattribute__
         original_setattr = cls.__setattr__
 
+        # the dunder attributes (present on every class) are left alone, so that copy/pickle work
+        def is_session_attr(attr):
+            return not attr.startswith("__") and hasattr(default_value_cls, attr)
+
         def custom_attr(self, attr):
-            if hasattr(default_value_cls, attr):
+            if is_session_attr(attr):
                 key = f"{self.uuid}_{attr}"
                 if not (key in st.session_state and st.session_state[key]):
                     st.session_state[key] = getattr(default_value_cls, attr)
@@ -83,7 +73,7 @@ def session_state_attributes(default_value_cls):
                 return original_getattr(self, attr)
 
         def custom_setattr(self, attr, value):
-            if hasattr(default_value_cls, attr):
+            if is_session_attr(attr):
                 key = f"{self.uuid}_{attr}"
                 st.session_state[key] = value
             else:
@@ -1,38 +1,45 @@
 import json
 import os
-import socket
 
 import requests
 import streamlit as st
 from shared.constants import (
     HOSTED_BACKGROUND_RUNNER_MODE,
+    BatchEntityType,
     SERVER,
     InternalFileType,
     InternalResponse,
     ServerType,
 )
-from utils.common_decorators import log_time
+from shared.logging.constants import LoggingType
+from shared.logging.logging import app_logger
 
 from utils.constants import AUTH_TOKEN
+from utils.data_repo.http_client import APIHttpClient
+from utils.data_repo.request_coalescer import RequestCoalescer
 from utils.local_storage.url_storage import delete_url_param, get_url_param
 
 
 class APIRepo:
     def __init__(self):
-        self._load_base_url()
+        self._setup_http_client()
         self._setup_urls()
+        self.coalescer = RequestCoalescer(self._fetch_entity_batch)
+        # set to False once the server is found to not have the frame layout endpoint
+        self._frame_layout_supported = True
+        # set to False once the server is found to not create logs through the log list endpoint
+        self._log_list_supported = True
 
-    def _load_base_url(self):
+    def _setup_http_client(self):
         import dotenv
 
+        # env and the server address are loaded once, the client keeps its connections alive
         dotenv.load_dotenv()
+        self.http_client = APIHttpClient(os.getenv("SERVER_URL", ""))
 
-        SERVER_URL = os.getenv("SERVER_URL", "")
-        if not SERVER_URL.startswith("http"):
-            # connecting through service discovery
-            self.base_url = "http://" + socket.gethostbyname(SERVER_URL) + ":8080"
-        else:
-            self.base_url = SERVER_URL
+    @property
+    def base_url(self):
+        return self.http_client.base_url
 
     def _setup_urls(self):
         # user
@@ -93,6 +100,10 @@ class APIRepo:
         self.SHOT_LIST_URL = "/v1/data/shot/list"
         self.SHOT_INTERPOLATED_CLIP = "/v1/data/shot/interpolated-clip"
         self.SHOT_DUPLICATE_URL = "/v1/data/shot/duplicate"
+        self.SHOT_FRAME_LAYOUT_URL = "/v1/data/shot/frame-layout"
+
+        # batch
+        self.BATCH_URL = "/v1/data/batch"
 
     def logout(self):
         delete_url_param(AUTH_TOKEN)
@@ -116,41 +127,80 @@ class APIRepo:
 
         return headers
 
-    @log_time
     def http_get(self, url, params=None):
-        self._load_base_url()
-        res = requests.get(self.base_url + url, params=params, headers=self._get_headers())
+        res = self.http_client.request("GET", url, params=params, headers=self._get_headers())
         return res.json()
 
-    @log_time
     def http_post(self, url, data={}, file_content=None):
-        self._load_base_url()
+        self.coalescer.invalidate()
         if file_content:
             files = {"file": file_content}
-            res = requests.post(self.base_url + url, data=data, files=files, headers=self._get_headers(None))
+            res = self.http_client.request(
+                "POST", url, data=data, files=files, headers=self._get_headers(None)
+            )
         else:
-            res = requests.post(self.base_url + url, json=data, headers=self._get_headers())
+            res = self.http_client.request("POST", url, json=data, headers=self._get_headers())
 
         return res.json()
 
-    @log_time
     def http_put(self, url, data=None):
-        self._load_base_url()
-        res = requests.put(self.base_url + url, json=data, headers=self._get_headers())
+        self.coalescer.invalidate()
+        res = self.http_client.request("PUT", url, json=data, headers=self._get_headers())
         return res.json()
 
-    @log_time
     def http_delete(self, url, params=None):
-        self._load_base_url()
-        res = requests.delete(self.base_url + url, params=params, headers=self._get_headers())
+        self.coalescer.invalidate()
+        res = self.http_client.request("DELETE", url, params=params, headers=self._get_headers())
         return res.json()
 
+    def get_http_metrics(self):
+        # {endpoint: {count, errors, retries, avg_time, max_time}}
+        return self.http_client.metrics()
+
+    ################### batching
+    def _coalesced_get(self, entity_type, url, uuid):
+        return self.coalescer.get(
+            entity_type,
+            uuid,
+            lambda: self.http_get(url, params={"uuid": uuid}),
+            scope=get_url_param(AUTH_TOKEN),
+        )
+
+    def _fetch_entity_batch(self, entity_uuid_map):
+        # a post as the uuid lists can be long, this is a read so it doesn't invalidate the coalescer.
+        # if the batch fails (or the server doesn't have the endpoint) the uuids are fetched through the
+        # single entity endpoints
+        try:
+            res = self.http_client.request(
+                "POST", self.BATCH_URL, json={"entity_uuid_map": entity_uuid_map}, headers=self._get_headers()
+            )
+            if res.status_code >= 400:
+                return {}
+
+            res = res.json()
+            if not res["status"]:
+                return {}
+
+            # responses in the same format as the single entity endpoints
+            return {
+                entity_type: {
+                    str(data["uuid"]): {"payload": {"data": data}, "status": True} for data in data_list
+                }
+                for entity_type, data_list in res["payload"]["data"].items()
+            }
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            app_logger.log(LoggingType.ERROR, f"batch fetch failed: {str(e)}")
+            return {}
+
+    def prefetch_entity_list(self, entity_type, uuid_list):
+        self.coalescer.prefetch(entity_type, uuid_list)
+
     #########################################
     def refresh_auth_token(self, refresh_token):
         headers = {}
         headers["Authorization"] = f"Bearer {refresh_token}"
         headers["Content-Type"] = "application/json"
-        res = requests.get(self.base_url + self.AUTH_REFRESH_URL, headers=headers)
+        res = self.http_client.request("GET", self.AUTH_REFRESH_URL, headers=headers)
         payload = {"data": None}
         res_json = json.loads(res._content)
         if res.status_code == 200 and res_json["status"]:
@@ -160,7 +210,7 @@ class APIRepo:
     def user_password_login(self, **kwargs):
         headers = {}
         headers["Content-Type"] = "application/json"
-        res = requests.post(self.base_url + self.AUTH_OP_URL, json=kwargs, headers=headers)
+        res = self.http_client.request("POST", self.AUTH_OP_URL, json=kwargs, headers=headers)
         payload = {"data": None}
         res_json = json.loads(res._content)
         if res.status_code == 200 and res_json["status"]:
@@ -170,7 +220,7 @@ class APIRepo:
     def google_user_login(self, **kwargs):
         headers = {}
         headers["Content-Type"] = "application/json"
-        res = requests.post(self.base_url + self.GOOGLE_LOGIN_URL, json=kwargs, headers=headers)
+        res = self.http_client.request("POST", self.GOOGLE_LOGIN_URL, json=kwargs, headers=headers)
         payload = {"data": None}
         res_json = json.loads(res._content)
         if res.status_code == 200 and res_json["status"]:
@@ -216,7 +266,7 @@ class APIRepo:
         pass
 
     def get_file_from_uuid(self, uuid):
-        res = self.http_get(self.FILE_URL, params={"uuid": uuid})
+        res = self._coalesced_get(BatchEntityType.FILE.value, self.FILE_URL, uuid)
         return InternalResponse(res["payload"], "success", res["status"])
 
     def get_file_list_from_log_uuid_list(self, log_uuid_list):
@@ -224,6 +274,8 @@ class APIRepo:
         return InternalResponse(res["payload"], "success", res["status"])
 
     def get_all_file_list(self, **kwargs):
+        # the api always returns the complete objects (which are a superset of the slim ones)
+        kwargs.pop("slim", None)
         res = self.http_get(self.FILE_LIST_URL, params=kwargs)
         return InternalResponse(res["payload"], "success", res["status"])
 
@@ -335,6 +387,36 @@ class APIRepo:
         res = self.http_post(url=self.LOG_URL, data=kwargs)
         return InternalResponse(res["payload"], "success", res["status"])
 
+    def create_inference_log_list(self, log_data_list):
+        if self._log_list_supported:
+            self.coalescer.invalidate()
+            res = self.http_client.request(
+                "POST", self.LOG_LIST_URL, json={"log_data_list": log_data_list}, headers=self._get_headers()
+            )
+            if res.status_code not in [404, 405]:
+                try:
+                    res = res.json()
+                except ValueError:
+                    return InternalResponse({}, "invalid response", False)
+
+                return InternalResponse(res["payload"], "success", res["status"])
+
+            self._log_list_supported = False
+
+        return self._create_inference_log_list_per_log(log_data_list)
+
+    def _create_inference_log_list_per_log(self, log_data_list):
+        # same as create_inference_log_list through the single log endpoint, for the older servers
+        log_list = []
+        for log_data in log_data_list:
+            res = self.create_inference_log(**log_data)
+            if not res.status:
+                return res
+
+            log_list.append(res.data["data"])
+
+        return InternalResponse({"data": log_list}, "success", True)
+
     def delete_inference_log_from_uuid(self, uuid):
         res = self.db_repo.delete_inference_log_from_uuid(uuid)
         return InternalResponse(res["payload"], "success", res["status"]).status
@@ -364,7 +446,7 @@ class APIRepo:
 
     # timing
     def get_timing_from_uuid(self, uuid):
-        res = self.http_get(self.TIMING_URL, params={"uuid": uuid})
+        res = self._coalesced_get(BatchEntityType.TIMING.value, self.TIMING_URL, uuid)
         return InternalResponse(res["payload"], "success", res["status"])
 
     def get_timing_from_frame_number(self, shot_uuid, frame_number):
@@ -386,7 +468,7 @@ class APIRepo:
         res = self.http_get(self.TIMING_LIST_URL, params={"project_id": project_uuid, "page": 1})
         return InternalResponse(res["payload"], "success", res["status"])
 
-    def get_timing_list_from_shot(self, shot_uuid=None):
+    def get_timing_list_from_shot(self, shot_uuid=None, slim=False):
         res = self.http_get(self.TIMING_LIST_URL, params={"shot_id": shot_uuid, "page": 1})
         return InternalResponse(res["payload"], "success", res["status"])
 
@@ -408,6 +490,84 @@ class APIRepo:
         res = self.http_delete(self.TIMING_URL, params={"uuid": uuid})
         return InternalResponse(res["payload"], "success", res["status"])
 
+    def apply_shot_frame_layout(self, shot_uuid, frame_list):
+        if self._frame_layout_supported:
+            self.coalescer.invalidate()
+            res = self.http_client.request(
+                "PUT",
+                self.SHOT_FRAME_LAYOUT_URL,
+                json={"uuid": shot_uuid, "frame_list": frame_list},
+                headers=self._get_headers(),
+            )
+            if res.status_code not in [404, 405]:
+                try:
+                    res = res.json()
+                except ValueError:
+                    return InternalResponse({}, "invalid response", False)
+
+                return InternalResponse(res["payload"], "success", res["status"])
+
+            self._frame_layout_supported = False
+
+        return self._apply_shot_frame_layout_per_timing(shot_uuid, frame_list)
+
+    def _apply_shot_frame_layout_per_timing(self, shot_uuid, frame_list):
+        """
+        same as apply_shot_frame_layout through the single timing endpoints, for the servers which
+        don't have the layout endpoint. frames are placed in order, so moving/creating the frame at idx
+        only shifts the frames which are not placed yet
+        """
+        res = self.get_timing_list_from_shot(shot_uuid)
+        if not res.status:
+            return res
+
+        timing_map = {str(timing["uuid"]): timing for timing in res.data["data"]}
+        kept_uuid_list = set(str(f["uuid"]) for f in frame_list if f.get("uuid"))
+        for timing_uuid in timing_map:
+            if timing_uuid not in kept_uuid_list:
+                res = self.delete_timing_from_uuid(timing_uuid)
+                if not res.status:
+                    return res
+
+        used_uuid_list = set()
+        for idx, frame in enumerate(frame_list):
+            timing_uuid = str(frame.get("uuid") or frame.get("copy_of") or "")
+            if timing_uuid and timing_uuid not in timing_map:
+                return InternalResponse({}, "invalid timing uuid", False)
+
+            source = timing_map.get(timing_uuid, None)
+            update_data = {"aux_frame_index": idx}
+            if frame.get("primary_image_id"):
+                alternative_image_list = (
+                    json.loads(source["alternative_images"])
+                    if source and source["alternative_images"]
+                    else []
+                )
+                if str(frame["primary_image_id"]) not in alternative_image_list:
+                    alternative_image_list.append(str(frame["primary_image_id"]))
+                update_data["primary_image_id"] = str(frame["primary_image_id"])
+                update_data["alternative_images"] = json.dumps(alternative_image_list)
+
+            # a frame which is present more than once is copied after its first occurence
+            if frame.get("uuid") and timing_uuid not in used_uuid_list:
+                used_uuid_list.add(timing_uuid)
+                res = self.update_specific_timing(timing_uuid, **update_data)
+            else:
+                create_data = {"shot_id": shot_uuid}
+                for key in ["model", "source_image", "mask", "canny_image", "primary_image"]:
+                    if source and source.get(key, None):
+                        create_data[key + "_id"] = source[key]["uuid"]
+                if source:
+                    create_data["alternative_images"] = source["alternative_images"]
+                    create_data["notes"] = source["notes"]
+                create_data.update(update_data)
+                res = self.create_timing(**{k: v for k, v in create_data.items() if v is not None})
+
+            if not res.status:
+                return res
+
+        return InternalResponse({}, "frame layout applied successfully", True)
+
     # removes all timing frames from the project
     def remove_existing_timing(self, project_uuid):
         res = self.http_delete(self.PROJECT_TIMING_URL, params={"uuid": project_uuid})
@@ -507,7 +667,7 @@ class APIRepo:
 
     # shot
     def get_shot_from_uuid(self, shot_uuid):
-        res = self.http_get(self.SHOT_URL, params={"uuid": shot_uuid})
+        res = self._coalesced_get(BatchEntityType.SHOT.value, self.SHOT_URL, shot_uuid)
         return InternalResponse(res["payload"], "success", res["status"])
 
     def get_shot_from_number(self, project_uuid, shot_number=0):
@@ -24,8 +24,10 @@ from ui_components.models import (
     InternalUserObject,
 )
 from utils.cache.cache_methods import cache_data
+from utils.cache.thumbnail_store import thumbnail_store
 
 from utils.data_repo.api_repo import APIRepo
+from utils.data_repo.page_cursor import page_cursor_cache
 
 
 @cache_data
@@ -116,12 +118,19 @@ class DataRepo:
         return [InternalFileObject(**file) for file in file_list]
 
     # kwargs -  file_type: InternalFileType, tag = None, shot_uuid = "", project_id = None, page=None, data_per_page=None, sort_order=None
+    # slim=True only fetches the file fields, the relations (project, inference_log) are fetched when accessed
     def get_all_file_list(self, **kwargs):
         kwargs["type"] = kwargs["file_type"]
         del kwargs["file_type"]
 
+        page = kwargs.get("page", None)
+        if page:
+            self._set_page_cursor("file", kwargs)
+
         res = self.db_repo.get_all_file_list(**kwargs)
         file_list = res.data["data"] if res.status else None
+        if page and res.status:
+            page_cursor_cache.set("file", kwargs, page + 1, res.data.get("next_cursor", None))
 
         return ([InternalFileObject(**file) for file in file_list] if file_list else [], res.data)
 
@@ -153,6 +162,7 @@ class DataRepo:
             from ui_components.methods.file_methods import normalize_size_internal_file_obj
 
             file = normalize_size_internal_file_obj(file, **kwargs)
+            thumbnail_store.schedule(file)
 
         return file
 
@@ -251,18 +261,38 @@ class DataRepo:
         log = res.data["data"] if res else None
         return InferenceLogObject(**log) if log else None
 
+    # pages following an already fetched page are fetched through its cursor instead of an offset
+    def _set_page_cursor(self, list_name, kwargs):
+        cursor = page_cursor_cache.get(list_name, kwargs, kwargs.get("page", 1))
+        if cursor:
+            kwargs["cursor"] = cursor
+
     def get_all_inference_log_list(self, **kwargs):
+        self._set_page_cursor("inference_log", kwargs)
         res = self.db_repo.get_all_inference_log_list(**kwargs)
         log_list = res.data["data"] if res.status else None
-        total_page_count = res.data["total_pages"] if res.status else None
+        total_page_count = res.data.get("total_pages", None)
+        if res.status:
+            page_cursor_cache.set(
+                "inference_log", kwargs, kwargs.get("page", 1) + 1, res.data.get("next_cursor", None)
+            )
 
         return ([InferenceLogObject(**log) for log in log_list] if log_list else None, total_page_count)
 
     def create_inference_log(self, **kwargs):
         res = self.db_repo.create_inference_log(**kwargs)
         log = res.data["data"] if res else None
+        if log and kwargs.get("status", None) == InferenceStatus.QUEUED.value:
+            self._notify_runner()
         return InferenceLogObject(**log) if log else None
 
+    def create_inference_log_list(self, log_data_list):
+        res = self.db_repo.create_inference_log_list(log_data_list)
+        log_list = res.data["data"] if res.status else []
+        if any(log_data.get("status", None) == InferenceStatus.QUEUED.value for log_data in log_data_list):
+            self._notify_runner()
+        return [InferenceLogObject(**log) for log in log_list]
+
     def delete_inference_log_from_uuid(self, uuid):
         res = self.db_repo.delete_inference_log_from_uuid(uuid)
         return res.status
@@ -273,8 +303,19 @@ class DataRepo:
 
     def update_inference_log_list(self, uuid_list, **kwargs):
         res = self.db_repo.update_inference_log_list(uuid_list, **kwargs)
+        if res.status and kwargs.get("status", None) == InferenceStatus.QUEUED.value:
+            self._notify_runner()
         return res.status
 
+    # pings the local runner so that queued logs are picked up right away
+    def _notify_runner(self):
+        if SERVER != ServerType.DEVELOPMENT.value:
+            return
+
+        from utils.runner.wakeup import notify_runner
+
+        notify_runner()
+
     def update_inference_log_origin_data(self, uuid, **kwargs):
         res = self.get_inference_log_from_uuid(uuid)
         if not res:
@@ -324,8 +365,9 @@ class DataRepo:
         timing_list = res.data["data"] if res.status else None
         return [InternalFrameTimingObject(**timing) for timing in timing_list] if timing_list else []
 
-    def get_timing_list_from_shot(self, shot_uuid=None):
-        res = self.db_repo.get_timing_list_from_shot(shot_uuid)
+    # slim=True only fetches the timing and file fields, the relations are fetched when accessed
+    def get_timing_list_from_shot(self, shot_uuid=None, slim=False):
+        res = self.db_repo.get_timing_list_from_shot(shot_uuid, slim=slim)
         timing_list = res.data["data"] if res.status else None
         return [InternalFrameTimingObject(**timing) for timing in timing_list] if timing_list else []
 
@@ -354,6 +396,11 @@ class DataRepo:
         res = self.db_repo.delete_timing_from_uuid(uuid)
         return res.status
 
+    # moves/copies/deletes the frames of the shot in one go, check DBRepo.apply_shot_frame_layout
+    def apply_shot_frame_layout(self, shot_uuid, frame_list):
+        res = self.db_repo.apply_shot_frame_layout(shot_uuid, frame_list)
+        return res.status
+
     # removes all timing frames from the project
     def remove_existing_timing(self, project_uuid):
         res = self.db_repo.remove_existing_timing(project_uuid)
@@ -521,6 +568,13 @@ class DataRepo:
         res = self.db_repo.add_interpolated_clip(shot_uuid, **kwargs)
         return res.status
 
+    # batch
+    # hints the entities (BatchEntityType) which are about to be fetched one by one, in hosted mode the
+    # lookups are then gathered into a single request (local db lookups are cheap enough as they are)
+    def prefetch_entity_list(self, entity_type, uuid_list):
+        if SERVER != ServerType.DEVELOPMENT.value:
+            self.db_repo.prefetch_entity_list(entity_type, uuid_list)
+
     # combined
     # gives the count of 1. temp generated images 2. inference logs with in-progress/pending status
     def get_explorer_pending_stats(self, project_uuid):
@@ -0,0 +1,191 @@
+import os
+import random
+import socket
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+from shared.logging.constants import LoggingType
+from shared.logging.logging import app_logger
+
+
+# (connect timeout, read timeout) in seconds
+HTTP_TIMEOUT = (float(os.getenv("HTTP_CONNECT_TIMEOUT", 5)), float(os.getenv("HTTP_READ_TIMEOUT", 60)))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 16))
+HTTP_BACKOFF_BASE = 0.2
+HTTP_BACKOFF_MAX = 5
+RETRY_STATUS_CODE_LIST = [502, 503, 504]
+# only these are retried once the request may have reached the server
+IDEMPOTENT_METHOD_LIST = ["GET", "PUT", "DELETE", "HEAD", "OPTIONS"]
+# service discovery addresses are resolved again after this many seconds (or on a connection error)
+BASE_URL_TTL = int(os.getenv("BASE_URL_TTL", 300))
+SLOW_REQUEST_THRESHOLD = 1
+
+
+def is_connect_error(e):
+    # true if the connection could not be established (dns, refused, connect timeout)
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+
+    reason = getattr(e.args[0], "reason", None) if e.args else None
+    return isinstance(reason, ConnectTimeoutError)
+
+
+def get_stream_position_list(files):
+    """
+    [(stream, position)] of the file objects of a requests files param, they are read completely
+    while the request is prepared so they have to be rewound before a retry. None if any of them
+    can't be rewound (and so the request can't be retried)
+    """
+    if not files:
+        return []
+
+    item_list = files.values() if isinstance(files, dict) else [v for _, v in files]
+    position_list = []
+    for item in item_list:
+        stream = item[1] if isinstance(item, (tuple, list)) else item
+        if isinstance(stream, (str, bytes)):
+            continue
+
+        try:
+            if not stream.seekable():
+                return None
+            position_list.append((stream, stream.tell()))
+        except (AttributeError, OSError):
+            return None
+
+    return position_list
+
+
+def rewind_streams(position_list):
+    for stream, position in position_list:
+        stream.seek(position)
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_time": round(self.total_time / self.count, 4) if self.count else 0,
+            "max_time": round(self.max_time, 4),
+        }
+
+
+class APIHttpClient:
+    """
+    http transport for the api repo. requests go over a single pooled (keep-alive) session, the
+    base url is resolved once and cached, failed requests are retried with jittered exponential
+    backoff (non-idempotent ones only when they never reached the server) and the latency of
+    every endpoint is recorded in metrics
+    """
+
+    def __init__(self, server_url, timeout=HTTP_TIMEOUT, max_retries=HTTP_MAX_RETRIES):
+        self.server_url = server_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._base_url = None
+        self._base_url_resolved_at = 0
+        self._metrics = {}  # {endpoint: EndpointMetrics}
+
+    @property
+    def base_url(self):
+        with self._lock:
+            if not self._base_url or (
+                not self.server_url.startswith("http")
+                and time.time() - self._base_url_resolved_at > BASE_URL_TTL
+            ):
+                self._base_url = self._resolve_base_url()
+                self._base_url_resolved_at = time.time()
+
+            return self._base_url
+
+    def _resolve_base_url(self):
+        if not self.server_url.startswith("http"):
+            # connecting through service discovery
+            return "http://" + socket.gethostbyname(self.server_url) + ":8080"
+
+        return self.server_url
+
+    def invalidate_base_url(self):
+        with self._lock:
+            self._base_url = None
+
+    def get_backoff_time(self, attempt):
+        # full jitter, spreads out the retries of clients that failed together
+        return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2**attempt))
+
+    def request(self, method, url, **kwargs):
+        """
+        sends the request to base_url + url and returns the response. connection errors and
+        RETRY_STATUS_CODE_LIST responses are retried up to max_retries times
+        """
+        method = method.upper()
+        kwargs.setdefault("timeout", self.timeout)
+        # uploads from a stream which can't be rewound are sent only once
+        position_list = get_stream_position_list(kwargs.get("files", None))
+        max_retries = self.max_retries if position_list is not None else 0
+        start_time, retries, res = time.time(), 0, None
+        try:
+            while True:
+                try:
+                    if retries:
+                        rewind_streams(position_list)
+                    res = self.session.request(method, self.base_url + url, **kwargs)
+                    if (
+                        res.status_code not in RETRY_STATUS_CODE_LIST
+                        or method not in IDEMPOTENT_METHOD_LIST
+                        or retries >= max_retries
+                    ):
+                        return res
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    connect_error = is_connect_error(e)
+                    if connect_error:
+                        self.invalidate_base_url()
+                    # a failed connect never reached the server, so even a post is safe to retry
+                    if retries >= max_retries or (not connect_error and method not in IDEMPOTENT_METHOD_LIST):
+                        raise
+
+                retries += 1
+                time.sleep(self.get_backoff_time(retries))
+        finally:
+            self._record(url, time.time() - start_time, retries, res)
+
+    def _record(self, url, execution_time, retries, res):
+        endpoint = urlparse(url).path
+        with self._lock:
+            metrics = self._metrics.setdefault(endpoint, EndpointMetrics())
+            metrics.count += 1
+            metrics.retries += retries
+            metrics.total_time += execution_time
+            metrics.max_time = max(metrics.max_time, execution_time)
+            if res is None or res.status_code >= 400:
+                metrics.errors += 1
+
+        if execution_time > SLOW_REQUEST_THRESHOLD:
+            app_logger.log(LoggingType.DEBUG, f"{endpoint} took {execution_time:.4f} seconds to execute")
+
+    def metrics(self):
+        with self._lock:
+            return {endpoint: metrics.to_dict() for endpoint, metrics in self._metrics.items()}
+
+    def close(self):
+        self.session.close()
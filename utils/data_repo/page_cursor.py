@@ -0,0 +1,48 @@
+import threading
+import time
+
+
+# the rows updated in the meantime can shift the pages, so the cursors are only reused for a while
+PAGE_CURSOR_TTL = 60
+PAGE_CURSOR_MAX_SIZE = 500
+
+
+class PageCursorCache:
+    """
+    remembers the next_cursor returned with each page of a paginated list, so that when the following
+    page (of the same list, with the same filters) is requested it is fetched through the cursor instead
+    of an offset. the callers keep paginating with page numbers
+    """
+
+    def __init__(self, ttl=PAGE_CURSOR_TTL, max_size=PAGE_CURSOR_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._cursor_dict = {}  # {(list_name, filters, page): (cursor, created_at)}
+
+    def _get_key(self, list_name, filter_dict, page):
+        filters = sorted((k, str(v)) for k, v in filter_dict.items() if k not in ["page", "cursor"])
+        return (list_name, str(filters), page)
+
+    def get(self, list_name, filter_dict, page):
+        with self._lock:
+            cached = self._cursor_dict.get(self._get_key(list_name, filter_dict, page), None)
+
+        if cached and time.time() - cached[1] < self.ttl:
+            return cached[0]
+
+        return None
+
+    def set(self, list_name, filter_dict, page, cursor):
+        key = self._get_key(list_name, filter_dict, page)
+        with self._lock:
+            if not cursor:
+                self._cursor_dict.pop(key, None)
+                return
+
+            if len(self._cursor_dict) >= self.max_size:
+                self._cursor_dict = {}
+            self._cursor_dict[key] = (cursor, time.time())
+
+
+page_cursor_cache = PageCursorCache()
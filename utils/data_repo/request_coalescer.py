@@ -0,0 +1,118 @@
+import threading
+from concurrent.futures import Future
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+BATCH_STATE_KEY = "api_batch__state"
+
+
+def reset_request_batch():
+    # called at the start of every script run, the batched results are only valid within a run
+    if get_script_run_ctx() is not None:
+        st.session_state[BATCH_STATE_KEY] = {"pending": {}, "results": {}}
+
+
+class RequestCoalescer:
+    """
+    coalesces the uuid lookups (file, timing, shot..) of the api repo. uuids hinted through prefetch
+    during a script run are fetched together (all entity types in a single batched request) on the
+    first lookup that misses, and identical lookups which are already in flight (from other threads)
+    wait for that request instead of sending their own.
+    fetch_batch({entity_type: uuid_list}) should return {entity_type: {uuid: response}}
+    """
+
+    def __init__(self, fetch_batch):
+        self.fetch_batch = fetch_batch
+        self._lock = threading.Lock()
+        self._in_flight = {}  # {(scope, entity_type, uuid): Future}
+        self.metrics = {"requests": 0, "batch_requests": 0, "batched_items": 0, "deduplicated": 0}
+
+    def _get_run_state(self):
+        # only the script thread of a session has a run, everything else is fetched directly
+        if get_script_run_ctx() is None:
+            return None
+
+        return st.session_state.get(BATCH_STATE_KEY, None)
+
+    def prefetch(self, entity_type, uuid_list):
+        state = self._get_run_state()
+        if state is None:
+            return
+
+        results = state["results"].get(entity_type, {})
+        state["pending"].setdefault(entity_type, set()).update(
+            str(uuid) for uuid in uuid_list if uuid and str(uuid) not in results
+        )
+
+    def get(self, entity_type, uuid, fetch_one, scope=None):
+        """
+        returns the response for the entity. scope (the auth token) keeps the lookups of different
+        users from being merged
+        """
+        uuid = str(uuid)
+        state = self._get_run_state()
+        if state is not None:
+            results = state["results"].setdefault(entity_type, {})
+            if uuid in results:
+                return results[uuid]
+
+            if any(state["pending"].values()):
+                state["pending"].setdefault(entity_type, set()).add(uuid)
+                self._flush(state, scope)
+                if uuid in results:
+                    return results[uuid]
+
+        return self._run_once((scope, entity_type, uuid), fetch_one)
+
+    def _run_once(self, key, fn):
+        with self._lock:
+            future = self._in_flight.get(key, None)
+            is_owner = future is None
+            if is_owner:
+                future = self._in_flight[key] = Future()
+                self.metrics["requests"] += 1
+            else:
+                self.metrics["deduplicated"] += 1
+
+        if not is_owner:
+            # some other thread is already fetching this
+            return future.result()
+
+        try:
+            res = fn()
+            future.set_result(res)
+            return res
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _flush(self, state, scope):
+        entity_uuid_map = {
+            entity_type: sorted(uuid_set) for entity_type, uuid_set in state["pending"].items() if uuid_set
+        }
+        state["pending"] = {}
+
+        with self._lock:
+            self.metrics["batch_requests"] += 1
+            self.metrics["batched_items"] += sum(len(uuid_list) for uuid_list in entity_uuid_map.values())
+
+        batch_res = self._run_once(
+            (scope, "batch", str(entity_uuid_map)), lambda: self.fetch_batch(entity_uuid_map)
+        )
+        for entity_type, uuid_list in entity_uuid_map.items():
+            res_map = batch_res.get(entity_type, {})
+            results = state["results"].setdefault(entity_type, {})
+            for uuid in uuid_list:
+                if uuid in res_map:
+                    results[uuid] = res_map[uuid]
+
+    def invalidate(self):
+        # writes can change any of the fetched entities
+        state = self._get_run_state()
+        if state is not None:
+            state["results"] = {}
@@ -1,11 +1,54 @@
+import multiprocessing
 import os
+import re
+import shutil
+import subprocess
 import tempfile
-from moviepy.editor import VideoFileClip, vfx
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import ffmpeg
+import imageio_ffmpeg
+from utils.cache.media_cache import get_local_file_path
+
+# moviepy is slow to import and is only imported where it's used, this module is loaded by every
+# render worker process
+
+
+# stream properties which have to match for videos to be joined without re-encoding
+VIDEO_STREAM_KEYS = ["codec_name", "width", "height", "pix_fmt", "r_frame_rate", "time_base"]
+AUDIO_STREAM_KEYS = ["codec_name", "sample_rate", "channels"]
+# codecs for which mismatching videos can be re-encoded to match the rest (ffmpeg codec -> encoder)
+ENCODER_MAP = {"h264": "libx264", "aac": "aac"}
+# used when all the videos have to be re-encoded
+DEFAULT_RENDER_SETTINGS = {
+    "fps": 60,
+    "vcodec": "libx264",
+    "video_bitrate": "5000k",
+    "acodec": "aac",
+    "audio_bitrate": "128k",
+    "sample_rate": 44100,
+    "channels": 2,
+}
+# audio of the per shot render segments, the video is copied as it is
+SEGMENT_AUDIO_SETTINGS = {"acodec": "aac", "sample_rate": 44100, "channels": 2}
+CHANNEL_LAYOUT_MAP = {"mono": 1, "stereo": 2}
+
+
+def get_ffmpeg_exe():
+    # the ffmpeg bundled with imageio-ffmpeg (installed with moviepy), same as the one moviepy uses.
+    # IMAGEIO_FFMPEG_EXE overrides it and the system ffmpeg is used when no binary is bundled
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def parse_ffmpeg_number(value):
+    # ffmpeg prints the large rates/timebases as "90k"
+    return float(value[:-1]) * 1000 if value.endswith("k") else float(value)
 
 
 class VideoProcessor:
     @staticmethod
     def update_video_speed(video_location, desired_duration):
+        from moviepy.editor import VideoFileClip
+
         clip = VideoFileClip(video_location)
 
         return VideoProcessor.update_clip_speed(clip, desired_duration)
@@ -18,6 +61,8 @@ class VideoProcessor:
             temp_file_path = temp_file.name  # Store the file name to delete later
 
         # Process the video file
+        from moviepy.editor import VideoFileClip
+
         with VideoFileClip(temp_file_path) as clip:
             result = VideoProcessor.update_clip_speed(clip, desired_duration)
 
@@ -27,7 +72,7 @@ class VideoProcessor:
         return result
 
     @staticmethod
-    def update_clip_speed(clip: VideoFileClip, desired_duration):
+    def update_clip_speed(clip: "VideoFileClip", desired_duration):
         # Use a context manager to ensure temporary file for output is deleted when done
         with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4", mode="wb") as temp_output_file:
             temp_output_path = temp_output_file.name  # Store the file name for later use
@@ -55,6 +100,8 @@ class VideoProcessor:
         input_video_duration = clip.duration
         desired_speed_change = float(input_video_duration) / float(desired_duration)
         print("Desired Speed Change: " + str(desired_speed_change))
+        from moviepy.editor import vfx
+
         output_clip = clip.fx(vfx.speedx, desired_speed_change)
         output_clip.write_videofile(filename=temp_output_path, codec="libx264", preset="fast")
 
@@ -66,3 +113,302 @@ class VideoProcessor:
         os.remove(temp_output_path)
 
         return video_bytes
+
+    @staticmethod
+    def get_stream_info(video_location):
+        # ffprobe isn't bundled with imageio-ffmpeg, the info is read from the ffmpeg output when it's missing
+        ffprobe_exe = shutil.which("ffprobe")
+        if not ffprobe_exe:
+            return VideoProcessor._get_stream_info_from_ffmpeg(video_location)
+
+        probe = ffmpeg.probe(video_location, cmd=ffprobe_exe)
+        video_stream = next((s for s in probe["streams"] if s["codec_type"] == "video"), None)
+        audio_stream = next((s for s in probe["streams"] if s["codec_type"] == "audio"), None)
+
+        return {
+            "video": {k: video_stream.get(k, None) for k in VIDEO_STREAM_KEYS} if video_stream else None,
+            "audio": {k: audio_stream.get(k, None) for k in AUDIO_STREAM_KEYS} if audio_stream else None,
+            "duration": float(probe["format"].get("duration", None) or 0),
+        }
+
+    @staticmethod
+    def _get_stream_info_from_ffmpeg(video_location):
+        # same keys as get_stream_info, parsed from the input details that "ffmpeg -i" prints
+        output = subprocess.run(
+            [get_ffmpeg_exe(), "-hide_banner", "-i", video_location], capture_output=True, text=True
+        ).stderr
+
+        duration = re.search(r"Duration: (\d+):(\d+):([\d.]+)", output)
+        video_line = re.search(r"Stream #\S+: Video: (.*)", output)
+        audio_line = re.search(r"Stream #\S+: Audio: (.*)", output)
+        if not (duration or video_line or audio_line):
+            raise ValueError(f"unable to read the streams of {video_location}")
+
+        video = None
+        if video_line:
+            line = video_line.group(1)
+            size = re.search(r", (\d+)x(\d+)", line)
+            frame_rate = re.search(r"([\d.]+k?) tbr", line) or re.search(r"([\d.]+k?) fps", line)
+            timebase = re.search(r"([\d.]+k?) tbn", line)
+            video = {
+                "codec_name": line.split(" ")[0].rstrip(","),
+                "width": int(size.group(1)) if size else None,
+                "height": int(size.group(2)) if size else None,
+                "pix_fmt": re.match(r"[^,]+, (\w+)", line).group(1) if "," in line else None,
+                "r_frame_rate": frame_rate.group(1) if frame_rate else None,
+                "time_base": (f"1/{round(parse_ffmpeg_number(timebase.group(1)))}" if timebase else None),
+            }
+
+        audio = None
+        if audio_line:
+            line = audio_line.group(1)
+            sample_rate = re.search(r"(\d+) Hz", line)
+            layout = re.search(r"Hz, ([^,]+)", line)
+            channels = None
+            if layout:
+                layout = layout.group(1).split("(")[0].strip()
+                surround = re.match(r"(\d+)\.(\d+)$", layout)
+                count = re.match(r"(\d+) channels", layout)
+                if layout in CHANNEL_LAYOUT_MAP:
+                    channels = CHANNEL_LAYOUT_MAP[layout]
+                elif surround:
+                    channels = int(surround.group(1)) + int(surround.group(2))
+                elif count:
+                    channels = int(count.group(1))
+
+            audio = {
+                "codec_name": line.split(" ")[0].rstrip(","),
+                "sample_rate": sample_rate.group(1) if sample_rate else None,
+                "channels": channels,
+            }
+
+        return {
+            "video": video,
+            "audio": audio,
+            "duration": (
+                int(duration.group(1)) * 3600 + int(duration.group(2)) * 60 + float(duration.group(3))
+                if duration
+                else 0
+            ),
+        }
+
+    @staticmethod
+    def concat_videos(video_location_list, output_path, reencode=False):
+        """
+        joins the videos into output_path. videos with the same codec, size and timebase as the first video
+        are stream copied (ffmpeg concat demuxer), only the remaining ones are re-encoded to match it.
+        reencode=True re-encodes everything with DEFAULT_RENDER_SETTINGS
+        """
+        info_list = [VideoProcessor.get_stream_info(v) for v in video_location_list]
+        target_video = info_list[0]["video"]
+        target_audio = next((info["audio"] for info in info_list if info["audio"]), None)
+
+        if (
+            reencode
+            or target_video["codec_name"] not in ENCODER_MAP
+            or (target_audio and target_audio["codec_name"] not in ENCODER_MAP)
+        ):
+            return VideoProcessor._concat_reencode(video_location_list, info_list, output_path)
+
+        temp_file_list = []
+        concat_location_list = []
+        for video_location, info in zip(video_location_list, info_list):
+            if info["video"] == target_video and info["audio"] == target_audio:
+                concat_location_list.append(video_location)
+                continue
+
+            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
+            temp_file.close()
+            temp_file_list.append(temp_file.name)
+            VideoProcessor._reencode_to_match(
+                video_location, info, target_video, target_audio, temp_file.name
+            )
+            concat_location_list.append(temp_file.name)
+
+        # the concat demuxer reads the list of files from a text file
+        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".txt") as list_file:
+            for location in concat_location_list:
+                escaped_location = os.path.abspath(location).replace("'", "'\\''")
+                list_file.write(f"file '{escaped_location}'\n")
+        temp_file_list.append(list_file.name)
+
+        try:
+            (
+                ffmpeg.input(list_file.name, f="concat", safe=0)
+                .output(output_path, c="copy", movflags="+faststart")
+                .overwrite_output()
+                .run(cmd=get_ffmpeg_exe(), quiet=True)
+            )
+        finally:
+            for temp_file in temp_file_list:
+                os.remove(temp_file)
+
+        return output_path
+
+    @staticmethod
+    def _reencode_to_match(video_location, info, target_video, target_audio, output_path):
+        width, height = target_video["width"], target_video["height"]
+        input_stream = ffmpeg.input(video_location)
+        video = (
+            input_stream.video.filter("scale", width, height, force_original_aspect_ratio="decrease")
+            .filter("pad", width, height, "(ow-iw)/2", "(oh-ih)/2")
+            .filter("setsar", 1)
+            .filter("fps", fps=target_video["r_frame_rate"])
+            .filter("format", target_video["pix_fmt"])
+        )
+        stream_list, output_kwargs = [video], {}
+        if target_audio:
+            stream_list.append(
+                VideoProcessor._get_audio_stream(input_stream, info, target_audio["sample_rate"])
+            )
+            output_kwargs = {
+                "acodec": ENCODER_MAP[target_audio["codec_name"]],
+                "ar": target_audio["sample_rate"],
+                "ac": target_audio["channels"],
+            }
+
+        # same timescale as the other videos, otherwise the timestamps drift after the concat
+        timescale = target_video["time_base"].split("/")[-1]
+        (
+            ffmpeg.output(
+                *stream_list,
+                output_path,
+                vcodec=ENCODER_MAP[target_video["codec_name"]],
+                preset="fast",
+                t=info["duration"],
+                video_track_timescale=timescale,
+                **output_kwargs,
+            )
+            .overwrite_output()
+            .run(cmd=get_ffmpeg_exe(), quiet=True)
+        )
+
+    @staticmethod
+    def _concat_reencode(video_location_list, info_list, output_path, settings=DEFAULT_RENDER_SETTINGS):
+        # single filtergraph which scales all the videos to the size of the first one and joins them
+        width, height = info_list[0]["video"]["width"], info_list[0]["video"]["height"]
+        has_audio = any(info["audio"] for info in info_list)
+
+        stream_list = []
+        for video_location, info in zip(video_location_list, info_list):
+            input_stream = ffmpeg.input(video_location)
+            stream_list.append(
+                input_stream.video.filter("scale", width, height, force_original_aspect_ratio="decrease")
+                .filter("pad", width, height, "(ow-iw)/2", "(oh-ih)/2")
+                .filter("setsar", 1)
+                .filter("fps", fps=settings["fps"])
+            )
+            if has_audio:
+                stream_list.append(
+                    VideoProcessor._get_audio_stream(input_stream, info, settings["sample_rate"])
+                )
+
+        joined = ffmpeg.concat(*stream_list, v=1, a=1 if has_audio else 0).node
+        output_stream_list = [joined[0], joined[1]] if has_audio else [joined[0]]
+        (
+            ffmpeg.output(
+                *output_stream_list,
+                output_path,
+                vcodec=settings["vcodec"],
+                video_bitrate=settings["video_bitrate"],
+                pix_fmt="yuv420p",
+                acodec=settings["acodec"],
+                audio_bitrate=settings["audio_bitrate"],
+                ar=settings["sample_rate"],
+                ac=settings["channels"],
+                movflags="+faststart",
+            )
+            .overwrite_output()
+            .run(cmd=get_ffmpeg_exe(), quiet=True)
+        )
+
+        return output_path
+
+    @staticmethod
+    def _get_audio_stream(input_stream, info, sample_rate):
+        # silent audio for the videos without an audio track, so that all the videos have the same streams
+        if info["audio"]:
+            return input_stream.audio.filter("aresample", int(sample_rate))
+
+        return ffmpeg.input(f"anullsrc=sample_rate={sample_rate}", f="lavfi").filter(
+            "atrim", duration=info["duration"]
+        )
+
+    @staticmethod
+    def prepare_render_segment(video_location, audio_location, start_timestamp, output_path):
+        """
+        writes the segment of the final render for a single shot to output_path, i.e. the video with the
+        audio (starting at start_timestamp) added to it. video_location and audio_location can be urls
+        """
+        video_location = get_local_file_path(video_location)
+        audio_location = get_local_file_path(audio_location) if audio_location else None
+
+        # writing to a temp file first so that a partially written segment is never picked up
+        temp_output_path = output_path + ".tmp.mp4"
+        try:
+            if audio_location:
+                VideoProcessor.add_audio_to_video(
+                    video_location, audio_location, start_timestamp, temp_output_path
+                )
+            else:
+                shutil.copyfile(video_location, temp_output_path)
+
+            os.replace(temp_output_path, output_path)
+        finally:
+            if os.path.exists(temp_output_path):
+                os.remove(temp_output_path)
+
+        return output_path
+
+    @staticmethod
+    def prepare_render_segment_list(job_list, max_workers=1, progress_callback=None):
+        """
+        prepares the segments of job_list [(video_location, audio_location, start_timestamp, output_path)]
+        across max_workers processes, progress_callback(done_count, total_count) is called as they complete.
+        the workers are spawned, as forking the app process (which has threads running) isn't safe
+        """
+        worker_count = max(1, min(max_workers, len(job_list)))
+        if worker_count == 1:
+            for idx, job in enumerate(job_list):
+                VideoProcessor.prepare_render_segment(*job)
+                if progress_callback:
+                    progress_callback(idx + 1, len(job_list))
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=worker_count, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            future_list = [executor.submit(VideoProcessor.prepare_render_segment, *job) for job in job_list]
+            for idx, future in enumerate(as_completed(future_list)):
+                future.result()
+                if progress_callback:
+                    progress_callback(idx + 1, len(job_list))
+
+    @staticmethod
+    def add_audio_to_video(video_location, audio_location, start_timestamp, output_path):
+        # the video stream is copied, the audio is padded with silence (or cut) to the length of the video
+        video_duration = VideoProcessor.get_stream_info(video_location)["duration"]
+        audio_duration = VideoProcessor.get_stream_info(audio_location)["duration"]
+
+        if start_timestamp < audio_duration:
+            audio = ffmpeg.input(audio_location, ss=start_timestamp).audio.filter("apad")
+        else:
+            audio = ffmpeg.input(f"anullsrc=sample_rate={SEGMENT_AUDIO_SETTINGS['sample_rate']}", f="lavfi")
+
+        (
+            ffmpeg.output(
+                ffmpeg.input(video_location).video,
+                audio,
+                output_path,
+                vcodec="copy",
+                acodec=SEGMENT_AUDIO_SETTINGS["acodec"],
+                ar=SEGMENT_AUDIO_SETTINGS["sample_rate"],
+                ac=SEGMENT_AUDIO_SETTINGS["channels"],
+                t=video_duration,
+                movflags="+faststart",
+            )
+            .overwrite_output()
+            .run(cmd=get_ffmpeg_exe(), quiet=True)
+        )
+
+        return output_path
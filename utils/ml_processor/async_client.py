@@ -0,0 +1,52 @@
+import asyncio
+import os
+import threading
+
+import httpx
+
+
+ASYNC_HTTP_TIMEOUT = httpx.Timeout(float(os.getenv("ML_HTTP_TIMEOUT", 60)), connect=10)
+ASYNC_HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("ML_HTTP_MAX_CONNECTIONS", 32)), max_keepalive_connections=16
+)
+
+
+class AsyncRunner:
+    """
+    runs coroutines on an event loop in a background thread, so the streamlit script thread can submit
+    network bound work (and many of it concurrently) without running a loop of its own. the http client
+    is shared by everything running on the loop and keeps its connections alive between calls
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="ml_async_runner", daemon=True)
+        self._thread.start()
+        self._http_client = None
+
+    def submit(self, coro):
+        # returns a concurrent.futures.Future of the result
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro):
+        # blocks the calling thread (never the loop) until the coroutine is done
+        return self.submit(coro).result()
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        # only accessed from coroutines running on the loop
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=ASYNC_HTTP_TIMEOUT, limits=ASYNC_HTTP_LIMITS)
+        return self._http_client
+
+
+_async_runner = None
+_async_runner_lock = threading.Lock()
+
+
+def get_async_runner() -> AsyncRunner:
+    global _async_runner
+    with _async_runner_lock:
+        if _async_runner is None:
+            _async_runner = AsyncRunner()
+        return _async_runner
@@ -10,6 +10,7 @@ from ui_components.methods.file_methods import save_or_host_file, zip_images, de
 from utils.constants import MLQueryObject
 from utils.data_repo.data_repo import DataRepo
 from utils.ml_processor.constants import ML_MODEL, ComfyWorkflow, MLModel
+from utils.ml_processor.workflow_cache import WorkflowOverlay, workflow_template_cache
 import json
 
 
@@ -71,19 +72,168 @@ MODEL_PATH_DICT = {
 }
 
 
+# maps the params of a transform to the [node_id, input_name] list they are set on
+WORKFLOW_PATCH_DICT = {
+    ComfyWorkflow.SDXL: {
+        "seed": [["10", "noise_seed"]],
+        "width": [["5", "width"]],
+        "height": [["5", "height"]],
+        "prompt": [["6", "text"], ["15", "text"]],
+        "negative_prompt": [["7", "text"], ["16", "text"]],
+        "steps": [["10", "steps"], ["11", "steps"]],
+        "cfg": [["10", "cfg"], ["11", "cfg"]],
+    },
+    ComfyWorkflow.SDXL_IMG2IMG: {
+        "seed": [["42:2", "seed"]],
+        "image": [["37:0", "image"]],
+        "prompt": [["42:0", "text"]],
+        "negative_prompt": [["42:1", "text"]],
+        "steps": [["42:2", "steps"]],
+        "cfg": [["42:2", "cfg"]],
+        "denoise": [["42:2", "denoise"]],
+    },
+    ComfyWorkflow.SDXL_CONTROLNET: {
+        "seed": [["3", "seed"]],
+        "prompt": [["6", "text"]],
+        "negative_prompt": [["7", "text"]],
+        "low_threshold": [["12", "low_threshold"]],
+        "high_threshold": [["12", "high_threshold"]],
+        "steps": [["3", "steps"]],
+        "cfg": [["3", "cfg"]],
+        "image": [["13", "image"]],
+    },
+    ComfyWorkflow.IPADAPTER_COMPOSITION: {
+        "seed": [["9", "seed"]],
+        "prompt": [["7", "text"]],
+        "negative_prompt": [["8", "text"]],
+        "steps": [["9", "steps"]],
+        "cfg": [["9", "cfg"]],
+        "image": [["6", "image"]],
+        "strength": [["28", "weight"]],
+    },
+    ComfyWorkflow.SDXL_CONTROLNET_OPENPOSE: {
+        "seed": [["3", "seed"]],
+        "prompt": [["6", "text"]],
+        "negative_prompt": [["7", "text"]],
+        "steps": [["3", "steps"]],
+        "cfg": [["3", "cfg"]],
+        "image": [["12", "image"]],
+    },
+    ComfyWorkflow.LLAMA_2_7B: {
+        "prompt": [["15", "prompt"]],
+        "temperature": [["15", "temperature"]],
+    },
+    ComfyWorkflow.SDXL_INPAINTING: {
+        "seed": [["3", "seed"]],
+        "image": [["20", "image"]],
+        "steps": [["3", "steps"]],
+        "cfg": [["3", "cfg"]],
+        "prompt": [["34", "text_g"], ["34", "text_l"]],
+        "negative_prompt": [["37", "text_g"], ["37", "text_l"]],
+        "height": [["37", "height"], ["37", "target_height"], ["50", "height"], ["52", "height"]],
+        "width": [["37", "width"], ["37", "target_width"], ["50", "width"], ["52", "width"]],
+    },
+    ComfyWorkflow.IP_ADAPTER_PLUS: {
+        "seed": [["3", "seed"]],
+        "steps": [["3", "steps"]],
+        "cfg": [["3", "cfg"]],
+        "image": [["28", "image"]],
+        "prompt": [["6", "text"]],
+        "negative_prompt": [["7", "text"]],
+        "strength": [["27", "weight"]],
+    },
+    ComfyWorkflow.IP_ADAPTER_FACE: {
+        "seed": [["3", "seed"]],
+        "steps": [["3", "steps"]],
+        "cfg": [["3", "cfg"]],
+        "image": [["24", "image"]],
+        "prompt": [["6", "text"]],
+        "negative_prompt": [["7", "text"]],
+        "strength": [["36", "weight"]],
+    },
+    ComfyWorkflow.IP_ADAPTER_FACE_PLUS: {
+        "seed": [["3", "seed"]],
+        "steps": [["3", "steps"]],
+        "cfg": [["3", "cfg"]],
+        "image": [["24", "image"]],
+        "image_2": [["28", "image"]],
+        "prompt": [["6", "text"]],
+        "negative_prompt": [["7", "text"]],
+        "strength": [["27", "weight"]],
+    },
+    ComfyWorkflow.STEERABLE_MOTION: {
+        "seed": [["207", "noise_seed"]],
+        "width": [["464", "width"], ["584", "value"]],
+        "height": [["464", "height"], ["585", "value"]],
+        "motion_scales": [["548", "text"]],
+        "output_format": [["281", "format"]],
+        "stmfnet_multiplier": [["559", "multiplier"]],
+        "buffer": [["558", "buffer"]],
+        "type_of_strength_distribution": [["558", "type_of_strength_distribution"]],
+        "linear_strength_value": [["558", "linear_strength_value"]],
+        "dynamic_strength_values": [["558", "dynamic_strength_values"]],
+        "linear_frame_distribution_value": [["558", "linear_frame_distribution_value"]],
+        "dynamic_frame_distribution_values": [["558", "dynamic_frame_distribution_values"]],
+        "type_of_frame_distribution": [["558", "type_of_frame_distribution"]],
+        "type_of_key_frame_influence": [["558", "type_of_key_frame_influence"]],
+        "linear_key_frame_influence_value": [["558", "linear_key_frame_influence_value"]],
+        "high_detail_mode": [["558", "high_detail_mode"]],
+        "dynamic_key_frame_influence_values": [["558", "dynamic_key_frame_influence_values"]],
+        "context_length": [["342", "context_length"]],
+        "context_stride": [["342", "context_stride"]],
+        "context_overlap": [["342", "context_overlap"]],
+        "multipled_base_end_percent": [["468", "end_percent"]],
+        "prompt": [["541", "pre_text"]],
+        "individual_prompts": [["541", "text"]],
+        "negative_prompt": [["543", "pre_text"]],
+        "individual_negative_prompts": [["543", "text"]],
+        "max_frames": [["541", "max_frames"], ["543", "max_frames"]],
+    },
+    ComfyWorkflow.DYNAMICRAFTER: {
+        "seed": [["12", "seed"]],
+        "image_1": [["16", "image"]],
+        "image_2": [["17", "image"]],
+        "steps": [["12", "steps"]],
+        "cfg": [["12", "cfg"]],
+        "prompt": [["12", "prompt"]],
+    },
+    ComfyWorkflow.UPSCALER: {
+        "video": [["302", "video"]],
+        "ckpt": [["362", "ckpt_name"]],
+        "upscale_factor": [["391", "upscale_by"]],
+    },
+    ComfyWorkflow.MOTION_LORA: {
+        "video": [["5", "video"]],
+        "width": [["5", "custom_width"]],
+        "height": [["5", "custom_height"]],
+        "lora_name": [["4", "lora_name"]],
+        "prompt": [["4", "prompt"], ["15", "validation_prompt"]],
+    },
+}
+
+
 # these methods return the workflow along with the output node class name
 class ComfyDataTransform:
     # there are certain files which need to be stored in a subfolder
     # creating a dict of filename <-> subfolder_name
     filename_subfolder_dict = {"structure_control_img": "sci"}
 
+    # returns a copy-on-write overlay of the cached template, so it can be updated freely
     @staticmethod
     def get_workflow_json(model: ComfyWorkflow):
         json_file_path = "./utils/ml_processor/" + MODEL_PATH_DICT[model]["workflow_path"]
-        # Specify encoding as 'utf-8' when opening the file
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            json_data = json.load(f)
-            return json_data, MODEL_PATH_DICT[model]["output_node_id"]
+        template = workflow_template_cache.get(json_file_path, WORKFLOW_PATCH_DICT.get(model, None))
+        return WorkflowOverlay(template), MODEL_PATH_DICT[model]["output_node_id"]
+
+    # sets the values on the inputs mapped to them in WORKFLOW_PATCH_DICT
+    @staticmethod
+    def patch_workflow(workflow, model: ComfyWorkflow, values):
+        patch_spec = WORKFLOW_PATCH_DICT[model]
+        for key, value in values.items():
+            for node_id, input_name in patch_spec[key]:
+                workflow[node_id]["inputs"][input_name] = value
+
+        return workflow
 
     @staticmethod
     def transform_sdxl_workflow(query: MLQueryObject):
@@ -96,14 +246,19 @@ class ComfyDataTransform:
         steps, cfg = query.num_inference_steps, query.guidance_scale
 
         # updating params
-        seed = random_seed()
-        workflow["10"]["inputs"]["noise_seed"] = seed
-        workflow["10"]["inputs"]["noise_seed"] = seed
-        workflow["5"]["inputs"]["width"], workflow["5"]["inputs"]["height"] = width, height
-        workflow["6"]["inputs"]["text"] = workflow["15"]["inputs"]["text"] = positive_prompt
-        workflow["7"]["inputs"]["text"] = workflow["16"]["inputs"]["text"] = negative_prompt
-        workflow["10"]["inputs"]["steps"], workflow["10"]["inputs"]["cfg"] = steps, cfg
-        workflow["11"]["inputs"]["steps"], workflow["11"]["inputs"]["cfg"] = steps, cfg
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.SDXL,
+            {
+                "seed": random_seed(),
+                "width": width,
+                "height": height,
+                "prompt": positive_prompt,
+                "negative_prompt": negative_prompt,
+                "steps": steps,
+                "cfg": cfg,
+            },
+        )
 
         return json.dumps(workflow), output_node_ids, [], []
 
@@ -120,13 +275,19 @@ class ComfyDataTransform:
         image_name = image.filename
 
         # updating params
-        workflow["37:0"]["inputs"]["image"] = image_name
-        workflow["42:0"]["inputs"]["text"] = positive_prompt
-        workflow["42:1"]["inputs"]["text"] = negative_prompt
-        workflow["42:2"]["inputs"]["steps"] = steps
-        workflow["42:2"]["inputs"]["cfg"] = cfg
-        workflow["42:2"]["inputs"]["denoise"] = 1 - strength
-        workflow["42:2"]["inputs"]["seed"] = random_seed()
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.SDXL_IMG2IMG,
+            {
+                "seed": random_seed(),
+                "image": image_name,
+                "prompt": positive_prompt,
+                "negative_prompt": negative_prompt,
+                "steps": steps,
+                "cfg": cfg,
+                "denoise": 1 - strength,
+            },
+        )
 
         return json.dumps(workflow), output_node_ids, [], []
 
@@ -145,42 +306,22 @@ class ComfyDataTransform:
         image_name = image.filename
 
         # updating params
-        workflow["3"]["inputs"]["seed"] = random_seed()
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.SDXL_CONTROLNET,
+            {
+                "seed": random_seed(),
+                "prompt": positive_prompt,
+                "negative_prompt": negative_prompt,
+                "low_threshold": low_threshold,
+                "high_threshold": high_threshold,
+                "steps": steps,
+                "cfg": cfg,
+                "image": image_name,
+            },
+        )
         workflow["5"]["width"], workflow["5"]["height"] = width, height
         workflow["17"]["width"], workflow["17"]["height"] = width, height
-        workflow["6"]["inputs"]["text"], workflow["7"]["inputs"]["text"] = positive_prompt, negative_prompt
-        workflow["12"]["inputs"]["low_threshold"], workflow["12"]["inputs"]["high_threshold"] = (
-            low_threshold,
-            high_threshold,
-        )
-        workflow["3"]["inputs"]["steps"], workflow["3"]["inputs"]["cfg"] = steps, cfg
-        workflow["13"]["inputs"]["image"] = image_name
-
-        return json.dumps(workflow), output_node_ids, [], []
-
-    @staticmethod
-    def transform_ipadapter_composition_workflow(query: MLQueryObject):
-        data_repo = DataRepo()
-        workflow, output_node_ids = ComfyDataTransform.get_workflow_json(ComfyWorkflow.IPADAPTER_COMPOSITION)
-
-        # workflow params
-        width, height = query.width, query.height
-        # width, height = determine_dimensions_for_sdxl(width, height)
-        positive_prompt, negative_prompt = query.prompt, query.negative_prompt
-        steps, cfg = query.num_inference_steps, query.guidance_scale
-        # low_threshold, high_threshold = query.low_threshold, query.high_threshold
-        image = data_repo.get_file_from_uuid(query.image_uuid)
-        image_name = image.filename
-
-        # updating params
-        workflow["9"]["inputs"]["seed"] = random_seed()
-        workflow["10"]["width"], workflow["10"]["height"] = width, height
-        # workflow["17"]["width"], workflow["17"]["height"] = width, height
-        workflow["7"]["inputs"]["text"], workflow["8"]["inputs"]["text"] = positive_prompt, negative_prompt
-        # workflow["12"]["inputs"]["low_threshold"], workflow["12"]["inputs"]["high_threshold"] = low_threshold, high_threshold
-        workflow["9"]["inputs"]["steps"], workflow["9"]["inputs"]["cfg"] = steps, cfg
-        workflow["6"]["inputs"]["image"] = image_name
-        workflow["28"]["inputs"]["weight"] = query.strength
 
         return json.dumps(workflow), output_node_ids, [], []
 
@@ -199,14 +340,22 @@ class ComfyDataTransform:
         image_name = image.filename
 
         # updating params
-        workflow["9"]["inputs"]["seed"] = random_seed()
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.IPADAPTER_COMPOSITION,
+            {
+                "seed": random_seed(),
+                "prompt": positive_prompt,
+                "negative_prompt": negative_prompt,
+                "steps": steps,
+                "cfg": cfg,
+                "image": image_name,
+                "strength": query.strength,
+            },
+        )
         workflow["10"]["width"], workflow["10"]["height"] = width, height
         # workflow["17"]["width"], workflow["17"]["height"] = width, height
-        workflow["7"]["inputs"]["text"], workflow["8"]["inputs"]["text"] = positive_prompt, negative_prompt
         # workflow["12"]["inputs"]["low_threshold"], workflow["12"]["inputs"]["high_threshold"] = low_threshold, high_threshold
-        workflow["9"]["inputs"]["steps"], workflow["9"]["inputs"]["cfg"] = steps, cfg
-        workflow["6"]["inputs"]["image"] = image_name
-        workflow["28"]["inputs"]["weight"] = query.strength
 
         return json.dumps(workflow), output_node_ids, [], []
 
@@ -227,12 +376,20 @@ class ComfyDataTransform:
         image_name = image.filename
 
         # updating params
-        workflow["3"]["inputs"]["seed"] = random_seed()
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.SDXL_CONTROLNET_OPENPOSE,
+            {
+                "seed": random_seed(),
+                "prompt": positive_prompt,
+                "negative_prompt": negative_prompt,
+                "steps": steps,
+                "cfg": cfg,
+                "image": image_name,
+            },
+        )
         workflow["5"]["width"], workflow["5"]["height"] = width, height
         workflow["11"]["width"], workflow["11"]["height"] = width, height
-        workflow["6"]["inputs"]["text"], workflow["7"]["inputs"]["text"] = positive_prompt, negative_prompt
-        workflow["3"]["inputs"]["steps"], workflow["3"]["inputs"]["cfg"] = steps, cfg
-        workflow["12"]["inputs"]["image"] = image_name
 
         return json.dumps(workflow), output_node_ids, [], []
 
@@ -245,8 +402,9 @@ class ComfyDataTransform:
         temperature = query.data.get("temperature", 0.8)
 
         # updating params
-        workflow["15"]["inputs"]["prompt"] = input_text
-        workflow["15"]["inputs"]["temperature"] = temperature
+        ComfyDataTransform.patch_workflow(
+            workflow, ComfyWorkflow.LLAMA_2_7B, {"prompt": input_text, "temperature": temperature}
+        )
 
         return json.dumps(workflow), output_node_ids, [], []
 
@@ -286,19 +444,20 @@ class ComfyDataTransform:
         # adding the combined image in query (and removing io buffers)
         query.data = {"data": {"file_combined_img": file.uuid}}
         # updating params
-        workflow["3"]["inputs"]["seed"] = random_seed()
-        workflow["20"]["inputs"]["image"] = filename
-        workflow["3"]["inputs"]["steps"], workflow["3"]["inputs"]["cfg"] = steps, cfg
-        workflow["34"]["inputs"]["text_g"] = workflow["34"]["inputs"]["text_l"] = positive_prompt
-        workflow["37"]["inputs"]["text_g"] = workflow["37"]["inputs"]["text_l"] = negative_prompt
-        workflow["37"]["inputs"]["height"] = height
-        workflow["37"]["inputs"]["width"] = width
-        workflow["37"]["inputs"]["target_height"] = height
-        workflow["37"]["inputs"]["target_width"] = width
-        workflow["50"]["inputs"]["height"] = height
-        workflow["50"]["inputs"]["width"] = width
-        workflow["52"]["inputs"]["height"] = height
-        workflow["52"]["inputs"]["width"] = width
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.SDXL_INPAINTING,
+            {
+                "seed": random_seed(),
+                "image": filename,
+                "steps": steps,
+                "cfg": cfg,
+                "prompt": positive_prompt,
+                "negative_prompt": negative_prompt,
+                "height": height,
+                "width": width,
+            },
+        )
         workflow["59"]["inputs"]["width"] = width
         workflow["58"]["inputs"]["width"] = height
 
@@ -316,14 +475,21 @@ class ComfyDataTransform:
         image = data_repo.get_file_from_uuid(query.image_uuid)
         image_name = image.filename
         # updating params
-        workflow["3"]["inputs"]["seed"] = random_seed()
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.IP_ADAPTER_PLUS,
+            {
+                "seed": random_seed(),
+                "steps": steps,
+                "cfg": cfg,
+                "image": image_name,  # dummy image
+                "prompt": query.prompt,
+                "negative_prompt": query.negative_prompt,
+                "strength": query.strength,
+            },
+        )
         workflow["5"]["width"], workflow["5"]["height"] = width, height
-        workflow["3"]["inputs"]["steps"], workflow["3"]["inputs"]["cfg"] = steps, cfg
         # workflow["24"]["inputs"]["image"] = image_name  # ipadapter image
-        workflow["28"]["inputs"]["image"] = image_name  # dummy image
-        workflow["6"]["inputs"]["text"] = query.prompt
-        workflow["7"]["inputs"]["text"] = query.negative_prompt
-        workflow["27"]["inputs"]["weight"] = query.strength
 
         return json.dumps(workflow), output_node_ids, [], []
 
@@ -341,14 +507,21 @@ class ComfyDataTransform:
         strength = query.strength
 
         # updating params
-        workflow["3"]["inputs"]["seed"] = random_seed()
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.IP_ADAPTER_FACE,
+            {
+                "seed": random_seed(),
+                "steps": steps,
+                "cfg": cfg,
+                "image": image_name,  # ipadapter image
+                "prompt": query.prompt,
+                "negative_prompt": query.negative_prompt,
+                "strength": strength,
+            },
+        )
         workflow["5"]["width"], workflow["5"]["height"] = width, height
-        workflow["3"]["inputs"]["steps"], workflow["3"]["inputs"]["cfg"] = steps, cfg
-        workflow["24"]["inputs"]["image"] = image_name  # ipadapter image
-        workflow["6"]["inputs"]["text"] = query.prompt
-        workflow["7"]["inputs"]["text"] = query.negative_prompt
-        workflow["36"]["inputs"]["weight"] = query.strength
-        workflow["36"]["inputs"]["weight_v2"] = query.strength
+        workflow["36"]["inputs"]["weight_v2"] = strength
 
         return json.dumps(workflow), output_node_ids, [], []
 
@@ -367,15 +540,22 @@ class ComfyDataTransform:
         image_name_2 = image_2.filename if image_2 else None
 
         # updating params
-        workflow["3"]["inputs"]["seed"] = random_seed()
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.IP_ADAPTER_FACE_PLUS,
+            {
+                "seed": random_seed(),
+                "steps": steps,
+                "cfg": cfg,
+                "image": image_name,  # ipadapter image
+                "image_2": image_name_2,  # insight face image
+                "prompt": query.prompt,
+                "negative_prompt": query.negative_prompt,
+                "strength": query.strength[1],
+            },
+        )
         workflow["5"]["width"], workflow["5"]["height"] = width, height
-        workflow["3"]["inputs"]["steps"], workflow["3"]["inputs"]["cfg"] = steps, cfg
-        workflow["24"]["inputs"]["image"] = image_name  # ipadapter image
-        workflow["28"]["inputs"]["image"] = image_name_2  # insight face image
-        workflow["6"]["inputs"]["text"] = query.prompt
-        workflow["7"]["inputs"]["text"] = query.negative_prompt
         workflow["29"]["inputs"]["weight"] = query.strength[0]
-        workflow["27"]["inputs"]["weight"] = query.strength[1]
 
         return json.dumps(workflow), output_node_ids, [], []
 
@@ -719,60 +899,46 @@ class ComfyDataTransform:
         workflow, output_node_ids = ComfyDataTransform.get_workflow_json(ComfyWorkflow.STEERABLE_MOTION)
         workflow = update_json_with_loras(workflow, sm_data.get("lora_data"))
 
-        workflow["464"]["inputs"]["height"] = sm_data.get("height")
-        workflow["464"]["inputs"]["width"] = sm_data.get("width")
-        workflow["584"]["inputs"]["value"] = sm_data.get("width")
-        workflow["585"]["inputs"]["value"] = sm_data.get("height")
-
         ckpt = sm_data.get("ckpt")
         if "ComfyUI/models/checkpoints/" != ckpt and ckpt:
             workflow["461"]["inputs"]["ckpt_name"] = ckpt
 
-        workflow["548"]["inputs"]["text"] = sm_data.get("motion_scales")
-
-        workflow["281"]["inputs"]["format"] = sm_data.get("output_format")
-
-        workflow["559"]["inputs"]["multiplier"] = sm_data.get("stmfnet_multiplier")
-
-        workflow["558"]["inputs"]["buffer"] = sm_data.get("buffer")
-        workflow["558"]["inputs"]["type_of_strength_distribution"] = sm_data.get(
-            "type_of_strength_distribution"
-        )
-        workflow["558"]["inputs"]["linear_strength_value"] = sm_data.get("linear_strength_value")
-        workflow["558"]["inputs"]["dynamic_strength_values"] = str(sm_data.get("dynamic_strength_values"))[
-            1:-1
-        ]
-        workflow["558"]["inputs"]["linear_frame_distribution_value"] = sm_data.get(
-            "linear_frame_distribution_value"
-        )
-        workflow["558"]["inputs"]["dynamic_frame_distribution_values"] = ", ".join(
-            str(int(value)) for value in sm_data.get("dynamic_frame_distribution_values")
-        )
-        workflow["558"]["inputs"]["type_of_frame_distribution"] = sm_data.get("type_of_frame_distribution")
-        workflow["558"]["inputs"]["type_of_key_frame_influence"] = sm_data.get("type_of_key_frame_influence")
-        workflow["558"]["inputs"]["linear_key_frame_influence_value"] = sm_data.get(
-            "linear_key_frame_influence_value"
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.STEERABLE_MOTION,
+            {
+                "seed": random_seed(),
+                "width": sm_data.get("width"),
+                "height": sm_data.get("height"),
+                "motion_scales": sm_data.get("motion_scales"),
+                "output_format": sm_data.get("output_format"),
+                "stmfnet_multiplier": sm_data.get("stmfnet_multiplier"),
+                "buffer": sm_data.get("buffer"),
+                "type_of_strength_distribution": sm_data.get("type_of_strength_distribution"),
+                "linear_strength_value": sm_data.get("linear_strength_value"),
+                "dynamic_strength_values": str(sm_data.get("dynamic_strength_values"))[1:-1],
+                "linear_frame_distribution_value": sm_data.get("linear_frame_distribution_value"),
+                "dynamic_frame_distribution_values": ", ".join(
+                    str(int(value)) for value in sm_data.get("dynamic_frame_distribution_values")
+                ),
+                "type_of_frame_distribution": sm_data.get("type_of_frame_distribution"),
+                "type_of_key_frame_influence": sm_data.get("type_of_key_frame_influence"),
+                "linear_key_frame_influence_value": sm_data.get("linear_key_frame_influence_value"),
+                "high_detail_mode": sm_data.get("high_detail_mode"),
+                "dynamic_key_frame_influence_values": str(sm_data.get("dynamic_key_frame_influence_values"))[
+                    1:-1
+                ],
+                "context_length": sm_data.get("context_length"),
+                "context_stride": sm_data.get("context_stride"),
+                "context_overlap": sm_data.get("context_overlap"),
+                "multipled_base_end_percent": sm_data.get("multipled_base_end_percent"),
+                "prompt": sm_data.get("prompt"),
+                "individual_prompts": sm_data.get("individual_prompts"),
+                "negative_prompt": sm_data.get("negative_prompt"),
+                "individual_negative_prompts": sm_data.get("individual_negative_prompts"),
+                "max_frames": int(float(sm_data.get("max_frames"))),
+            },
         )
-        workflow["558"]["inputs"]["high_detail_mode"] = sm_data.get("high_detail_mode")
-        workflow["558"]["inputs"]["dynamic_key_frame_influence_values"] = str(
-            sm_data.get("dynamic_key_frame_influence_values")
-        )[1:-1]
-
-        workflow["342"]["inputs"]["context_length"] = sm_data.get("context_length")
-        workflow["342"]["inputs"]["context_stride"] = sm_data.get("context_stride")
-        workflow["342"]["inputs"]["context_overlap"] = sm_data.get("context_overlap")
-
-        workflow["468"]["inputs"]["end_percent"] = sm_data.get("multipled_base_end_percent")
-
-        workflow["207"]["inputs"]["noise_seed"] = random_seed()
-
-        workflow["541"]["inputs"]["pre_text"] = sm_data.get("prompt")
-        workflow["541"]["inputs"]["text"] = sm_data.get("individual_prompts")
-        workflow["541"]["inputs"]["max_frames"] = int(float(sm_data.get("max_frames")))
-
-        workflow["543"]["inputs"]["pre_text"] = sm_data.get("negative_prompt")
-        workflow["543"]["inputs"]["max_frames"] = int(float(sm_data.get("max_frames")))
-        workflow["543"]["inputs"]["text"] = sm_data.get("individual_negative_prompts")
 
         if sm_data.get("file_structure_control_img_uuid"):
             workflow = update_structure_control_image(
@@ -797,12 +963,18 @@ class ComfyDataTransform:
         image_1 = data_repo.get_file_from_uuid(sm_data.get("file_image_0001_uuid"))
         image_2 = data_repo.get_file_from_uuid(sm_data.get("file_image_0002_uuid"))
 
-        workflow["16"]["inputs"]["image"] = image_1.filename
-        workflow["17"]["inputs"]["image"] = image_2.filename
-        workflow["12"]["inputs"]["seed"] = random_seed()
-        workflow["12"]["inputs"]["steps"] = 50
-        workflow["12"]["inputs"]["cfg"] = 4
-        workflow["12"]["inputs"]["prompt"] = sm_data.get("prompt")
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.DYNAMICRAFTER,
+            {
+                "seed": random_seed(),
+                "image_1": image_1.filename,
+                "image_2": image_2.filename,
+                "steps": 50,
+                "cfg": 4,
+                "prompt": sm_data.get("prompt"),
+            },
+        )
 
         extra_models_list = [
             {
@@ -825,9 +997,11 @@ class ComfyDataTransform:
 
         upscale_factor = data.get("upscale_factor", None)
 
-        workflow["302"]["inputs"]["video"] = os.path.basename(video.filename)
-        workflow["362"]["inputs"]["ckpt_name"] = model
-        workflow["391"]["inputs"]["upscale_by"] = upscale_factor
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.UPSCALER,
+            {"video": os.path.basename(video.filename), "ckpt": model, "upscale_factor": upscale_factor},
+        )
 
         extra_models_list = [
             {
@@ -858,12 +1032,17 @@ class ComfyDataTransform:
         video = data_repo.get_file_from_uuid(video_uuid)
         lora_name = data.get("lora_name", "")
 
-        workflow["5"]["inputs"]["video"] = os.path.basename(video.filename)
-        workflow["5"]["inputs"]["custom_width"] = query.width
-        workflow["5"]["inputs"]["custom_height"] = query.height
-        workflow["4"]["inputs"]["lora_name"] = lora_name
-        workflow["4"]["inputs"]["prompt"] = query.prompt
-        workflow["15"]["inputs"]["validation_prompt"] = query.prompt
+        ComfyDataTransform.patch_workflow(
+            workflow,
+            ComfyWorkflow.MOTION_LORA,
+            {
+                "video": os.path.basename(video.filename),
+                "width": query.width,
+                "height": query.height,
+                "lora_name": lora_name,
+                "prompt": query.prompt,
+            },
+        )
 
         ckpt = data.get("ckpt")
         if "ComfyUI/models/checkpoints/" != ckpt and ckpt:
@@ -913,6 +1092,25 @@ def get_model_workflow_from_query(model: MLModel, query_obj: MLQueryObject) -> s
     return MODEL_WORKFLOW_MAP[model.workflow_name](query_obj)
 
 
+# returns the workflow with a new random seed, None if the seed input of the workflow is not known
+def reseed_workflow(model: MLModel, workflow_json: str):
+    if "seed" not in WORKFLOW_PATCH_DICT.get(model.workflow_name, {}):
+        return None
+
+    workflow = json.loads(workflow_json)
+    ComfyDataTransform.patch_workflow(workflow, model.workflow_name, {"seed": random_seed()})
+    return json.dumps(workflow)
+
+
+# loads (and validates) all the workflow templates, so that a broken template is reported on startup
+def load_workflow_templates():
+    for workflow in MODEL_PATH_DICT.keys():
+        try:
+            ComfyDataTransform.get_workflow_json(workflow)
+        except Exception as e:
+            app_logger.log(LoggingType.ERROR, f"error loading workflow {workflow.value}: {str(e)}")
+
+
 def get_workflow_json_url(workflow_json):
     from utils.ml_processor.ml_interface import get_ml_client
 
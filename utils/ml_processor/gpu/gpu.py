@@ -1,9 +1,10 @@
 from distutils.file_util import copy_file
+from copy import deepcopy
 import json
 import os
 from shared.constants import InferenceParamType
 from shared.logging.logging import AppLogger
-from ui_components.methods.data_logger import log_model_inference
+from ui_components.methods.data_logger import log_model_inference, log_model_inference_list
 from ui_components.methods.file_methods import copy_local_file, normalize_size_internal_file_obj
 from utils.common_utils import padded_integer
 from utils.constants import MLQueryObject
@@ -11,6 +12,7 @@ from utils.data_repo.data_repo import DataRepo
 from utils.ml_processor.comfy_data_transform import (
     get_file_list_from_query_obj,
     get_model_workflow_from_query,
+    reseed_workflow,
 )
 from utils.ml_processor.constants import ML_MODEL, ComfyWorkflow, MLModel
 from utils.ml_processor.gpu.utils import predict_gpu_output, setup_comfy_runner
@@ -38,6 +40,45 @@ class GPUProcessor(MachineLearningProcessor):
     def predict_model_output_standardized(
         self, model: MLModel, query_obj: MLQueryObject, queue_inference=False, backlog=False
     ):
+        params = self._get_inference_params(model, query_obj)
+        return (
+            self.predict_model_output(model, **params)
+            if not queue_inference
+            else self.queue_prediction(model, **params, backlog=backlog)
+        )
+
+    def predict_model_output_standardized_variants(
+        self, model: MLModel, query_obj: MLQueryObject, variant_count, queue_inference=False, backlog=False
+    ):
+        if not queue_inference:
+            return super().predict_model_output_standardized_variants(
+                model, query_obj, variant_count, queue_inference, backlog
+            )
+
+        params = self._get_inference_params(model, query_obj)
+        # the workflow and the input files are prepared once, only the seed differs between the variants
+        kwargs_list = []
+        data = json.loads(params[InferenceParamType.GPU_INFERENCE.value])
+        for idx in range(variant_count):
+            if idx:
+                workflow_json = reseed_workflow(model, data["workflow_input"])
+                if not workflow_json:
+                    # seed can't be varied, preparing the variant from scratch
+                    variant_params = self._get_inference_params(model, deepcopy(query_obj))
+                    kwargs_list.append(dict(variant_params, backlog=backlog))
+                    continue
+
+                data["workflow_input"] = workflow_json
+
+            kwargs_list.append(
+                dict(params, **{InferenceParamType.GPU_INFERENCE.value: json.dumps(data)}, backlog=backlog)
+            )
+
+        log_list = log_model_inference_list(model, None, kwargs_list)
+        return [(None, log) for log in log_list]
+
+    # prepares the workflow and copies the input files to the comfy input folder
+    def _get_inference_params(self, model: MLModel, query_obj: MLQueryObject):
         data_repo = DataRepo()
         workflow_json, output_node_ids, extra_model_list, ignore_list = get_model_workflow_from_query(
             model, query_obj
@@ -114,11 +155,7 @@ class GPUProcessor(MachineLearningProcessor):
             InferenceParamType.QUERY_DICT.value: query_obj.to_json(),
             InferenceParamType.GPU_INFERENCE.value: json.dumps(data),
         }
-        return (
-            self.predict_model_output(model, **params)
-            if not queue_inference
-            else self.queue_prediction(model, **params, backlog=backlog)
-        )
+        return params
 
     def predict_model_output(self, replicate_model: MLModel, **kwargs):
         queue_inference = kwargs.get("queue_inference", False)
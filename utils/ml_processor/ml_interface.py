@@ -1,4 +1,5 @@
 from abc import ABC
+from copy import deepcopy
 
 from shared.constants import GPU_INFERENCE_ENABLED
 
@@ -10,6 +11,14 @@ def get_ml_client():
     return ReplicateProcessor() if not GPU_INFERENCE_ENABLED else GPUProcessor()
 
 
+# same as get_ml_client, but the remote predictions of the batch methods are sent concurrently
+def get_async_ml_client():
+    from utils.ml_processor.replicate.async_replicate import AsyncReplicateProcessor
+    from utils.ml_processor.gpu.gpu import GPUProcessor
+
+    return AsyncReplicateProcessor() if not GPU_INFERENCE_ENABLED else GPUProcessor()
+
+
 class MachineLearningProcessor(ABC):
     def __init__(self):
         pass
@@ -20,6 +29,23 @@ class MachineLearningProcessor(ABC):
     def predict_model_output(self, *args, **kwargs):
         pass
 
+    # variant_count runs of the same query (differing only in their seed)
+    def predict_model_output_standardized_variants(
+        self, model, query_obj, variant_count, queue_inference=False, backlog=False
+    ):
+        return self.predict_model_output_standardized_batch(
+            model, [deepcopy(query_obj) for _ in range(variant_count)], queue_inference, backlog
+        )
+
+    # runs the queries one after the other, processors which can run them concurrently override this
+    def predict_model_output_standardized_batch(
+        self, model, query_obj_list, queue_inference=False, backlog=False
+    ):
+        return [
+            self.predict_model_output_standardized(model, query_obj, queue_inference, backlog)
+            for query_obj in query_obj_list
+        ]
+
     def upload_training_data(self, *args, **kwargs):
         pass
 
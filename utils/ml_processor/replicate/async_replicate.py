@@ -0,0 +1,140 @@
+import asyncio
+import os
+import time
+
+from shared.constants import InferenceParamType
+from shared.logging.constants import LoggingType
+from ui_components.methods.data_logger import log_model_inference
+from utils.ml_processor.async_client import get_async_runner
+from utils.ml_processor.constants import ML_MODEL, MLModel
+from utils.ml_processor.replicate.replicate import ReplicateProcessor
+from utils.ml_processor.replicate.utils import check_user_credits, get_model_params_from_query_obj
+
+
+REPLICATE_PREDICTION_URL = "https://api.replicate.com/v1/predictions"
+PREDICTION_POLL_INTERVAL = 1
+MAX_PREDICTION_POLL_INTERVAL = 10
+PREDICTION_TERMINAL_STATUS_LIST = ["succeeded", "failed", "canceled"]
+
+
+class AsyncReplicateProcessor(ReplicateProcessor):
+    """
+    replicate processor which creates (and optionally waits for) many predictions concurrently over
+    the pooled async http client. the session bound work (credit check, params, inference logs) stays
+    in the calling thread, only the requests run on the background loop
+    """
+
+    def _get_headers(self):
+        return {
+            "Authorization": "Token " + os.environ.get("REPLICATE_API_TOKEN"),
+            "Content-Type": "application/json",
+        }
+
+    async def create_prediction(self, data):
+        client = get_async_runner().http_client
+        response = await client.post(REPLICATE_PREDICTION_URL, headers=self._get_headers(), json=data)
+        if response.status_code not in [200, 201]:
+            raise Exception(f"Error in creating prediction: {response.content}")
+
+        return response.json()
+
+    async def wait_for_prediction(self, prediction):
+        client = get_async_runner().http_client
+        interval = PREDICTION_POLL_INTERVAL
+        while prediction["status"] not in PREDICTION_TERMINAL_STATUS_LIST:
+            await asyncio.sleep(interval)
+            interval = min(interval * 1.5, MAX_PREDICTION_POLL_INTERVAL)
+            response = await client.get(prediction["urls"]["get"], headers=self._get_headers())
+            response.raise_for_status()
+            prediction = response.json()
+
+        return prediction
+
+    async def run_prediction(self, data):
+        start_time = time.time()
+        prediction = await self.wait_for_prediction(await self.create_prediction(data))
+        if prediction["status"] != "succeeded":
+            raise Exception(f"prediction {prediction['id']} {prediction['status']}: {prediction['error']}")
+
+        return prediction["output"], time.time() - start_time
+
+    async def _gather(self, fn, data_list):
+        return await asyncio.gather(*[fn(data) for data in data_list], return_exceptions=True)
+
+    def submit(self, fn, data_list):
+        """
+        runs fn(data) for all the data_list concurrently on the background loop and returns a
+        concurrent.futures.Future of the results (exceptions are returned in place of the failed ones)
+        """
+        return get_async_runner().submit(self._gather(fn, data_list))
+
+    @check_user_credits
+    def queue_prediction_batch(self, replicate_model: MLModel, kwargs_list):
+        """
+        creates the predictions concurrently and logs them, returns [(None, log)] in the order of
+        kwargs_list (None for the predictions that couldn't be created)
+        """
+        data_list = [self._get_prediction_data(replicate_model, kwargs) for kwargs in kwargs_list]
+        result_list = self.submit(self.create_prediction, data_list).result()
+
+        res = []
+        for kwargs, result in zip(kwargs_list, result_list):
+            if isinstance(result, Exception):
+                self.logger.log(LoggingType.ERROR, str(result))
+                res.append(None)
+            else:
+                res.append((None, self._log_queued_prediction(replicate_model, result, **kwargs)))
+
+        return res
+
+    @check_user_credits
+    def predict_model_output_batch(self, replicate_model: MLModel, kwargs_list):
+        """
+        runs the predictions concurrently till they are complete, returns [(output, log)] in the order
+        of kwargs_list (None for the failed predictions)
+        """
+        data_list = [self._get_prediction_data(replicate_model, kwargs) for kwargs in kwargs_list]
+        result_list = self.submit(self.run_prediction, data_list).result()
+
+        res = []
+        for kwargs, result in zip(kwargs_list, result_list):
+            if isinstance(result, Exception):
+                self.logger.log(LoggingType.ERROR, str(result))
+                res.append(None)
+                continue
+
+            output, time_taken = result
+            # hackish fix for now, will update replicate model later
+            if "model" in kwargs:
+                kwargs["inf_model"] = kwargs["model"]
+                del kwargs["model"]
+
+            log = log_model_inference(replicate_model, time_taken, **kwargs)
+            self.update_usage_credits(time_taken)
+
+            if replicate_model != ML_MODEL.clip_interrogator:
+                output = [output[-1]] if isinstance(output, list) else output
+
+            res.append((output, log))
+
+        return res
+
+    def predict_model_output_standardized_batch(
+        self, model: MLModel, query_obj_list, queue_inference=False, backlog=False
+    ):
+        kwargs_list = []
+        for query_obj in query_obj_list:
+            params = get_model_params_from_query_obj(model, query_obj)
+            # remoing buffers
+            query_obj.data = {}
+            params[InferenceParamType.QUERY_DICT.value] = query_obj.to_json()
+            params["prompt"] = query_obj.prompt
+            if queue_inference:
+                params["backlog"] = backlog
+            kwargs_list.append(params)
+
+        return (
+            self.predict_model_output_batch(model, kwargs_list)
+            if not queue_inference
+            else self.queue_prediction_batch(model, kwargs_list)
+        )
@@ -118,6 +118,17 @@ class ReplicateProcessor(MachineLearningProcessor):
             "Content-Type": "application/json",
         }
 
+        data = self._get_prediction_data(replicate_model, kwargs)
+        response = r.post(url, headers=headers, json=data)
+
+        if response.status_code in [200, 201]:
+            log = self._log_queued_prediction(replicate_model, response.json(), **kwargs)
+            return None, log
+        else:
+            self.logger.log(LoggingType.ERROR, f"Error in creating prediction: {response.content}")
+
+    # removes the empty params from kwargs (in place) and returns the request body of the prediction
+    def _get_prediction_data(self, replicate_model: MLModel, kwargs):
         if "query_dict" in kwargs:
             del kwargs["query_dict"]
 
@@ -136,29 +147,25 @@ class ReplicateProcessor(MachineLearningProcessor):
             if not isinstance(v, (int, str, list, dict, float, tuple)):
                 data["input"][k] = convert_file_to_base64(v)
 
-        response = r.post(url, headers=headers, json=data)
+        return data
 
-        if response.status_code in [200, 201]:
-            result = response.json()
-            data = {
-                "prediction_id": result["id"],
-                "error": result["error"],
-                "status": result["status"],
-                "created_at": result["created_at"],
-                "urls": result["urls"],  # these contain "cancel" and "get" urls
-            }
+    def _log_queued_prediction(self, replicate_model: MLModel, result, **kwargs):
+        data = {
+            "prediction_id": result["id"],
+            "error": result["error"],
+            "status": result["status"],
+            "created_at": result["created_at"],
+            "urls": result["urls"],  # these contain "cancel" and "get" urls
+        }
 
-            kwargs[InferenceParamType.REPLICATE_INFERENCE.value] = data
+        kwargs[InferenceParamType.REPLICATE_INFERENCE.value] = data
 
-            # hackish fix for now, will update replicate model later
-            if "model" in kwargs:
-                kwargs["inf_model"] = kwargs["model"]
-                del kwargs["model"]
+        # hackish fix for now, will update replicate model later
+        if "model" in kwargs:
+            kwargs["inf_model"] = kwargs["model"]
+            del kwargs["model"]
 
-            log = log_model_inference(replicate_model, None, **kwargs)
-            return None, log
-        else:
-            self.logger.log(LoggingType.ERROR, f"Error in creating prediction: {response.content}")
+        return log_model_inference(replicate_model, None, **kwargs)
 
     @check_user_credits
     def predict_model_output_async(self, replicate_model: MLModel, **kwargs):
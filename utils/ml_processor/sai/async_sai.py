@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from shared.constants import InferenceParamType
+from shared.logging.constants import LoggingType
+from shared.logging.logging import app_logger
+from ui_components.methods.data_logger import log_model_inference
+from utils.ml_processor.async_client import get_async_runner
+from utils.ml_processor.constants import MLModel
+from utils.ml_processor.sai.sai import StabilityProcessor
+from utils.ml_processor.sai.utils import get_model_params_from_query_obj, predict_sai_output_async
+
+
+class AsyncStabilityProcessor(StabilityProcessor):
+    """
+    stability processor which runs many generations concurrently over the pooled async http client,
+    the inference logs are created in the calling thread
+    """
+
+    async def run_prediction(self, data):
+        start_time = time.time()
+        output = await predict_sai_output_async(data, get_async_runner().http_client)
+        return output, time.time() - start_time
+
+    async def _gather(self, data_list):
+        return await asyncio.gather(
+            *[self.run_prediction(data) for data in data_list], return_exceptions=True
+        )
+
+    def submit(self, data_list):
+        # concurrent.futures.Future of [(output, time_taken) or exception]
+        return get_async_runner().submit(self._gather(data_list))
+
+    def predict_model_output_batch(self, model: MLModel, kwargs_list):
+        """
+        runs the generations concurrently, returns [(output, log)] in the order of kwargs_list
+        (None for the failed generations)
+        """
+        data_list = [kwargs.get(InferenceParamType.SAI_INFERENCE.value, None) for kwargs in kwargs_list]
+        result_list = self.submit(data_list).result()
+
+        res = []
+        for kwargs, result in zip(kwargs_list, result_list):
+            if isinstance(result, Exception):
+                app_logger.log(LoggingType.ERROR, f"Error in sai generation: {str(result)}")
+                res.append(None)
+                continue
+
+            output, time_taken = result
+            if "model" in kwargs:
+                kwargs["inf_model"] = kwargs["model"]
+                del kwargs["model"]
+
+            log = log_model_inference(model, time_taken, **kwargs)
+            res.append((output, log))
+
+        return res
+
+    def predict_model_output_standardized_batch(
+        self, model: MLModel, query_obj_list, queue_inference=False, backlog=False
+    ):
+        kwargs_list = []
+        for query_obj in query_obj_list:
+            params = get_model_params_from_query_obj(model, query_obj)
+            if params:
+                kwargs_list.append(
+                    {
+                        InferenceParamType.QUERY_DICT.value: params,
+                        InferenceParamType.SAI_INFERENCE.value: params,
+                    }
+                )
+
+        # queued generations are run by the runner, only their logs are created here
+        return (
+            self.predict_model_output_batch(model, kwargs_list)
+            if not queue_inference
+            else [self.queue_prediction(model, **kwargs) for kwargs in kwargs_list]
+        )
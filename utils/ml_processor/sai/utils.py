@@ -11,33 +11,55 @@ from utils.encryption import Encryptor
 from utils.ml_processor.constants import ML_MODEL, MLModel
 
 
+SAI_GENERATION_URL = "https://api.stability.ai/v2beta/stable-image/generate/sd3"
+
+
 def predict_sai_output(data):
     if not data:
         return None
 
+    headers, input_params = get_sai_request_params(data)
+    response = requests.post(SAI_GENERATION_URL, headers=headers, files={"none": ""}, data=input_params)
+
+    if response.status_code == 200:
+        return save_sai_output(response.content)
+    else:
+        raise Exception(str(response.json()))
+
+
+async def predict_sai_output_async(data, client):
+    # same as predict_sai_output, over an httpx.AsyncClient
+    if not data:
+        return None
+
+    headers, input_params = get_sai_request_params(data)
+    response = await client.post(SAI_GENERATION_URL, headers=headers, files={"none": ""}, data=input_params)
+
+    if response.status_code == 200:
+        return save_sai_output(response.content)
+    else:
+        raise Exception(str(response.json()))
+
+
+def get_sai_request_params(data):
     # TODO: decouple encryptor from this function
     encryptor = Encryptor()
     sai_key = encryptor.decrypt_json(data["data"]["data"]["stability_key"])
     input_params = deepcopy(data)
     del input_params["data"]
 
-    response = requests.post(
-        f"https://api.stability.ai/v2beta/stable-image/generate/sd3",
-        headers={"authorization": f"Bearer {sai_key}", "accept": "image/*"},
-        files={"none": ""},
-        data=input_params,
-    )
+    headers = {"authorization": f"Bearer {sai_key}", "accept": "image/*"}
+    return headers, input_params
 
-    if response.status_code == 200:
-        unique_filename = os.path.join("output", str(uuid.uuid4()) + ".png")
-        if not os.path.exists("output"):
-            os.makedirs("output")
-        with open(unique_filename, "wb") as file:
-            file.write(response.content)
 
-        return unique_filename
-    else:
-        raise Exception(str(response.json()))
+def save_sai_output(content):
+    unique_filename = os.path.join("output", str(uuid.uuid4()) + ".png")
+    if not os.path.exists("output"):
+        os.makedirs("output")
+    with open(unique_filename, "wb") as file:
+        file.write(content)
+
+    return unique_filename
 
 
 def get_closest_aspect_ratio(width, height):
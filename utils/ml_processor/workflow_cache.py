@@ -0,0 +1,113 @@
+from copy import deepcopy
+import json
+import os
+import threading
+
+
+class WorkflowOverlay(dict):
+    """
+    copy-on-write view of a cached workflow template. the nodes are shared with the template
+    till they are accessed, so a transform only copies the nodes it actually updates.
+    the nodes are copied when they are accessed through [], get, pop, popitem and setdefault. iterating
+    the workflow (items, values, json.dumps..) hands out the shared template nodes, these must only be
+    read. to update the nodes while iterating, go through workflow[node_id]
+    """
+
+    def __init__(self, template):
+        super().__init__(template)
+        self._owned_node_ids = set()
+
+    def __getitem__(self, node_id):
+        node = super().__getitem__(node_id)
+        if node_id not in self._owned_node_ids:
+            node = deepcopy(node)
+            self[node_id] = node
+
+        return node
+
+    def __setitem__(self, node_id, node):
+        super().__setitem__(node_id, node)
+        self._owned_node_ids.add(node_id)
+
+    def get(self, node_id, default=None):
+        return self[node_id] if node_id in self else default
+
+    def pop(self, node_id, *args):
+        if node_id not in self:
+            return super().pop(node_id, *args)
+
+        node = self[node_id]
+        super().pop(node_id)
+        self._owned_node_ids.discard(node_id)
+        return node
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+
+        node_id = next(reversed(self.keys()))
+        return node_id, self.pop(node_id)
+
+    def setdefault(self, node_id, default=None):
+        if node_id not in self:
+            self[node_id] = default
+
+        return self[node_id]
+
+    def update(self, *args, **kwargs):
+        for node_id, node in dict(*args, **kwargs).items():
+            self[node_id] = node
+
+    def copy(self):
+        # the nodes are shared by both the overlays now, so each copies them again when they are accessed
+        self._owned_node_ids = set()
+        return WorkflowOverlay(self)
+
+
+def get_patch_spec_error_list(template, patch_spec):
+    # lists the paths of the patch spec which are not present in the template
+    error_list = []
+    for key, path_list in patch_spec.items():
+        for node_id, input_name in path_list:
+            if input_name not in template.get(node_id, {}).get("inputs", {}):
+                error_list.append(f"{key}: {node_id}/inputs/{input_name} not found")
+
+    return error_list
+
+
+class WorkflowTemplateCache:
+    """
+    keeps the parsed workflow templates in memory, a template is read again only when its file
+    is modified. templates are validated against their patch spec when they are loaded
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._template_dict = {}  # {file_path: (mtime, template)}
+
+    def get(self, file_path, patch_spec=None):
+        mtime = os.path.getmtime(file_path)
+        with self._lock:
+            cached = self._template_dict.get(file_path, None)
+
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            template = json.load(f)
+
+        error_list = get_patch_spec_error_list(template, patch_spec or {})
+        if error_list:
+            raise ValueError(f"invalid workflow template {file_path}: " + ", ".join(error_list))
+
+        with self._lock:
+            self._template_dict[file_path] = (mtime, template)
+
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._template_dict = {}
+
+
+workflow_template_cache = WorkflowTemplateCache()
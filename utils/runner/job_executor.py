@@ -0,0 +1,141 @@
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.logging.constants import LoggingType
+from shared.logging.logging import app_logger
+from utils.enum import ExtendedEnum
+
+
+class JobLaneType(ExtendedEnum):
+    REMOTE = "remote"  # replicate/sai jobs, mostly waiting on the network
+    LOCAL_GPU = "local_gpu"  # comfy jobs, there is only one gpu so these run one at a time
+
+
+class LaneMetrics:
+    def __init__(self):
+        self.queued = 0  # submitted but not yet picked up by a worker
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_time = 0.0
+        self.total_run_time = 0.0
+        self.max_run_time = 0.0
+
+    def to_dict(self):
+        finished = self.completed + self.failed
+        return {
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_time": round(self.total_wait_time / finished, 3) if finished else 0,
+            "avg_run_time": round(self.total_run_time / finished, 3) if finished else 0,
+            "max_run_time": round(self.max_run_time, 3),
+        }
+
+
+class JobLane:
+    def __init__(self, name, max_workers, on_result=None):
+        self.name = name
+        self.max_workers = max_workers
+        self.on_result = on_result
+        self.metrics = LaneMetrics()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"runner_{name}")
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._results = []
+
+    def is_in_flight(self, job_key):
+        with self._lock:
+            return job_key in self._in_flight
+
+    def submit(self, job_key, fn, *args, **kwargs) -> bool:
+        # a job which is already queued/running in this lane is not submitted again
+        with self._lock:
+            if job_key in self._in_flight:
+                return False
+
+            self._in_flight.add(job_key)
+            self.metrics.queued += 1
+
+        self._pool.submit(self._run, job_key, time.time(), fn, *args, **kwargs)
+        return True
+
+    def _run(self, job_key, enqueued_at, fn, *args, **kwargs):
+        start_time = time.time()
+        with self._lock:
+            self.metrics.queued -= 1
+            self.metrics.running += 1
+            self.metrics.total_wait_time += start_time - enqueued_at
+
+        result, success = None, True
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            success = False
+            app_logger.log(LoggingType.ERROR, f"job {job_key} failed in lane {self.name}: {str(e)}")
+            traceback.print_exc()
+
+        run_time = time.time() - start_time
+        with self._lock:
+            self.metrics.running -= 1
+            if success:
+                self.metrics.completed += 1
+            else:
+                self.metrics.failed += 1
+            self.metrics.total_run_time += run_time
+            self.metrics.max_run_time = max(self.metrics.max_run_time, run_time)
+            if result is not None:
+                self._results.append(result)
+            self._in_flight.discard(job_key)
+
+        # lets the main loop pick up the result without waiting for the next tick
+        if result is not None and self.on_result:
+            self.on_result()
+
+    def drain_results(self):
+        with self._lock:
+            res, self._results = self._results, []
+        return res
+
+    def shutdown(self, wait=False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+class InferenceJobExecutor:
+    """
+    bounded worker pool with separate lanes for the different kinds of inference jobs.
+    a slow job only holds up the workers of its own lane, and a job (identified by job_key)
+    is never submitted twice while it is still queued or running in this process.
+    claiming a job across runner processes is the responsibility of the job itself
+    """
+
+    def __init__(self, lane_config, on_result=None):
+        # lane_config = {lane_name: max_workers}
+        self.lanes = {
+            name: JobLane(name, max_workers, on_result) for name, max_workers in lane_config.items()
+        }
+
+    def submit(self, lane_name, job_key, fn, *args, **kwargs) -> bool:
+        return self.lanes[lane_name].submit(job_key, fn, *args, **kwargs)
+
+    def is_in_flight(self, job_key):
+        return any(lane.is_in_flight(job_key) for lane in self.lanes.values())
+
+    def has_pending_jobs(self):
+        return any(lane.metrics.queued or lane.metrics.running for lane in self.lanes.values())
+
+    def drain_results(self):
+        res = []
+        for lane in self.lanes.values():
+            res.extend(lane.drain_results())
+        return res
+
+    def metrics(self):
+        return {name: lane.metrics.to_dict() for name, lane in self.lanes.items()}
+
+    def shutdown(self, wait=False):
+        for lane in self.lanes.values():
+            lane.shutdown(wait=wait)
@@ -0,0 +1,95 @@
+import datetime
+import os
+import socket
+import threading
+import uuid
+
+from django.db.models import Q
+from django.utils import timezone
+
+from shared.constants import InferenceStatus
+
+
+# secs after which the lease of a local job which is no longer refreshed is considered expired
+LOCAL_JOB_LEASE_TTL = 5 * 60
+
+
+def generate_runner_id():
+    return f"{socket.gethostname()}_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+
+
+class LocalJobLease:
+    """
+    leases of the local (gpu/sai) logs run by this runner process. a log is claimed by atomically moving
+    it from queued to in_progress along with the runner id (claimed_by) and the time of the claim
+    (claimed_at). claimed_at is refreshed while the job runs, so only the in_progress logs whose runner
+    has died (or was restarted) stop being refreshed and are moved back to the queue once the lease
+    expires. the logs claimed by other live runners are never requeued
+    """
+
+    def __init__(self, runner_id=None, ttl=LOCAL_JOB_LEASE_TTL):
+        self.runner_id = runner_id or generate_runner_id()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._held_log_id_set = set()
+
+    def claim(self, log_id) -> bool:
+        from backend.models import InferenceLog
+
+        updated_count = InferenceLog.objects.filter(
+            id=log_id, status=InferenceStatus.QUEUED.value, is_disabled=False
+        ).update(
+            status=InferenceStatus.IN_PROGRESS.value, claimed_by=self.runner_id, claimed_at=timezone.now()
+        )
+        if updated_count != 1:
+            return False
+
+        with self._lock:
+            self._held_log_id_set.add(log_id)
+        return True
+
+    def release(self, log_id):
+        # called once the job is over, the log has moved out of in_progress by then
+        with self._lock:
+            self._held_log_id_set.discard(log_id)
+
+    def held_log_id_list(self):
+        with self._lock:
+            return list(self._held_log_id_set)
+
+    def refresh(self):
+        # heartbeat of the jobs still running in this process
+        from backend.models import InferenceLog
+
+        log_id_list = self.held_log_id_list()
+        if not log_id_list:
+            return 0
+
+        return InferenceLog.objects.filter(
+            id__in=log_id_list, claimed_by=self.runner_id, status=InferenceStatus.IN_PROGRESS.value
+        ).update(claimed_at=timezone.now())
+
+    def requeue_expired(self, is_local_log):
+        """
+        moves the local logs whose lease has expired back to the queue, returns their count. logs left
+        in_progress without a lease (claimed before the leases were added) count as expired
+        """
+        from backend.models import InferenceLog
+
+        expired_filter = Q(claimed_at__isnull=True) | Q(
+            claimed_at__lt=timezone.now() - datetime.timedelta(seconds=self.ttl)
+        )
+        log_list = InferenceLog.objects.filter(
+            expired_filter, status=InferenceStatus.IN_PROGRESS.value, is_disabled=False
+        ).all()
+        held_log_id_set = set(self.held_log_id_list())
+        expired_log_id_list = [
+            log.id for log in log_list if is_local_log(log) and log.id not in held_log_id_set
+        ]
+        if not expired_log_id_list:
+            return 0
+
+        # the lease could have been refreshed in the meantime, so the expiry is checked again
+        return InferenceLog.objects.filter(
+            expired_filter, id__in=expired_log_id_list, status=InferenceStatus.IN_PROGRESS.value
+        ).update(status=InferenceStatus.QUEUED.value, claimed_by="", claimed_at=None)
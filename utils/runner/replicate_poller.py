@@ -0,0 +1,170 @@
+import datetime
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from shared.logging.constants import LoggingType
+from shared.logging.logging import app_logger
+
+
+REPLICATE_API_BASE_URL = os.getenv("REPLICATE_API_BASE_URL", "https://api.replicate.com/v1")
+# (max prediction age in seconds, poll interval in seconds), the last entry applies to everything older
+POLL_INTERVAL_SCHEDULE = [(30, 1), (180, 3), (None, 10)]
+# replicate predictions still waiting on a cold boot are polled at least this far apart
+STARTING_POLL_INTERVAL = 3
+MAX_ERROR_POLL_INTERVAL = 60
+
+
+def parse_created_at(value):
+    # replicate timestamps are utc iso strings, returns the epoch time (None if it can't be parsed)
+    try:
+        created_at = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+    return created_at.timestamp()
+
+
+class PredictionPollState:
+    def __init__(self, first_seen_at):
+        # when the prediction was created (as far as known), its age decides how often it is polled
+        self.first_seen_at = first_seen_at
+        self.next_poll_at = 0
+        self.last_status = None
+        self.etag = None
+        self.last_result = None
+        self.error_count = 0
+
+
+class ReplicatePredictionPoller:
+    """
+    polls the status of replicate predictions over a single pooled session. every prediction
+    has its own poll schedule, new predictions are polled every second and the interval grows
+    with the age of the prediction (and on errors), so long running jobs don't hit the api on every tick.
+    the age is counted from the creation time passed by the caller (or the created_at of the prediction),
+    so that a restarted runner doesn't treat the running predictions as new ones
+    """
+
+    def __init__(self, base_url=REPLICATE_API_BASE_URL, max_workers=8, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="replicate_poller")
+        self._lock = threading.Lock()
+        self._state = {}  # {prediction_id: PredictionPollState}
+        self.metrics = {"requests": 0, "not_modified": 0, "errors": 0}
+
+    def get_poll_interval(self, state, now):
+        if state.error_count:
+            return min(2**state.error_count, MAX_ERROR_POLL_INTERVAL)
+
+        age = now - state.first_seen_at
+        interval = POLL_INTERVAL_SCHEDULE[-1][1]
+        for max_age, schedule_interval in POLL_INTERVAL_SCHEDULE:
+            if max_age is None or age < max_age:
+                interval = schedule_interval
+                break
+
+        if state.last_status == "starting" and age >= POLL_INTERVAL_SCHEDULE[0][0]:
+            interval = max(interval, STARTING_POLL_INTERVAL)
+
+        return interval
+
+    def poll(self, prediction_id_list, api_key, created_at_dict=None):
+        """
+        fetches the status of the predictions which are due for a poll (concurrently).
+        created_at_dict = {prediction_id: epoch time} of the predictions, when it is known.
+        returns {prediction_id: prediction_json} for the predictions that were polled successfully
+        """
+        created_at_dict = created_at_dict or {}
+        now = time.time()
+        due_list = []
+        with self._lock:
+            # dropping the predictions that are no longer being tracked
+            active_ids = set(prediction_id_list)
+            for prediction_id in list(self._state.keys()):
+                if prediction_id not in active_ids:
+                    del self._state[prediction_id]
+
+            for prediction_id in prediction_id_list:
+                if prediction_id not in self._state:
+                    self._state[prediction_id] = PredictionPollState(
+                        min(created_at_dict.get(prediction_id, None) or now, now)
+                    )
+                state = self._state[prediction_id]
+                if state.next_poll_at <= now:
+                    due_list.append(prediction_id)
+
+        if not due_list:
+            return {}
+
+        res = {}
+        for prediction_id, result in zip(
+            due_list, self._pool.map(lambda p: self._fetch(p, api_key), due_list)
+        ):
+            if result is not None:
+                res[prediction_id] = result
+
+        return res
+
+    def _fetch(self, prediction_id, api_key):
+        with self._lock:
+            state = self._state[prediction_id]
+            etag = state.etag
+
+        headers = {"Authorization": f"Token {api_key}"}
+        if etag:
+            headers["If-None-Match"] = etag
+
+        result = None
+        try:
+            response = self.session.get(
+                f"{self.base_url}/predictions/{prediction_id}", headers=headers, timeout=self.timeout
+            )
+            if response.status_code == 304:
+                result = state.last_result
+            elif response.status_code in [200, 201]:
+                result = response.json()
+            else:
+                app_logger.log(LoggingType.DEBUG, f"Error: {response.content}")
+        except Exception as e:
+            app_logger.log(LoggingType.DEBUG, f"error polling prediction {prediction_id}: {str(e)}")
+
+        with self._lock:
+            self.metrics["requests"] += 1
+            if result is None:
+                self.metrics["errors"] += 1
+                state.error_count += 1
+            else:
+                if response.status_code == 304:
+                    self.metrics["not_modified"] += 1
+                else:
+                    state.etag = response.headers.get("ETag", None)
+                state.error_count = 0
+                state.last_status = result.get("status", None)
+                state.last_result = result
+                created_at = parse_created_at(result.get("created_at", None))
+                if created_at:
+                    state.first_seen_at = min(state.first_seen_at, created_at)
+
+            now = time.time()
+            state.next_poll_at = now + self.get_poll_interval(state, now)
+
+        return result
+
+    def forget(self, prediction_id):
+        with self._lock:
+            self._state.pop(prediction_id, None)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -0,0 +1,94 @@
+import socket
+import threading
+
+from shared.logging.constants import LoggingType
+from shared.logging.logging import app_logger
+from utils.constants import RUNNER_PROCESS_PORT
+
+
+WAKEUP_MESSAGE = b"1"
+
+
+class RunnerWakeupListener:
+    """
+    local socket on which the runner listens for wakeup pings (sent by the app whenever
+    a log is queued). this also doubles as the socket which signals that the runner is alive
+    """
+
+    def __init__(self, port=RUNNER_PROCESS_PORT):
+        self.port = port
+        self._event = threading.Event()
+        self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server_socket.bind(("localhost", port))
+        self._server_socket.listen(100)
+
+        self._thread = threading.Thread(target=self._accept_loop, name="runner_wakeup", daemon=True)
+        self._thread.start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server_socket.accept()
+            except OSError:
+                # socket closed
+                return
+
+            try:
+                conn.settimeout(1)
+                conn.recv(len(WAKEUP_MESSAGE))
+            except OSError:
+                pass
+            finally:
+                conn.close()
+
+            # any connection counts as a ping
+            self._event.set()
+
+    def wake(self):
+        self._event.set()
+
+    def wait(self, timeout) -> bool:
+        # returns True if woken up by a ping, False if the timeout expired
+        woken = self._event.wait(timeout)
+        self._event.clear()
+        return woken
+
+    def close(self):
+        try:
+            self._server_socket.close()
+        except OSError:
+            pass
+
+
+def start_wakeup_listener(port=RUNNER_PROCESS_PORT):
+    try:
+        return RunnerWakeupListener(port)
+    except OSError as e:
+        app_logger.log(LoggingType.DEBUG, f"wakeup socket unavailable, falling back to polling: {str(e)}")
+        return None
+
+
+def notify_runner(port=RUNNER_PROCESS_PORT, timeout=0.05) -> bool:
+    # best effort, the runner falls back to polling if it doesn't receive this
+    try:
+        with socket.create_connection(("localhost", port), timeout=timeout) as client_socket:
+            client_socket.sendall(WAKEUP_MESSAGE)
+        return True
+    except OSError:
+        return False
+
+
+class AdaptivePollInterval:
+    # poll interval which grows while the runner is idle and drops back as soon as there is work
+    def __init__(self, min_interval, max_interval, factor=2):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.current = min_interval
+
+    def reset(self):
+        self.current = self.min_interval
+
+    def backoff(self):
+        self.current = min(self.current * self.factor, self.max_interval)